@@ -0,0 +1,67 @@
+"""Microbenchmark of the format checks in :mod:`jacobsjsonschema.formats`.
+
+Times each check on a valid and an invalid string, and the whole validator on
+the valid one, printing nanoseconds per call::
+
+    python benchmarks/bench_formats.py [--number N] [FORMAT ...]
+"""
+
+import argparse
+import timeit
+
+from jacobsjsonschema.draft7 import Validator
+from jacobsjsonschema.formats import FORMAT_CHECKERS
+
+SAMPLES = {
+    "date-time": ("1963-06-19T08:30:06.283185Z", "1963-06-19T08:30:06.28123+01:00Z"),
+    "date": ("1963-06-19", "2021-02-29"),
+    "time": ("08:30:06.283185+05:30", "08:30:06 PST"),
+    "duration": ("P4DT12H30M5S", "P1D2H"),
+    "email": ("joe.bloggs@example.com", "joe..bloggs@example.com"),
+    "hostname": ("www.example.com", "-a-host-name-that-starts-with--"),
+    "ipv4": ("192.168.0.1", "087.10.0.1"),
+    "ipv6": ("2001:db8:85a3::8a2e:370:7334", "12345::"),
+    "uri": (
+        "http://foo.bar/?baz=qux#quux",
+        "//foo.bar/?baz=qux#quux",
+    ),
+    "uri-reference": ("/abc/def?x=1#frag", "\\\\WINDOWS\\fileshare"),
+    "uuid": (
+        "2eb8aa08-aa98-11ea-b4aa-73b441d16380",
+        "2eb8aa08-aa98-11ea-b4ga-73b441d16380",
+    ),
+    "json-pointer": ("/foo/bar~0/baz~1/%a", "/foo/bar~"),
+    "regex": ("([abc])+\\s+$", "^(abc]"),
+}
+
+
+def _nanoseconds(func, argument, number):
+    seconds = min(timeit.repeat(lambda: func(argument), number=number, repeat=3))
+    return seconds / number * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100000)
+    parser.add_argument("formats", nargs="*", default=sorted(SAMPLES))
+    args = parser.parse_args()
+    print(
+        "{:<14} {:>10} {:>10} {:>10}".format("format", "valid", "invalid", "validate")
+    )
+    for name in args.formats:
+        check = FORMAT_CHECKERS[name]
+        valid, invalid = SAMPLES[name]
+        assert check(valid) and not check(invalid), name
+        validator = Validator({"format": name}).use_builtin_formats()
+        print(
+            "{:<14} {:>10.0f} {:>10.0f} {:>10.0f}".format(
+                name,
+                _nanoseconds(check, valid, args.number),
+                _nanoseconds(check, invalid, args.number),
+                _nanoseconds(validator.validate, valid, args.number),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
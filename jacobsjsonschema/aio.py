@@ -0,0 +1,176 @@
+"""Validating from asyncio code without blocking the event loop.
+
+Validation is synchronous, and a large document can hold the loop for long
+enough to delay every other request it's serving.  :class:`AsyncValidator`
+validates small documents inline, where handing them to a thread would cost
+more than it saves, and runs larger ones in an executor.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Collection, List, Optional, Tuple, Union
+
+from .batch import BatchResult
+from .draft4 import Validator
+from .errors import ErrorRecord
+from .parallel import validate_encoded
+
+
+def exceeds_size(data: Any, limit: int) -> bool:
+    """Whether *data* has more than *limit* values, counting every nested
+    object member and array item.
+
+    Arrays and objects are counted by their length before their members are
+    looked at, so no more than *limit* values are ever visited.
+    """
+    count = 1
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            members: Collection[Any] = value.values()
+        elif isinstance(value, list):
+            members = value
+        else:
+            continue
+        count += len(members)
+        if count > limit:
+            return True
+        stack.extend(members)
+    return count > limit
+
+
+async def _read_line(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """Read a line from *reader*, including its line ending; ``b""`` at the
+    end of the stream, and ``None`` for a line longer than the reader's
+    limit, which is skipped."""
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        consumed = e.consumed
+    while True:
+        # Drop what has been read of the line so far, up to its end.
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+
+
+def _validate_lines(
+    validator: Validator, lines: List[Union[bytes, str]], too_long: List[int]
+) -> BatchResult:
+    result = validate_encoded(validator, lines)
+    for index in too_long:
+        result.valid[index] = 0
+        result.errors[index] = [
+            ErrorRecord("Line is longer than the stream reader's limit")
+        ]
+    return result
+
+
+def _validate_capturing(
+    validator: Validator, data: Any
+) -> Tuple[bool, List[ErrorRecord], List[str]]:
+    # Errors and warnings are kept per thread, so they're collected here in
+    # the executor's thread and handed back with the result.
+    valid = validator.validate(data)
+    context = validator._local.context
+    return valid, context.errors, context.warnings
+
+
+class AsyncValidator(object):
+    """Wraps a validator for use from coroutines.
+
+    Documents with more than *inline_limit* values (see :func:`exceeds_size`)
+    are validated in *executor*, or the loop's default executor if it's
+    ``None``; smaller ones are validated directly on the loop.  After a call
+    has been awaited, ``get_errors()`` (and ``get_warnings()``, on validators
+    that have it) report on it just as they would after a synchronous call,
+    as long as they're called before the coroutine awaits anything else.
+    """
+
+    def __init__(
+        self,
+        validator: Validator,
+        inline_limit: int = 2000,
+        executor: Optional[Executor] = None,
+    ):
+        self.validator = validator
+        self.inline_limit = inline_limit
+        self.executor = executor
+
+    def get_errors(self) -> List[str]:
+        return self.validator.get_errors()
+
+    async def validate(self, data: Any) -> bool:
+        """Validate *data*, returning or raising as ``Validator.validate`` does."""
+        if not exceeds_size(data, self.inline_limit):
+            return self.validator.validate(data)
+        loop = asyncio.get_running_loop()
+        valid, errors, warnings = await loop.run_in_executor(
+            self.executor, _validate_capturing, self.validator, data
+        )
+        context = self.validator._local.context
+        context.errors = errors
+        context.warnings = warnings
+        return valid
+
+    async def validate_ndjson(
+        self, reader: asyncio.StreamReader, chunk_size: int = 256
+    ) -> BatchResult:
+        """Validate each line of newline-delimited JSON read from *reader*.
+
+        Lines are decoded and validated in the executor *chunk_size* at a
+        time, while the next chunk is read.  Empty lines are skipped, as by
+        :func:`jacobsjsonschema.ndjson.validate_file`; the result has one
+        entry per document.  Lines that aren't valid JSON, and lines longer
+        than the reader's limit (the ``limit`` it was created with, 64 KiB by
+        default), are reported as invalid documents.
+        """
+        loop = asyncio.get_running_loop()
+        result = BatchResult()
+        pending: Optional["asyncio.Future[BatchResult]"] = None
+        chunk: List[Union[bytes, str]] = []
+        too_long: List[int] = []
+        while True:
+            line = await _read_line(reader)
+            if line is None:
+                too_long.append(len(chunk))
+                # Stands in for the line; reported as too long instead.
+                chunk.append(b"")
+            else:
+                end = len(line)
+                if line.endswith(b"\n"):
+                    end -= 1
+                if end and line[end - 1] == 0x0D:
+                    end -= 1
+                if end:
+                    chunk.append(line[:end])
+            if len(chunk) < chunk_size and line != b"":
+                continue
+            if pending is not None:
+                self._merge(result, await pending)
+                pending = None
+            if chunk:
+                pending = loop.run_in_executor(
+                    self.executor, _validate_lines, self.validator, chunk, too_long
+                )
+                chunk = []
+                too_long = []
+            if line == b"":
+                if pending is not None:
+                    self._merge(result, await pending)
+                return result
+
+    @staticmethod
+    def _merge(result: BatchResult, chunk: BatchResult) -> None:
+        offset = len(result.valid)
+        for index in chunk.errors:
+            result.errors[offset + index] = chunk.errors.records(index)
+        result.valid += chunk.valid
@@ -0,0 +1,89 @@
+"""Results of validating many documents at once; see ``Validator.validate_many``."""
+
+from typing import Dict, Iterator, List, MutableMapping
+
+from .errors import ErrorRecord
+
+
+class ErrorMessages(MutableMapping[int, List[str]]):
+    """The messages of each document that produced errors, keyed by index.
+
+    The errors are kept as the :class:`~jacobsjsonschema.errors.ErrorRecord`
+    objects collected, and only formatted when a document's messages are
+    read, so a failing document doesn't pay for messages nobody reads.
+    """
+
+    __slots__ = ("_records",)
+
+    def __init__(self) -> None:
+        self._records: Dict[int, List[ErrorRecord]] = {}
+
+    def records(self, index: int) -> List[ErrorRecord]:
+        """Return the errors of the document at *index*, unformatted; empty
+        if it has none."""
+        return self._records.get(index, [])
+
+    def __getitem__(self, index: int) -> List[str]:
+        return [str(error) for error in self._records[index]]
+
+    def __setitem__(self, index: int, errors: List[ErrorRecord]) -> None:  # type: ignore[override]
+        self._records[index] = errors
+
+    def __delitem__(self, index: int) -> None:
+        del self._records[index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, index: object) -> bool:
+        return index in self._records
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class BatchResult(object):
+    """Outcome of validating a sequence of documents.
+
+    ``valid`` holds one byte per document, ``1`` if it passed and ``0`` if it
+    didn't, in the order the documents were given.  ``errors`` maps the index
+    of each document that produced errors to its messages: every error
+    collected in lazy mode, or the message of the exception that stopped
+    validation otherwise (see :class:`ErrorMessages`).  Documents without
+    errors take no space beyond their byte.
+    """
+
+    __slots__ = ("valid", "errors")
+
+    def __init__(self) -> None:
+        self.valid = bytearray()
+        self.errors = ErrorMessages()
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def __getitem__(self, index: int) -> bool:
+        return self.valid[index] == 1
+
+    @property
+    def all_valid(self) -> bool:
+        return 0 not in self.valid
+
+    @property
+    def valid_count(self) -> int:
+        return self.valid.count(1)
+
+    def invalid_indices(self) -> Iterator[int]:
+        """Yield the index of every document that failed, in order."""
+        index = self.valid.find(0)
+        while index != -1:
+            yield index
+            index = self.valid.find(0, index + 1)
+
+    def __repr__(self) -> str:
+        return "<BatchResult {} documents, {} invalid>".format(
+            len(self.valid), len(self.valid) - self.valid_count
+        )
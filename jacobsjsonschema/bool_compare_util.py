@@ -27,3 +27,39 @@ def replace_bools_for_comparison(data):
         return FalseClass()
     else:
         return data
+
+
+class _CanonicalBool(object):
+    """Stands in for ``True``/``False`` so they never equal ``1``/``0``."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: bool):
+        self.value = value
+
+    def __repr__(self):
+        return "canonical({})".format(self.value)
+
+
+_CANONICAL_TRUE = _CanonicalBool(True)
+_CANONICAL_FALSE = _CanonicalBool(False)
+
+
+def canonical_json(data):
+    """Return a hashable form of *data* that compares with JSON semantics.
+
+    Booleans are replaced by singletons so that ``true`` never equals ``1``,
+    arrays become tuples and objects become frozensets of ``(key, value)``
+    pairs.  Numbers are left alone, so ``1`` and ``1.0`` stay equal (and hash
+    equally).  Two values are equal in JSON exactly when their canonical forms
+    are equal, which makes the result usable as a set member or dict key.
+    """
+    if data is True:
+        return _CANONICAL_TRUE
+    if data is False:
+        return _CANONICAL_FALSE
+    if isinstance(data, list):
+        return tuple([canonical_json(item) for item in data])
+    if isinstance(data, dict):
+        return frozenset([(k, canonical_json(v)) for k, v in data.items()])
+    return data
@@ -0,0 +1,308 @@
+"""Python source code generation backend for compiled schemas.
+
+``Validator.compile(backend="codegen")`` turns each :class:`SchemaNode` into a
+straight-line Python function, built with ``compile()``/``exec``.  Simple
+keyword checks (``type``, length and numeric bounds, ``pattern``,
+``required``, ...) are inlined as ``isinstance`` tests against literal bounds
+and pre-bound regex searches.  Every other step is emitted as a direct call to
+the bound ``_validate_*`` method it came from, so the generated code reports
+exactly the same errors (raised or collected lazily) as the other backends.
+
+A check is only inlined when the validator still uses the draft4
+implementation of that keyword; an overridden method is always called.
+"""
+
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from .bool_compare_util import canonical_json
+from .compiler import SchemaNode, Step
+from .draft4 import Validator as Draft4Validator
+from .draft6 import Validator as Draft6Validator
+from .json_types import JsonTypes
+from .regex_cache import pattern_cache
+
+# Inliners return the lines of code for a step, or ``None`` to fall back to
+# calling the step.  Generated code reads the instance from ``data`` and
+# accumulates into ``retval``.
+Inliner = Callable[["_FunctionBuilder", Any, Dict[str, Any]], Optional[List[str]]]
+
+_TYPE_CHECKS = {
+    "string": ("not isinstance(data, str)", "Data was not a string"),
+    "array": ("not isinstance(data, list)", "Data was not a array"),
+    "object": ("not isinstance(data, dict)", "Data was not a object"),
+    "boolean": ("not isinstance(data, bool)", "Data was not a boolean"),
+    "null": ("data is not None", "Data type was not null"),
+    "number": (
+        "isinstance(data, bool) or not isinstance(data, (int, float))",
+        "Data was not a number",
+    ),
+}
+
+
+def _is_int(value: Any) -> bool:
+    return type(value) is int
+
+
+def _is_number(value: Any) -> bool:
+    return type(value) in (int, float) and value == value and abs(value) != float("inf")
+
+
+def _pattern_searcher(pattern: str) -> Optional[Callable[[str], Any]]:
+    """Precompile *pattern* the way ``_pattern_search`` would evaluate it."""
+    try:
+        return pattern_cache.compile(pattern).search
+    except Exception:
+        # Leave it to the step itself to raise at validation time.
+        return None
+
+
+def _report(
+    builder: "_FunctionBuilder",
+    keyword: str,
+    message: str,
+    schema_arg: Any,
+    *expressions: str,
+) -> str:
+    """Source reporting that *keyword* failed, with *message* formatted with
+    the values of *expressions*."""
+    return "    retval = _report({}, keyword={!r}) and retval".format(
+        ", ".join((repr(message), "data", builder.constant(schema_arg)) + expressions),
+        keyword,
+    )
+
+
+def _inline_type(builder: "_FunctionBuilder", schema_type: Any, keywords) -> Any:
+    if type(schema_type) is not str or schema_type not in _TYPE_CHECKS:
+        return None
+    condition, message = _TYPE_CHECKS[schema_type]
+    return ["if {}:".format(condition), _report(builder, "type", message, schema_type)]
+
+
+def _inline_length(keyword: str, operator: str, template: str):
+    def inline(builder: "_FunctionBuilder", length: Any, keywords) -> Any:
+        if not _is_int(length):
+            return None
+        return [
+            "if isinstance(data, str) and len(data) {} {!r}:".format(operator, length),
+            _report(builder, keyword, template, length, "len(data)", repr(length)),
+        ]
+
+    return inline
+
+
+def _inline_pattern(builder: "_FunctionBuilder", pattern: Any, keywords) -> Any:
+    if type(pattern) is not str:
+        return None
+    searcher = _pattern_searcher(pattern)
+    if searcher is None:
+        return None
+    return [
+        "if isinstance(data, str) and not {}(data):".format(builder.constant(searcher)),
+        _report(
+            builder,
+            "pattern",
+            "The string '{}' did not match the pattern '{}'",
+            pattern,
+            "data",
+            builder.constant(pattern),
+        ),
+    ]
+
+
+def _inline_bound(greater: bool):
+    def inline(builder: "_FunctionBuilder", value: Any, keywords) -> Any:
+        exclusive = keywords.get("exclusive", False)
+        if not _is_number(value) or (exclusive is not True and exclusive is not False):
+            return None
+        keyword = "maximum" if greater else "minimum"
+        if greater:
+            operator = ">=" if exclusive else ">"
+            template = "The value {} is greater than the maximum {}"
+        else:
+            operator = "<=" if exclusive else "<"
+            template = "The value {} is less than the minimum {}"
+        return [
+            "if isinstance(data, (int, float)) and data {} {!r}:".format(
+                operator, value
+            ),
+            _report(builder, keyword, template, value, "data", repr(value)),
+        ]
+
+    return inline
+
+
+def _inline_count(keyword: str, operator: str, template: str):
+    def inline(builder: "_FunctionBuilder", limit: Any, keywords) -> Any:
+        if not _is_int(limit):
+            return None
+        return [
+            "if len(data) {} {!r}:".format(operator, limit),
+            _report(builder, keyword, template, limit, "len(data)", repr(limit)),
+        ]
+
+    return inline
+
+
+def _inline_required(builder: "_FunctionBuilder", required: Any, keywords) -> Any:
+    if type(required) is not list or not required:
+        return None
+    if not all(type(name) is str for name in required):
+        return None
+    # The interpreter stops at the first missing property, hence the elifs.
+    lines = []
+    for idx, name in enumerate(required):
+        lines.append("{} {!r} not in data:".format("if" if idx == 0 else "elif", name))
+        lines.append(
+            _report(
+                builder,
+                "required",
+                "The '{}' property is required but was missing",
+                required,
+                repr(name),
+            )
+        )
+    return lines
+
+
+# Strings are their own canonical form, so skip the call for them.
+_CANONICAL_DATA = "(data if type(data) is str else _canonical_json(data))"
+
+
+def _inline_enum(builder: "_FunctionBuilder", values: Any, keywords) -> Any:
+    if type(values) is not list:
+        return None
+    allowed = builder.validator._canonical_enum(values)
+    return [
+        "if {} not in {}:".format(_CANONICAL_DATA, builder.constant(allowed)),
+        _report(
+            builder,
+            "enum",
+            "The value '{}' was not in the enumerated list of allowed values",
+            values,
+            "data",
+        ),
+    ]
+
+
+def _inline_const(builder: "_FunctionBuilder", value: Any, keywords) -> Any:
+    expected = builder.validator._canonical_value(value)
+    return [
+        "if {} != {}:".format(_CANONICAL_DATA, builder.constant(expected)),
+        _report(
+            builder,
+            "const",
+            "The data value '{}' was not the const value '{}'",
+            value,
+            "data",
+            builder.constant(value),
+        ),
+    ]
+
+
+_INLINERS: Dict[Any, Inliner] = {
+    Draft4Validator._validate_type: _inline_type,
+    Draft4Validator._validate_minlength: _inline_length(
+        "minLength", "<", "The data length {} was less than the minimum {}"
+    ),
+    Draft4Validator._validate_maxlength: _inline_length(
+        "maxLength", ">", "Length of '{}' is more than maximum {}"
+    ),
+    Draft4Validator._validate_pattern: _inline_pattern,
+    Draft4Validator._validate_maximum: _inline_bound(greater=True),
+    Draft4Validator._validate_minimum: _inline_bound(greater=False),
+    Draft4Validator._validate_maxitems: _inline_count(
+        "maxItems", ">", "There were more items {} than the maximum {}"
+    ),
+    Draft4Validator._validate_minitems: _inline_count(
+        "minItems", "<", "There were fewer items {} than the minimum {}"
+    ),
+    Draft4Validator._validate_maxproperties: _inline_count(
+        "maxProperties", ">", "There are too many properties {} on the object"
+    ),
+    Draft4Validator._validate_minproperties: _inline_count(
+        "minProperties", "<", "There are too few properties {} on the object"
+    ),
+    Draft4Validator._validate_required: _inline_required,
+    Draft4Validator._validate_enum: _inline_enum,
+    Draft6Validator._validate_const: _inline_const,
+}
+
+
+class _FunctionBuilder(object):
+    """Accumulates the source and namespace of one generated function."""
+
+    def __init__(self, validator: Draft4Validator, name: str):
+        self.validator = validator
+        self.name = name
+        self.namespace: Dict[str, Any] = {
+            "_report": validator._report_validation_error,
+            "_canonical_json": canonical_json,
+        }
+        self.lines: List[str] = ["def {}(data):".format(name), "    retval = True"]
+
+    def constant(self, value: Any) -> str:
+        """Bind *value* into the function's namespace and return its name."""
+        name = "_c{}".format(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def emit(self, lines: List[str], indent: int = 1) -> None:
+        self.lines.extend("    " * indent + line for line in lines)
+
+    def emit_step(self, step: Step, indent: int = 1) -> None:
+        func, arg = step
+        keywords: Dict[str, Any] = {}
+        target = func
+        if isinstance(func, partial) and not func.args:
+            keywords = func.keywords
+            target = func.func
+        inliner = _INLINERS.get(getattr(target, "__func__", None))
+        lines = inliner(self, arg, keywords) if inliner is not None else None
+        if lines is None:
+            lines = [
+                "retval = {}(data, {}) and retval".format(
+                    self.constant(func), self.constant(arg)
+                )
+            ]
+        self.emit(lines, indent)
+
+    def emit_guarded(self, guard: str, steps: List[Step]) -> None:
+        if steps:
+            self.emit([guard])
+            for step in steps:
+                self.emit_step(step, indent=2)
+
+    def build(self) -> Callable[[JsonTypes], bool]:
+        self.emit(["return retval"])
+        code = compile(self.source, "<jacobsjsonschema {}>".format(self.name), "exec")
+        exec(code, self.namespace)
+        return self.namespace[self.name]
+
+    @property
+    def source(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def generate_evaluator(validator: Draft4Validator, node: SchemaNode) -> None:
+    """Replace ``node.evaluate`` with a generated, specialised function."""
+    builder = _FunctionBuilder(validator, "node_{}".format(id(node)))
+    if node.reference is not None:
+        func, arg = node.reference
+        builder.emit(
+            [
+                "retval = {}(data, {})".format(
+                    builder.constant(func), builder.constant(arg)
+                )
+            ]
+        )
+    if not node.reference_only:
+        for step in node.generic:
+            builder.emit_step(step)
+        builder.emit_guarded("if isinstance(data, list):", node.array_steps)
+        builder.emit_guarded("if isinstance(data, dict):", node.object_steps)
+        builder.emit_guarded("if not isinstance(data, (list, dict)):", node.value_steps)
+    for after in node.after:
+        builder.emit(["retval = {}(data, retval)".format(builder.constant(after))])
+    node.evaluate = builder.build()
+    node.source = builder.source
@@ -0,0 +1,263 @@
+"""Ahead-of-time compilation of schemas into trees of :class:`SchemaNode`.
+
+The interpreted path (``Validator._validate``) scans every dispatch dict with
+``if k in schema`` and walks the ``super()._validate`` chain of each dialect for
+every node it visits.  Compiling does that work once per subschema: each node
+keeps only the keyword checks that are actually present, in the same order the
+interpreter would run them, with their schema arguments already bound.
+
+The checks themselves are the validator's own ``_validate_*`` methods, so a
+compiled validator reports exactly the same results and errors as an
+interpreted one.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .bool_compare_util import canonical_json
+from .json_types import JsonTypes
+
+# A keyword check: called as ``func(data, arg)``.
+Step = Tuple[Callable[..., Any], Any]
+# A check that runs after the others and sees their combined result:
+# called as ``func(data, retval)``.
+AfterStep = Callable[[JsonTypes, bool], bool]
+
+# Keywords (across all supported dialects) whose value is a single subschema.
+SUBSCHEMA_KEYWORDS = (
+    "not",
+    "items",
+    "additionalItems",
+    "additionalProperties",
+    "contains",
+    "propertyNames",
+    "if",
+    "then",
+    "else",
+    "unevaluatedItems",
+    "unevaluatedProperties",
+)
+# Keywords whose value is a list of subschemas.
+SUBSCHEMA_LIST_KEYWORDS = ("allOf", "anyOf", "oneOf", "items", "prefixItems")
+# Keywords whose value maps names to subschemas.
+SUBSCHEMA_MAP_KEYWORDS = (
+    "properties",
+    "patternProperties",
+    "dependencies",
+    "dependentSchemas",
+    "definitions",
+    "$defs",
+)
+# Applicators that evaluate the same instance as the schema they appear in.
+IN_PLACE_KEYWORDS = (
+    "allOf",
+    "anyOf",
+    "oneOf",
+    "not",
+    "if",
+    "then",
+    "else",
+    "dependentSchemas",
+)
+# Keywords that read the annotations collected for their instance.
+ANNOTATION_CONSUMERS = ("unevaluatedProperties", "unevaluatedItems")
+# Reference targets with at most this many keyword checks are inlined into
+# the nodes referring to them.
+INLINE_REFERENCE_STEPS = 8
+
+
+class SchemaNode(object):
+    """A single subschema, compiled down to the keyword checks it uses.
+
+    ``generic`` steps run against every instance; ``array_steps``,
+    ``object_steps`` and ``value_steps`` run only against arrays, objects and
+    everything else respectively.  ``after`` steps run last and receive the
+    combined result so far (draft7 ``if`` short-circuits on it, for example).
+
+    ``evaluate`` runs the steps.  A backend may replace it with a specialised
+    function, such as one produced by :mod:`jacobsjsonschema.codegen`, whose
+    ``source`` is then kept alongside for inspection.
+    """
+
+    __slots__ = (
+        "schema",
+        "reference",
+        "reference_only",
+        "generic",
+        "array_steps",
+        "object_steps",
+        "value_steps",
+        "after",
+        "evaluate",
+        "source",
+    )
+
+    def __init__(self, schema: Any):
+        # Holding the schema keeps it alive, so its id() can key the node cache.
+        self.schema = schema
+        self.reference: Optional[Step] = None
+        self.reference_only = False
+        self.generic: List[Step] = []
+        self.array_steps: List[Step] = []
+        self.object_steps: List[Step] = []
+        self.value_steps: List[Step] = []
+        self.after: List[AfterStep] = []
+        self.evaluate: Callable[[JsonTypes], bool] = self.run_steps
+        self.source: Optional[str] = None
+
+    def step_count(self) -> int:
+        """The number of keyword checks, not counting references or ``after``."""
+        return (
+            len(self.generic)
+            + len(self.array_steps)
+            + len(self.object_steps)
+            + len(self.value_steps)
+        )
+
+    def run_steps(self, data: JsonTypes) -> bool:
+        retval = True
+        if self.reference is not None:
+            func, arg = self.reference
+            retval = func(data, arg)
+        if not self.reference_only:
+            for func, arg in self.generic:
+                retval = func(data, arg) and retval
+            if isinstance(data, list):
+                steps = self.array_steps
+            elif isinstance(data, dict):
+                steps = self.object_steps
+            else:
+                steps = self.value_steps
+            for func, arg in steps:
+                retval = func(data, arg) and retval
+        for after in self.after:
+            retval = after(data, retval)
+        return retval
+
+
+class Discriminator(object):
+    """Maps the value of one property to the ``anyOf``/``oneOf`` branches
+    that allow it.
+
+    Built for a list of branches which all pin the same property to a single
+    value (with ``const`` or a one-element ``enum``).  A branch can't match an
+    object whose value for the property differs from the pinned one, so only
+    the branches listed under the object's value need to be evaluated.
+    """
+
+    __slots__ = ("schemas", "property", "branches")
+
+    def __init__(
+        self, schemas: List[Any], property: str, branches: Dict[Any, List[Any]]
+    ):
+        self.schemas = schemas
+        self.property = property
+        # Keyed by the canonical form of the pinned value; each list keeps
+        # the branches in schema order.
+        self.branches = branches
+
+    def candidates(self, data: JsonTypes) -> List[Any]:
+        """Return the branches that may match *data*, in schema order."""
+        if isinstance(data, dict) and self.property in data:
+            return self.branches.get(canonical_json(data[self.property]), [])
+        return self.schemas
+
+
+def _children(node: Any) -> Iterator[Any]:
+    if not isinstance(node, dict):
+        return
+    for keyword in SUBSCHEMA_KEYWORDS:
+        if keyword in node and isinstance(node[keyword], (dict, bool)):
+            yield node[keyword]
+    for keyword in SUBSCHEMA_LIST_KEYWORDS:
+        if keyword in node and isinstance(node[keyword], list):
+            for s in node[keyword]:
+                if isinstance(s, (dict, bool)):
+                    yield s
+    for keyword in SUBSCHEMA_MAP_KEYWORDS:
+        if keyword in node and isinstance(node[keyword], dict):
+            for s in node[keyword].values():
+                if isinstance(s, (dict, bool)):
+                    yield s
+
+
+def _in_place_children(node: Any) -> Iterator[Any]:
+    if not isinstance(node, dict):
+        return
+    for keyword in IN_PLACE_KEYWORDS:
+        if keyword not in node:
+            continue
+        value = node[keyword]
+        if isinstance(value, list):
+            subschemas = value
+        elif keyword == "dependentSchemas" and isinstance(value, dict):
+            subschemas = list(value.values())
+        else:
+            subschemas = [value]
+        for s in subschemas:
+            if isinstance(s, (dict, bool)):
+                yield s
+
+
+def iter_subschemas(schema: Any) -> Iterator[Any]:
+    """Yield *schema* and every subschema reachable through applicator keywords.
+
+    Each object is yielded once, even if it is reachable along several paths.
+    """
+    seen = set()
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        yield node
+        stack.extend(_children(node))
+
+
+def find_observed_schemas(
+    schema: Any, resolve_reference: Callable[[Any], Any]
+) -> Optional[Tuple[Dict[int, Any], Dict[int, Any]]]:
+    """Find the subschemas whose annotations some ``unevaluated*`` keyword reads.
+
+    A schema's annotations are only ever read by ``unevaluatedProperties`` or
+    ``unevaluatedItems`` in that same schema, or in a schema that applies it
+    in place (through ``allOf``, ``$ref`` and so on).  Returns ``(reachable,
+    observed)``, both mapping ``id()`` to subschema: everything reachable
+    from *schema* (following references) and the part of it whose annotations
+    may be read.
+
+    *resolve_reference* returns the target of a reference, or ``None`` if the
+    schema isn't one.  If any target can't be known before validation it
+    should raise; the analysis then gives up and returns ``None``.
+    """
+    reachable: Dict[int, Any] = {}
+    targets: Dict[int, Any] = {}
+    stack = [schema]
+    try:
+        while stack:
+            node = stack.pop()
+            if id(node) in reachable:
+                continue
+            reachable[id(node)] = node
+            stack.extend(_children(node))
+            target = resolve_reference(node)
+            if target is not None:
+                targets[id(node)] = target
+                stack.append(target)
+    except Exception:
+        return None
+    observed: Dict[int, Any] = {}
+    stack = [
+        node
+        for node in reachable.values()
+        if isinstance(node, dict) and any(k in node for k in ANNOTATION_CONSUMERS)
+    ]
+    while stack:
+        node = stack.pop()
+        if id(node) in observed:
+            continue
+        observed[id(node)] = node
+        stack.extend(_in_place_children(node))
+        if id(node) in targets:
+            stack.append(targets[id(node)])
+    return reachable, observed
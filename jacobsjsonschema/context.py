@@ -0,0 +1,65 @@
+"""Per-thread state of the validation in progress.
+
+A validator's schema, dispatch dicts and compiled nodes don't change once
+it's built; everything that does change during a ``validate()`` call lives
+in a :class:`ValidationContext`.  Each thread gets its own context, so a
+single validator can be shared by any number of threads without locking.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .errors import ErrorRecord
+from .json_types import AnnotationFrame
+
+
+class ValidationContext(object):
+    """Errors, annotations and scope for the validation running on a thread.
+
+    ``reset()`` is called at the start of every top-level ``validate()``, so
+    nothing accumulates across calls.
+    """
+
+    __slots__ = (
+        "errors",
+        "error_groups",
+        "warnings",
+        "annotation_stack",
+        "last_frame",
+        "dynamic_scope",
+        "probing",
+        "probe_failed",
+    )
+
+    def __init__(self) -> None:
+        self.errors: List[ErrorRecord] = []
+        # With error aggregation, the records failures of further members of
+        # an array or object are counted in, by ErrorRecord.group_key().
+        self.error_groups: Dict[Tuple[Any, ...], ErrorRecord] = {}
+        self.warnings: List[str] = []
+        # One frame per validate() call currently on the stack, or None for
+        # a schema whose annotations nothing reads; empty between top-level
+        # calls.
+        self.annotation_stack: List[Optional[AnnotationFrame]] = []
+        self.last_frame: Optional[AnnotationFrame] = None
+        # Base URIs of the schema resources entered so far, for
+        # $dynamicRef/$recursiveRef resolution.
+        self.dynamic_scope: List[str] = []
+        # While probing, failed checks only set probe_failed.
+        self.probing = False
+        self.probe_failed = False
+
+    def reset(self) -> None:
+        # Fresh lists, so that results handed out for the previous call
+        # aren't cleared underneath the caller.
+        self.errors = []
+        self.error_groups = {}
+        self.warnings = []
+        self.last_frame = None
+
+
+class LocalContext(threading.local):
+    """Holds a separate :class:`ValidationContext` for each thread."""
+
+    def __init__(self) -> None:
+        self.context = ValidationContext()
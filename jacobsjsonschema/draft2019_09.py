@@ -1,5 +1,8 @@
-from typing import Optional, List, Union, Set
+from typing import Dict, FrozenSet, Optional, List, Sized, Union, Set
+from functools import partial
 
+from .compiler import AfterStep, Discriminator, Step, find_observed_schemas
+from .formats import DRAFT2019_09_FORMATS
 from .json_types import JsonTypes, AnnotationFrame
 from .draft4 import InvalidSchemaError, JsonSchemaValidationError
 from .draft7 import Validator as Draft7Validator
@@ -32,7 +35,9 @@ class Validator(Draft7Validator):
         self._active_keywords: Optional[Set[str]] = None
         self._init_vocabulary_filter()
 
-        self._warnings: List[str] = []
+        # anyOf lists that may stop at their first match; see
+        # _anyof_short_circuits().
+        self._anyof_lists: Optional[Dict[int, list]] = None
 
     def _init_vocabulary_filter(self) -> None:
         """Compute the active-keyword set from the root schema's ``$vocabulary``.
@@ -64,6 +69,9 @@ class Validator(Draft7Validator):
         """Return the vocabulary-URI → keyword-set mapping for this draft."""
         return DRAFT2019_09_VOCABULARIES
 
+    def _builtin_format_names(self) -> FrozenSet[str]:
+        return DRAFT2019_09_FORMATS
+
     def _reinit_vocabulary_filter(self) -> None:
         """Re-run vocabulary filtering (used by subclasses with a different vocab map)."""
         self._active_keywords = None
@@ -83,18 +91,21 @@ class Validator(Draft7Validator):
                 if kw not in active:
                     del d[kw]
 
+    def _is_anchor(self, schema: dict, name: str) -> bool:
+        return schema.get("$anchor") == name
+
     def _keyword_active(self, keyword: str) -> bool:
         """Return ``True`` if *keyword* is active per the vocabulary filter."""
         return self._active_keywords is None or keyword in self._active_keywords
 
     def get_warnings(self):
-        return self._warnings
+        return self._local.context.warnings
 
     def _report_format_warning(self, data, format):
         message = "String '{}' didn't conform to format {}".format(data, format)
         if hasattr(data, "line"):
             message = "Line {}: {}".format(data.line, message)
-        self._warnings.append(message)
+        self._local.context.warnings.append(message)
 
     def _validate_format(self, data: str, format: str) -> bool:
         """
@@ -113,29 +124,39 @@ class Validator(Draft7Validator):
         min_contains: int = 1,
         max_contains: Optional[int] = None,
     ) -> bool:
-        occurances = self._contains_count(data, schema)
+        return self._check_contains_count(
+            data, self._contains_count(data, schema), min_contains, max_contains
+        )
+
+    def _check_contains_count(
+        self,
+        data: Sized,
+        occurances: int,
+        min_contains: int = 1,
+        max_contains: Optional[int] = None,
+    ) -> bool:
         if max_contains is None:
             max_contains = occurances + 1
         retval = True
         if occurances < min_contains:
             retval = (
                 self._report_validation_error(
-                    "There were too few occurances {} in array that matched schema".format(
-                        occurances
-                    ),
+                    "There were too few occurances {} in array that matched schema",
                     data,
                     min_contains,
+                    occurances,
+                    keyword="contains",
                 )
                 and retval
             )
         if occurances > max_contains:
             retval = (
                 self._report_validation_error(
-                    "There were too many occurances {} in array that matched schema".format(
-                        occurances
-                    ),
+                    "There were too many occurances {} in array that matched schema",
                     data,
                     max_contains,
+                    occurances,
+                    keyword="maxContains",
                 )
                 and retval
             )
@@ -146,7 +167,10 @@ class Validator(Draft7Validator):
         if "contains" in schema:
             if not isinstance(data, list):
                 self._report_validation_error(
-                    "Cannot evaluate a 'contains' against a non-array", data, schema
+                    "Cannot evaluate a 'contains' against a non-array",
+                    data,
+                    schema,
+                    keyword="contains",
                 )
             else:
                 max_contains = (
@@ -161,108 +185,143 @@ class Validator(Draft7Validator):
                 )
         return retval
 
+    def _compile_array_steps(self, schema: dict) -> List[Step]:
+        steps = super()._compile_array_steps(schema)
+        if "contains" in schema:
+            max_contains = schema["maxContains"] if "maxContains" in schema else None
+            min_contains = schema["minContains"] if "minContains" in schema else 1
+            steps.append(
+                (
+                    partial(
+                        self._validate_contains,
+                        min_contains=min_contains,
+                        max_contains=max_contains,
+                    ),
+                    schema["contains"],
+                )
+            )
+        return steps
+
     # ------------------------------------------------------------------ #
     # Applicator overrides — merge child annotation frames into current   #
     # ------------------------------------------------------------------ #
 
+    def _anyof_short_circuits(self) -> Dict[int, list]:
+        """Return the ``anyOf`` lists that may stop at their first match.
+
+        Those are the ones whose annotations no ``unevaluatedProperties`` or
+        ``unevaluatedItems`` can see, keyed by ``id()``.  Worked out once, on
+        first use.
+        """
+        if self._anyof_lists is None:
+            # Built in full before it's published, as other threads may be
+            # reading it.
+            anyof_lists: Dict[int, list] = {}
+            found = find_observed_schemas(
+                self._root_schema, self._static_reference_target
+            )
+            if found is not None:
+                reachable, observed = found
+                for node_id, node in reachable.items():
+                    if node_id not in observed and isinstance(node, dict):
+                        if "anyOf" in node and isinstance(node["anyOf"], list):
+                            anyof_lists[id(node["anyOf"])] = node["anyOf"]
+                # A list shared with an observed schema needs every branch.
+                for node in observed.values():
+                    if isinstance(node, dict) and "anyOf" in node:
+                        anyof_lists.pop(id(node["anyOf"]), None)
+            self._anyof_lists = anyof_lists
+        return self._anyof_lists
+
     def _validate_allof(self, data: JsonTypes, schemas: list) -> bool:
         if not isinstance(schemas, list):
             raise InvalidSchemaError("allOf schema was not a list")
         retval = True
-        for schema in schemas:
-            retval = self.validate(data, schema) and retval
-            self._merge_last_frame()
+        try:
+            for idx, schema in enumerate(schemas):
+                if not self.validate(data, schema):
+                    retval = False
+                    self._locate_errors(None, "allOf", idx)
+                self._merge_last_frame()
+        except JsonSchemaValidationError as e:
+            self._locate_raised(e, None, "allOf", idx)
+            raise
         return retval
 
-    def _validate_anyof(self, data: JsonTypes, schemas: list) -> bool:
+    def _validate_anyof(
+        self,
+        data: JsonTypes,
+        schemas: list,
+        discriminator: Optional[Discriminator] = None,
+    ) -> bool:
         if not isinstance(schemas, list):
             raise InvalidSchemaError("anyOf schema was not a list")
+        # Unless an unevaluated* keyword can see this anyOf's annotations,
+        # the first matching branch settles it.
+        stop_at_match = self._anyof_short_circuits().get(id(schemas)) is schemas
         matched = False
-        for schema in schemas:
-            try:
-                self._temp_ignore_errors = True
-                if self.validate(data, schema):
-                    self._temp_ignore_errors = False
-                    self._merge_last_frame()
-                    matched = True
-            except InvalidSchemaError:
-                raise
-            except JsonSchemaValidationError:
-                self._last_frame = None
-            except Exception:
-                raise
-            finally:
-                self._temp_ignore_errors = False
+        branches = schemas if discriminator is None else discriminator.candidates(data)
+        for schema in branches:
+            if self._probe(data, schema):
+                self._merge_last_frame()
+                matched = True
+                if stop_at_match:
+                    break
+            else:
+                self._local.context.last_frame = None
         if not matched:
             return self._report_validation_error(
                 "The JSON data did not match any of the provided anyOf schemas",
                 data,
                 schemas,
+                keyword="anyOf",
             )
         return True
 
-    def _validate_oneof(self, data: JsonTypes, schemas: list) -> bool:
+    def _validate_oneof(
+        self,
+        data: JsonTypes,
+        schemas: list,
+        discriminator: Optional[Discriminator] = None,
+    ) -> bool:
         if not isinstance(schemas, list):
             raise InvalidSchemaError("oneOf schema was not a list")
         valid_count = 0
         matching_frame: Optional[AnnotationFrame] = None
-        for schema in schemas:
-            try:
-                self._temp_ignore_errors = True
-                if self.validate(data, schema):
-                    valid_count += 1
-                    matching_frame = self._last_frame
-                    self._last_frame = None
-            except InvalidSchemaError:
-                raise
-            except JsonSchemaValidationError:
-                pass
-            except Exception:
-                raise
-            finally:
-                self._temp_ignore_errors = False
+        branches = schemas if discriminator is None else discriminator.candidates(data)
+        for schema in branches:
+            if self._probe(data, schema):
+                valid_count += 1
+                matching_frame = self._local.context.last_frame
+            self._local.context.last_frame = None
+            if valid_count > 1:
+                # Further matches can't change the outcome.
+                break
         if valid_count != 1:
             return self._report_validation_error(
-                "The data matched against {} schemas but was required to match exactly 1".format(
-                    valid_count
-                ),
+                "The data matched against {} schemas but was required to match exactly 1",
                 data,
                 schemas,
+                valid_count,
+                keyword="oneOf",
             )
         # Merge the single matching branch's annotations
-        if matching_frame is not None and self._annotation_stack:
-            current = self._annotation_stack[-1]
-            current.evaluated_property_keys.update(
-                matching_frame.evaluated_property_keys
-            )
-            current.evaluated_item_indices.update(
-                matching_frame.evaluated_item_indices
-            )
+        current = self._annotation_frame()
+        if matching_frame is not None and current is not None:
+            current.merge(matching_frame)
         return True
 
     def _validate_not(self, data: JsonTypes, schema: dict) -> bool:
-        try:
-            self._temp_ignore_errors = True
-            if not self.validate(data, schema):
-                self._temp_ignore_errors = False
-                self._last_frame = None  # not produces no annotations
-                return True
-        except InvalidSchemaError:
-            raise
-        except JsonSchemaValidationError:
-            self._temp_ignore_errors = False
-            self._last_frame = None  # not produces no annotations
+        matched = self._probe(data, schema)
+        self._local.context.last_frame = None  # not produces no annotations
+        if not matched:
             return True
-        except Exception:
-            raise
-        else:
-            self._temp_ignore_errors = False
-            self._last_frame = None  # not produces no annotations
-            return self._report_validation_error(
-                "The data matched against the schema when it was not supposed to",
-                data,
-                schema,
-            )
+        return self._report_validation_error(
+            "The data matched against the schema when it was not supposed to",
+            data,
+            schema,
+            keyword="not",
+        )
 
     def _validate_if_then_else(
         self,
@@ -271,28 +330,21 @@ class Validator(Draft7Validator):
         then_schema: Optional[dict] = None,
         else_schema: Optional[dict] = None,
     ) -> bool:
-        try:
-            self.validate(data, if_schema)
-        except InvalidSchemaError:
-            raise
-        except JsonSchemaValidationError:
-            # if didn't match — collect from else
-            if else_schema is not None:
-                result = self.validate(data, else_schema)
-                self._merge_last_frame()
-                return result
-            self._last_frame = None
-            return True
-        except Exception:
-            raise
-        else:
+        if self._probe(data, if_schema):
             # if matched — collect from if AND then
             self._merge_last_frame()
             if then_schema is not None:
-                result = self.validate(data, then_schema)
+                result = self._validate_branch(data, then_schema, "then")
                 self._merge_last_frame()
                 return result
             return True
+        # if didn't match — collect from else
+        self._local.context.last_frame = None
+        if else_schema is not None:
+            result = self._validate_branch(data, else_schema, "else")
+            self._merge_last_frame()
+            return result
+        return True
 
     def _validate_dependency(
         self, data: dict, required: Union[list, dict]
@@ -305,11 +357,18 @@ class Validator(Draft7Validator):
                         retval = self._report_validation_error(
                             "For the {} property, false schema invalidates data",
                             requirement,
+                            keyword="dependentSchemas",
                         )
                 elif isinstance(consequence, list):
                     retval = self._validate_required(data, consequence) and retval
                 elif isinstance(consequence, dict):
-                    retval = self.validate(data, consequence) and retval
+                    try:
+                        if not self.validate(data, consequence):
+                            retval = False
+                            self._locate_errors(None, "dependentSchemas", requirement)
+                    except JsonSchemaValidationError as e:
+                        self._locate_raised(e, None, "dependentSchemas", requirement)
+                        raise
                     self._merge_last_frame()
                 else:
                     return InvalidSchemaError(
@@ -326,7 +385,8 @@ class Validator(Draft7Validator):
     ) -> bool:
         if not isinstance(data, dict):
             return True
-        if not self._annotation_stack:
+        frame = self._annotation_frame()
+        if frame is None:
             return True
 
         # Collect evaluated keys ONLY from the current (top) frame.
@@ -343,25 +403,35 @@ class Validator(Draft7Validator):
         # of a parent allOf/anyOf/oneOf) — those are merged into the PARENT
         # frame, not the current one.  Looking at ancestor frames would
         # incorrectly expose cousin annotations.
-        evaluated_keys: set = set()
-        evaluated_keys.update(self._annotation_stack[-1].evaluated_property_keys)
-
         retval = True
+        failures = 0
+        max_failures = self._max_errors_per_location
         for key in data:
-            if key not in evaluated_keys:
+            if not frame.has_property(key):
                 # Record this key as evaluated by unevaluatedProperties
                 # so that parent schemas can see it via annotation merging.
-                self._record_evaluated_property(key)
-                if not self.validate(data[key], schema):
+                frame.add_property(key)
+                try:
+                    valid = self.validate(data[key], schema)
+                except JsonSchemaValidationError as e:
+                    self._locate_raised(e, key, "unevaluatedProperties")
+                    raise
+                if not valid:
+                    self._locate_errors(key, "unevaluatedProperties")
                     retval = (
                         self._report_validation_error(
                             "Property '{}' is unevaluated and didn't match "
-                            "the unevaluatedProperties schema".format(key),
+                            "the unevaluatedProperties schema",
                             data[key],
                             schema,
+                            key,
+                            keyword="unevaluatedProperties",
                         )
                         and retval
                     )
+                    failures += 1
+                    if failures == max_failures:
+                        break
         return retval
 
     def _object_validate(self, data: dict, schema: dict) -> bool:
@@ -378,31 +448,72 @@ class Validator(Draft7Validator):
     ) -> bool:
         if not isinstance(data, list):
             return True
-        if not self._annotation_stack:
+        frame = self._annotation_frame()
+        if frame is None:
             return True
 
         # Collect evaluated indices ONLY from the current (top) frame.
         # See _validate_unevaluated_properties for the rationale: ancestor
         # frames contain cousin annotations that must not be visible here.
-        evaluated_indices: set = set()
-        evaluated_indices.update(self._annotation_stack[-1].evaluated_item_indices)
-
         retval = True
+        failures = 0
+        max_failures = self._max_errors_per_location
         for idx, item in enumerate(data):
-            if idx not in evaluated_indices:
-                self._record_evaluated_item(idx)
-                if not self.validate(item, schema):
+            if not frame.has_item(idx):
+                frame.add_item(idx)
+                try:
+                    valid = self.validate(item, schema)
+                except JsonSchemaValidationError as e:
+                    self._locate_raised(e, idx, "unevaluatedItems")
+                    raise
+                if not valid:
+                    self._locate_errors(idx, "unevaluatedItems")
                     retval = (
                         self._report_validation_error(
                             "Item at index {} is unevaluated and didn't match "
-                            "the unevaluatedItems schema".format(idx),
+                            "the unevaluatedItems schema",
                             item,
                             schema,
+                            idx,
+                            keyword="unevaluatedItems",
                         )
                         and retval
                     )
+                    failures += 1
+                    if failures == max_failures:
+                        break
         return retval
 
+    def _compile_after_steps(self, schema: dict) -> List[AfterStep]:
+        steps = super()._compile_after_steps(schema)
+        if "unevaluatedProperties" in schema:
+            unevaluated_properties = schema["unevaluatedProperties"]
+
+            def check_unevaluated_properties(data: JsonTypes, retval: bool) -> bool:
+                if isinstance(data, dict):
+                    return (
+                        self._validate_unevaluated_properties(
+                            data, unevaluated_properties
+                        )
+                        and retval
+                    )
+                return retval
+
+            steps.append(check_unevaluated_properties)
+        if "unevaluatedItems" in schema:
+            unevaluated_items = schema["unevaluatedItems"]
+
+            def check_unevaluated_items(data: JsonTypes, retval: bool) -> bool:
+                if isinstance(data, list):
+                    return (
+                        self._validate_unevaluated_items(data, unevaluated_items)
+                        and retval
+                    )
+                return retval
+
+            steps.append(check_unevaluated_items)
+        return steps
+
     def _validate(self, data: JsonTypes, schema: Union[dict, bool]) -> bool:
         retval = super()._validate(data, schema)
         # super()._validate is draft7._validate which handles if/then/else.
@@ -1,3 +1,7 @@
+from typing import List, Optional, Union
+from functools import partial
+
+from .compiler import Step
 from .draft4 import InvalidSchemaError, JsonSchemaValidationError
 from .draft2019_09 import Validator as Draft201909Validator
 from .vocabularies import DRAFT2020_12_VOCABULARIES
@@ -14,6 +18,113 @@ class Validator(Draft201909Validator):
         """Return the 2020-12 vocabulary-URI → keyword-set mapping."""
         return DRAFT2020_12_VOCABULARIES
 
+    def _is_anchor(self, schema: dict, name: str) -> bool:
+        return schema.get("$anchor") == name or schema.get("$dynamicAnchor") == name
+
+    def _validate_prefix_items(self, data: list, prefix: list) -> bool:
+        # prefixItems — positional tuple validation (was array `items` pre-2020).
+        if not isinstance(prefix, list):
+            raise InvalidSchemaError("prefixItems must be an array of schemas")
+        retval = True
+        for idx in range(min(len(data), len(prefix))):
+            try:
+                if not self.validate(data[idx], prefix[idx]):
+                    retval = False
+                    self._locate_errors(idx, "prefixItems", idx)
+            except JsonSchemaValidationError as e:
+                self._locate_raised(e, idx, "prefixItems", idx)
+                raise
+            self._record_evaluated_item(idx)
+        return retval
+
+    def _validate_items_from(
+        self, data: list, items_schema: Union[dict, bool], prefix_len: int = 0
+    ) -> bool:
+        # items — a single subschema applied to every index at or after
+        # prefixItems (an array here is a pre-2020 construct and is invalid).
+        if isinstance(items_schema, list):
+            raise InvalidSchemaError(
+                "In draft 2020_12, 'items' can no longer be an array. "
+                "Use 'prefixItems' instead"
+            )
+        retval = True
+        failures = 0
+        max_failures = self._max_errors_per_location
+        try:
+            for idx in range(prefix_len, len(data)):
+                if not self.validate(data[idx], items_schema):
+                    retval = False
+                    self._locate_errors(idx, "items")
+                    failures += 1
+                    if failures == max_failures:
+                        break
+        except JsonSchemaValidationError as e:
+            self._locate_raised(e, idx, "items")
+            raise
+        frame = self._annotation_frame()
+        if frame is not None:
+            frame.add_items(prefix_len, len(data))
+        return retval
+
+    def _validate_contains_annotated(
+        self,
+        data: list,
+        contains_schema: dict,
+        min_contains: int = 1,
+        max_contains: Optional[int] = None,
+    ) -> bool:
+        # Every item matching `contains` is an evaluated item (2020-12
+        # annotation behaviour), so unevaluatedItems can see them.
+        occurances = 0
+        frame = self._annotation_frame()
+        for idx, item in enumerate(data):
+            if self._probe(item, contains_schema):
+                if frame is not None:
+                    frame.add_item(idx)
+                occurances += 1
+        return self._check_contains_count(data, occurances, min_contains, max_contains)
+
+    def _prefix_length(self, schema: dict) -> int:
+        if "prefixItems" in schema and self._keyword_active("prefixItems"):
+            prefix = schema["prefixItems"]
+            if isinstance(prefix, list):
+                return len(prefix)
+        return 0
+
+    def _compile_array_steps(self, schema: dict) -> List[Step]:
+        steps: List[Step] = []
+        if "prefixItems" in schema and self._keyword_active("prefixItems"):
+            steps.append((self._validate_prefix_items, schema["prefixItems"]))
+        if "items" in schema and self._keyword_active("items"):
+            steps.append(
+                (
+                    partial(
+                        self._validate_items_from,
+                        prefix_len=self._prefix_length(schema),
+                    ),
+                    schema["items"],
+                )
+            )
+        if "contains" in schema and self._keyword_active("contains"):
+            max_contains = schema["maxContains"] if "maxContains" in schema else None
+            min_contains = schema["minContains"] if "minContains" in schema else 1
+            steps.append(
+                (
+                    partial(
+                        self._validate_contains_annotated,
+                        min_contains=min_contains,
+                        max_contains=max_contains,
+                    ),
+                    schema["contains"],
+                )
+            )
+        steps.extend(
+            (func, schema[k])
+            for k, func in self.array_validators.items()
+            if k in schema
+        )
+        return steps
+
     def _array_validate(self, data: list, schema: dict) -> bool:  # type: ignore[override]
         # 2020-12 array semantics differ enough from 2019-09/draft4 that we
         # implement them directly here rather than delegating to super():
@@ -21,47 +132,22 @@ class Validator(Draft201909Validator):
         # (draft4._array_validate handles the removed `additionalItems` keyword
         # and array-form `items`, neither of which applies in 2020-12.)
         retval = True
-        prefix_len = 0
-        # prefixItems — positional tuple validation (was array `items` pre-2020).
         if "prefixItems" in schema and self._keyword_active("prefixItems"):
-            prefix = schema["prefixItems"]
-            if not isinstance(prefix, list):
-                raise InvalidSchemaError("prefixItems must be an array of schemas")
-            prefix_len = len(prefix)
-            for idx in range(min(len(data), prefix_len)):
-                retval = self.validate(data[idx], prefix[idx]) and retval
-                self._record_evaluated_item(idx)
-        # items — a single subschema applied to every index at or after
-        # prefixItems (an array here is a pre-2020 construct and is invalid).
+            retval = self._validate_prefix_items(data, schema["prefixItems"]) and retval
         if "items" in schema and self._keyword_active("items"):
-            items_schema = schema["items"]
-            if isinstance(items_schema, list):
-                raise InvalidSchemaError(
-                    "In draft 2020_12, 'items' can no longer be an array. "
-                    "Use 'prefixItems' instead"
+            retval = (
+                self._validate_items_from(
+                    data, schema["items"], self._prefix_length(schema)
                 )
-            for idx in range(prefix_len, len(data)):
-                retval = self.validate(data[idx], items_schema) and retval
-                self._record_evaluated_item(idx)
+                and retval
+            )
         # contains / minContains / maxContains
         if "contains" in schema and self._keyword_active("contains"):
-            contains_schema = schema["contains"]
-            # Every item matching `contains` is an evaluated item (2020-12
-            # annotation behaviour), so unevaluatedItems can see them.
-            for idx, item in enumerate(data):
-                self._temp_ignore_errors = True
-                try:
-                    if self.validate(item, contains_schema):
-                        self._record_evaluated_item(idx)
-                except JsonSchemaValidationError:
-                    pass
-                finally:
-                    self._temp_ignore_errors = False
             max_contains = schema["maxContains"] if "maxContains" in schema else None
             min_contains = schema["minContains"] if "minContains" in schema else 1
             retval = (
-                self._validate_contains(
-                    data, contains_schema, min_contains, max_contains
+                self._validate_contains_annotated(
+                    data, schema["contains"], min_contains, max_contains
                 )
                 and retval
             )
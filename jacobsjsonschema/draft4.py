@@ -1,14 +1,38 @@
-from typing import Union, List, Dict, Optional, Callable, Set, Any
-
-import re
-
-try:
-    import regex as _regex  # type: ignore[import-untyped]
-except ImportError:  # pragma: no cover
-    _regex = None  # type: ignore[assignment]
-
-from .bool_compare_util import replace_bools_for_comparison
+from typing import (
+    Union,
+    List,
+    Dict,
+    Optional,
+    Callable,
+    Set,
+    Any,
+    Collection,
+    Iterable,
+    FrozenSet,
+    Sized,
+    Tuple,
+)
+from functools import partial
+
+from .bool_compare_util import canonical_json
+from .batch import BatchResult
+from .context import LocalContext, ValidationContext
+from .errors import ErrorRecord
+from .formats import DRAFT4_FORMATS, FORMAT_CHECKERS
+from .compiler import (
+    INLINE_REFERENCE_STEPS,
+    SchemaNode,
+    Step,
+    AfterStep,
+    Discriminator,
+    find_observed_schemas,
+    iter_subschemas,
+)
 from .json_types import JsonTypes, AnnotationFrame
+from .key_classifier import KeyClassifier
+from .regex_cache import pattern_cache
+from .pointer import resolve_pointer
+from .registry import ReferenceRegistry
 
 
 def _pattern_search(pattern: str, string: str):
@@ -16,19 +40,23 @@ def _pattern_search(pattern: str, string: str):
 
     JSON Schema patterns are ECMA-262 regexes, which permit constructs such as
     ``\\p{Letter}`` (unicode property escapes) that Python's ``re`` cannot
-    compile.  Fall back to the ``regex`` module (installed as a dependency) for
-    those cases; ``re`` handles everything else.
+    compile.  The shared :data:`~jacobsjsonschema.regex_cache.pattern_cache`
+    falls back to the ``regex`` module (installed as a dependency) for those
+    cases, and remembers which engine each pattern needs.
     """
-    try:
-        return re.search(pattern, string)
-    except re.error:
-        if _regex is not None:
-            return _regex.search(pattern, string)
-        raise
+    return pattern_cache.search(pattern, string)
 
 
 class JsonSchemaValidationError(Exception):
-    pass
+    def __init__(self, message: str, error: Optional[ErrorRecord] = None):
+        super().__init__(message)
+        # Where the error was found; filled in as the exception propagates.
+        self.error = error
+
+
+class ErrorLimitReached(JsonSchemaValidationError):
+    """Raised in lazy error reporting mode to stop validating once the error
+    limit is reached; ``validate()`` returns ``False`` for it."""
 
 
 class InvalidSchemaError(Exception):
@@ -38,7 +66,7 @@ class InvalidSchemaError(Exception):
 class Validator(object):
 
     def __init__(self, schema: dict, lazy_error_reporting=False):
-        self.generic_validators = {
+        self.generic_validators: Dict[str, Callable[..., bool]] = {
             "type": self._validate_type,
             "anyOf": self._validate_anyof,
             "allOf": self._validate_allof,
@@ -46,19 +74,19 @@ class Validator(object):
             "not": self._validate_not,
             "enum": self._validate_enum,
         }
-        self.value_validators = {
+        self.value_validators: Dict[str, Callable[..., bool]] = {
             "minLength": self._validate_minlength,
             "maxLength": self._validate_maxlength,
             "pattern": self._validate_pattern,
             "format": self._validate_format,
             "multipleOf": self._validate_multipleof,
         }
-        self.array_validators = {
+        self.array_validators: Dict[str, Callable[..., bool]] = {
             "maxItems": self._validate_maxitems,
             "minItems": self._validate_minitems,
             "uniqueItems": self._validate_uniqueitems,
         }
-        self.object_validators = {
+        self.object_validators: Dict[str, Callable[..., bool]] = {
             "properties": self._validate_properties,
             "patternProperties": self._validate_pattern_properties,
             "required": self._validate_required,
@@ -69,18 +97,26 @@ class Validator(object):
         self._format_validators: Dict[str, Callable[..., bool]] = {
             "date-time": self._is_format_datetime,
         }
+        # What _custom_formats_key() returns; None until worked out, and
+        # whenever the formats change.
+        self._formats_key: Optional[FrozenSet[Tuple[str, int]]] = None
         self._root_schema = schema
         self._file_loader: Optional[Callable[[str], dict]] = None
-        self._temp_ignore_errors = False
+        # Documents referenced by a remote string $ref, and their validators.
+        self._registry = ReferenceRegistry()
+        # Subschemas of the root schema, keyed by JSON pointer.
+        self._pointer_targets: Dict[str, Any] = {}
         self._lazy_error_reporting = lazy_error_reporting
-        self._errors: List[str] = []
-        self._annotation_stack: List[AnnotationFrame] = []
-        self._last_frame: Optional[AnnotationFrame] = None
-        # Dynamic-scope stack for $dynamicRef/$recursiveRef resolution.
-        # The validator pushes each schema resource's base URI as it enters
-        # it during validation, giving the doc-loader's resolve_in_scope()
-        # method the runtime scope chain it needs.
-        self._dynamic_scope: List[str] = []
+        # Bounds on the errors collected in lazy mode; see set_error_limits().
+        self._max_errors: Optional[int] = None
+        self._max_errors_per_location: Optional[int] = None
+        # With error aggregation, how many locations each record keeps;
+        # None when errors aren't aggregated.
+        self._aggregated_locations: Optional[int] = None
+        # Errors, annotation frames and the dynamic scope of the validation
+        # in progress; thread-local, so the validator itself is never
+        # modified by validate().
+        self._local = LocalContext()
         # When True, a resolved $ref is validated *alongside* its sibling
         # keywords (2019-09+ behavior).  When False (draft4/6/7), the
         # resolved $ref replaces the entire schema node.
@@ -88,23 +124,75 @@ class Validator(object):
         # Reference keywords this dialect recognises.  Subclasses extend
         # this set (e.g. draft2019-09 adds "$recursiveRef").
         self._ref_keywords: Set[str] = {"$ref"}
+        # Compiled nodes keyed by id() of their schema; None until compile().
+        self._compiled_nodes: Optional[Dict[int, SchemaNode]] = None
+        self._compile_backend: Optional[str] = None
+        self._generate_evaluator: Optional[Callable[[Any, SchemaNode], None]] = None
+        # id() of the schemas whose nodes are being compiled right now; a
+        # reference back to one of them is linked, never inlined.
+        self._compiling: Set[int] = set()
+        # patternProperties key classifiers, keyed by id() of the patterns.
+        self._key_classifiers: Dict[int, KeyClassifier] = {}
+        # Canonical forms of enum/const values, keyed by the keyword and id()
+        # of the value (which is kept alongside, so the id stays valid); the
+        # same list can be both an enum and a const.
+        self._canonical_values: Dict[Tuple[str, int], Tuple[Any, Any]] = {}
+        # Subschemas whose annotations no unevaluated* keyword reads, keyed
+        # by id(); None until worked out on first use.
+        self._untracked: Optional[Dict[int, Any]] = None
 
     @staticmethod
     def get_dollar_id_token() -> str:
         return "id"
 
     def get_errors(self) -> List[str]:
-        return self._errors
+        """Return the errors collected by the last ``validate()`` on this thread."""
+        return [str(error) for error in self._local.context.errors]
+
+    def get_error_records(self) -> List[ErrorRecord]:
+        """Return the errors of :meth:`get_errors` as :class:`ErrorRecord`
+        objects, whose messages haven't been formatted yet."""
+        return self._local.context.errors
+
+    def _annotation_frame(self) -> Optional[AnnotationFrame]:
+        """Return the current schema's frame, or ``None`` if its annotations
+        aren't tracked."""
+        annotation_stack = self._local.context.annotation_stack
+        return annotation_stack[-1] if annotation_stack else None
 
     def _record_evaluated_property(self, key: str) -> None:
         """Record that a property key was evaluated by the current schema."""
-        if self._annotation_stack:
-            self._annotation_stack[-1].evaluated_property_keys.add(key)
+        frame = self._annotation_frame()
+        if frame is not None:
+            frame.add_property(key)
 
     def _record_evaluated_item(self, index: int) -> None:
         """Record that an array item index was evaluated by the current schema."""
-        if self._annotation_stack:
-            self._annotation_stack[-1].evaluated_item_indices.add(index)
+        frame = self._annotation_frame()
+        if frame is not None:
+            frame.add_item(index)
+
+    def _untracked_schemas(self) -> Dict[int, Any]:
+        """Return the subschemas that are evaluated without an annotation frame.
+
+        Those are the ones reachable from the root schema whose annotations no
+        ``unevaluatedProperties`` or ``unevaluatedItems`` can read (always all
+        of them before draft 2019-09), keyed by ``id()``.  Worked out once, on
+        first use; if references can't be followed before validation, every
+        schema is tracked.
+        """
+        if self._untracked is None:
+            untracked: Dict[int, Any] = {}
+            found = find_observed_schemas(
+                self._root_schema, self._static_reference_target
+            )
+            if found is not None:
+                reachable, observed = found
+                for node_id, node in reachable.items():
+                    if node_id not in observed:
+                        untracked[node_id] = node
+            self._untracked = untracked
+        return self._untracked
 
     def _merge_last_frame(self) -> None:
         """Merge the last completed frame into the current top-of-stack frame.
@@ -112,80 +200,551 @@ class Validator(object):
         Used by applicators (allOf, anyOf, etc.) to propagate annotations
         from child schemas into the parent schema's frame.
         """
-        if self._last_frame is not None and self._annotation_stack:
-            current = self._annotation_stack[-1]
-            current.evaluated_property_keys.update(
-                self._last_frame.evaluated_property_keys
-            )
-            current.evaluated_item_indices.update(
-                self._last_frame.evaluated_item_indices
-            )
-        self._last_frame = None
+        context = self._local.context
+        current = self._annotation_frame()
+        if context.last_frame is not None and current is not None:
+            current.merge(context.last_frame)
+        context.last_frame = None
 
     def add_format(
         self, name: str, validator_func: Callable[[Union[str, int, float]], bool]
     ):
+        """Check the *name* format with *validator_func*, which returns
+        whether a value conforms.
+
+        A value that doesn't is reported like any other failing keyword: an
+        exception, or in lazy mode an error (counted towards the error
+        limits).  From draft 2019-09 on, it's reported as a warning.
+        """
         self._format_validators[name] = validator_func
+        self._formats_key = None
+
+    def use_builtin_formats(self) -> "Validator":
+        """Check the formats this dialect defines with the checks in
+        :mod:`jacobsjsonschema.formats`.
+
+        Formats added with ``add_format`` are kept.  From draft 2019-09 on, a
+        string that doesn't conform is reported as a warning rather than an
+        error, as for any format.  Returns the validator, so this can be
+        chained onto the constructor.
+        """
+        for name in self._builtin_format_names():
+            current = self._format_validators.get(name)
+            if current is None or getattr(current, "__self__", None) is self:
+                self._format_validators[name] = FORMAT_CHECKERS[name]
+        self._formats_key = None
+        return self
+
+    def _builtin_format_names(self) -> FrozenSet[str]:
+        """Return the names of the formats this dialect defines."""
+        return DRAFT4_FORMATS
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickled as what's needed to build an equivalent validator: bound
+        # methods, compiled nodes and the thread-local context are recreated
+        # by __setstate__ rather than pickled.
+        return {
+            "schema": self._root_schema,
+            "lazy_error_reporting": self._lazy_error_reporting,
+            "formats": self._custom_formats(),
+            "file_loader": self._file_loader,
+            "compile_backend": self._compile_backend,
+            "error_limits": (self._max_errors, self._max_errors_per_location),
+            "aggregated_locations": self._aggregated_locations,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["schema"], state["lazy_error_reporting"])  # type: ignore[misc]
+        self._format_validators.update(state["formats"])
+        self._formats_key = None
+        self._file_loader = state["file_loader"]
+        self.set_error_limits(*state["error_limits"])
+        self._aggregated_locations = state["aggregated_locations"]
+        if state["compile_backend"] is not None:
+            self.compile(state["compile_backend"])
+
+    def _custom_formats(self) -> Dict[str, Callable[..., bool]]:
+        """The formats added with ``add_format``, or overridden by it."""
+        return {
+            name: func
+            for name, func in self._format_validators.items()
+            if getattr(func, "__self__", None) is not self
+        }
+
+    def _custom_formats_key(self) -> FrozenSet[Tuple[str, int]]:
+        """Identify the formats of :meth:`_custom_formats`, by name and id()
+        of the check, for :class:`~jacobsjsonschema.registry.ReferenceRegistry`
+        keys."""
+        key = self._formats_key
+        if key is None:
+            key = self._formats_key = frozenset(
+                (name, id(func)) for name, func in self._custom_formats().items()
+            )
+        return key
 
     def set_file_loader(self, file_loader_func: Callable[[str], dict]):
         self._file_loader = file_loader_func
 
+    def set_error_limits(
+        self,
+        max_errors: Optional[int] = None,
+        max_errors_per_location: Optional[int] = None,
+    ) -> None:
+        """Bound the errors collected in lazy error reporting mode.
+
+        Validation stops once *max_errors* errors have been collected, and the
+        items of an array (or the properties of an object checked against
+        ``additionalProperties`` and the like) stop being checked once
+        *max_errors_per_location* of them have failed.  Documents are
+        rejected all the same; only the errors reported are cut short.
+        ``None`` means no limit.
+        """
+        for limit in (max_errors, max_errors_per_location):
+            if limit is not None and (not isinstance(limit, int) or limit < 1):
+                raise ValueError("Error limits must be positive integers")
+        self._max_errors = max_errors
+        self._max_errors_per_location = max_errors_per_location
+
+    def set_error_aggregation(self, enabled: bool = True, locations: int = 5) -> None:
+        """Collect the failures of an array's items (or an object's properties)
+        that fail the same keyword of the same subschema as one error.
+
+        The error's message is that of the first failure, followed by the
+        number of failures and the paths of the first *locations* of them;
+        see :class:`~jacobsjsonschema.errors.ErrorRecord`.  Only applies in
+        lazy error reporting mode.
+        """
+        if not isinstance(locations, int) or locations < 1:
+            raise ValueError("The number of locations must be a positive integer")
+        self._aggregated_locations = locations if enabled else None
+
+    def set_reference_registry(self, registry: ReferenceRegistry) -> None:
+        """Use *registry* for remote references, e.g. to share loaded
+        documents between validators or bound the number kept."""
+        self._registry = registry
+
+    def compile(self, backend: str = "closures") -> "Validator":
+        """Compile the schema so that later validations skip keyword dispatch.
+
+        Walks the schema once and builds a :class:`SchemaNode` per subschema
+        holding only the keyword checks it uses.  Results and errors are the
+        same as for the interpreted path.  Returns the validator, so this can be
+        chained onto the constructor.
+
+        *backend* selects how nodes are evaluated: ``"closures"`` runs the
+        prebuilt checks in a loop, ``"codegen"`` generates a specialised Python
+        function per node (see :mod:`jacobsjsonschema.codegen`).
+        """
+        self._compile_backend = backend
+        if backend == "closures":
+            self._generate_evaluator = None
+        elif backend == "codegen":
+            from .codegen import generate_evaluator
+
+            self._generate_evaluator = generate_evaluator
+        else:
+            raise ValueError("Unknown compile backend '{}'".format(backend))
+        self._compiled_nodes = {}
+        for subschema in iter_subschemas(self._root_schema):
+            self._compiled_node(subschema)
+        self._untracked_schemas()
+        return self
+
+    def _compiled_node(self, schema: Any) -> SchemaNode:
+        assert self._compiled_nodes is not None
+        node = self._compiled_nodes.get(id(schema))
+        if node is None:
+            # Subschemas the walk in compile() didn't reach (reference targets,
+            # mostly) are compiled the first time they're evaluated.
+            self._compiling.add(id(schema))
+            try:
+                node = self._compile_node(schema)
+            finally:
+                self._compiling.discard(id(schema))
+            if self._generate_evaluator is not None:
+                self._generate_evaluator(self, node)
+            self._compiled_nodes[id(schema)] = node
+        return node
+
+    def _compile_node(self, schema: Any) -> SchemaNode:
+        node = SchemaNode(schema)
+        target = None
+        if self._is_reference(schema):
+            target = self._compiled_reference_target(schema)
+            if target is not None:
+                # Resolved now, rather than on every evaluation.  The target's
+                # own node is looked up (or compiled) when the link is first
+                # followed, so recursive schemas link back without looping.
+                node.reference = (partial(self._apply_reference, target=target), schema)
+            else:
+                node.reference = (self._validate_reference, schema)
+            node.reference_only = (
+                not isinstance(schema, dict) or not self._reference_applies_siblings
+            )
+        if not isinstance(schema, dict):
+            if node.reference is None:
+                # Not a schema this dialect understands; let the interpreter
+                # deal with it so the outcome (even an exception) is the same.
+                node.generic.append((self._validate, schema))
+            elif target is not None:
+                self._inline_reference(node, target)
+            return node
+        node.generic = self._compile_generic_steps(schema)
+        node.array_steps = self._compile_array_steps(schema)
+        node.object_steps = self._compile_object_steps(schema)
+        node.value_steps = self._compile_value_steps(schema)
+        node.after = self._compile_after_steps(schema)
+        if target is not None and (
+            node.reference_only or not (node.step_count() or node.after)
+        ):
+            self._inline_reference(node, target)
+        return node
+
+    def _compiled_reference_target(self, schema: Any) -> Optional[Any]:
+        """Return the target of the reference in *schema* if it can be
+        resolved before validation, or ``None``."""
+        try:
+            return self._static_reference_target(schema)
+        except Exception:
+            # Dynamic references are resolved on every evaluation, and broken
+            # ones reported when (and if) they're evaluated.
+            return None
+
+    def _inline_reference(self, node: SchemaNode, target: Any) -> None:
+        """Replace the link from *node* to *target* with the target's steps.
+
+        Only done for small targets in the same resource, which aren't
+        references themselves and don't read annotations.  Evaluating the
+        steps directly gives the same result and annotations as validating
+        against the target, without a call and annotation frame per use.
+        """
+        if id(target) in self._compiling:
+            return
+        if getattr(getattr(node.schema, "base_uri", None), "uri", None) != getattr(
+            getattr(target, "base_uri", None), "uri", None
+        ):
+            return
+        target_node = self._compiled_node(target)
+        if target_node.reference is not None or target_node.after:
+            return
+        if target_node.step_count() > INLINE_REFERENCE_STEPS:
+            return
+        node.reference = None
+        node.reference_only = False
+        node.generic = list(target_node.generic)
+        node.array_steps = list(target_node.array_steps)
+        node.object_steps = list(target_node.object_steps)
+        node.value_steps = list(target_node.value_steps)
+
+    def _compile_generic_steps(self, schema: dict) -> List[Step]:
+        steps: List[Step] = []
+        for k, func in self.generic_validators.items():
+            if k not in schema:
+                continue
+            if k == "anyOf" or k == "oneOf":
+                discriminator = self._compile_discriminator(schema[k])
+                if discriminator is not None:
+                    func = partial(func, discriminator=discriminator)
+            steps.append((func, schema[k]))
+        return steps
+
+    def _compile_discriminator(self, schemas: Any) -> Optional[Discriminator]:
+        """Find a property that every branch of *schemas* pins to one value."""
+        if not isinstance(schemas, list) or len(schemas) < 2:
+            return None
+        if "properties" not in self.object_validators:
+            return None
+        branch_properties = []
+        for branch in schemas:
+            if not isinstance(branch, dict) or self._is_reference(branch):
+                return None
+            if "properties" not in branch or not isinstance(branch["properties"], dict):
+                return None
+            branch_properties.append(branch["properties"])
+        for name in branch_properties[0]:
+            branches: Dict[Any, List[Any]] = {}
+            for branch, properties in zip(schemas, branch_properties):
+                pinned = (
+                    self._pinned_value(properties[name]) if name in properties else None
+                )
+                if pinned is None:
+                    break
+                branches.setdefault(pinned[0], []).append(branch)
+            else:
+                return Discriminator(schemas, name, branches)
+        return None
+
+    def _pinned_value(self, schema: Any) -> Optional[Tuple[Any]]:
+        """Return ``(canonical value,)`` if *schema* allows only that value."""
+        if not isinstance(schema, dict) or self._is_reference(schema):
+            return None
+        if "enum" in schema and "enum" in self.generic_validators:
+            values = schema["enum"]
+            if isinstance(values, list) and len(values) == 1:
+                return (canonical_json(values[0]),)
+        return None
+
+    def _compile_array_steps(self, schema: dict) -> List[Step]:
+        steps: List[Step] = []
+        if "items" in schema:
+            additionalItems = (
+                schema["additionalItems"] if "additionalItems" in schema else None
+            )
+            steps.append(
+                (
+                    partial(self._validate_items, additionalItems=additionalItems),
+                    schema["items"],
+                )
+            )
+        steps.extend(
+            (func, schema[k])
+            for k, func in self.array_validators.items()
+            if k in schema
+        )
+        return steps
+
+    def _compile_object_steps(self, schema: dict) -> List[Step]:
+        steps: List[Step] = [
+            (func, schema[k])
+            for k, func in self.object_validators.items()
+            if k in schema
+        ]
+        if "additionalProperties" in schema:
+            properties = schema["properties"] if "properties" in schema else {}
+            patterns = (
+                schema["patternProperties"] if "patternProperties" in schema else {}
+            )
+            if not isinstance(properties, dict) or not isinstance(patterns, dict):
+                return [(self._object_validate, schema)]
+            steps.append(
+                (
+                    partial(
+                        self._validate_additional_properties,
+                        property_keys=(
+                            properties.keys() if "properties" in schema else None
+                        ),
+                        property_patterns=(
+                            patterns if "patternProperties" in schema else None
+                        ),
+                    ),
+                    schema["additionalProperties"],
+                )
+            )
+        return steps
+
+    def _compile_value_steps(self, schema: dict) -> List[Step]:
+        steps: List[Step] = []
+        if "maximum" in schema:
+            exclusive = (
+                schema["exclusiveMaximum"] if "exclusiveMaximum" in schema else False
+            )
+            steps.append(
+                (
+                    partial(self._validate_maximum, exclusive=exclusive),
+                    schema["maximum"],
+                )
+            )
+        if "minimum" in schema:
+            exclusive = (
+                schema["exclusiveMinimum"] if "exclusiveMinimum" in schema else False
+            )
+            steps.append(
+                (
+                    partial(self._validate_minimum, exclusive=exclusive),
+                    schema["minimum"],
+                )
+            )
+        steps.extend(
+            (func, schema[k])
+            for k, func in self.value_validators.items()
+            if k in schema
+        )
+        return steps
+
+    def _compile_after_steps(self, schema: dict) -> List[AfterStep]:
+        return []
+
     def walk_schema_from_root(self, path: str) -> dict:
-        parts = path.split("/")
-        node = self._root_schema
-        for part in parts[1:]:
-            node = node[part]
+        node = self._pointer_targets.get(path)
+        if node is None:
+            if path and not path.startswith("/"):
+                node = self._find_anchor(path)
+            else:
+                node = resolve_pointer(self._root_schema, path)
+            self._pointer_targets[path] = node
         return node
 
+    def _find_anchor(self, name: str) -> Any:
+        for subschema in iter_subschemas(self._root_schema):
+            if isinstance(subschema, dict) and self._is_anchor(subschema, name):
+                return subschema
+        raise KeyError("There is no subschema with the anchor '{}'".format(name))
+
+    def _is_anchor(self, schema: dict, name: str) -> bool:
+        return schema.get(self.get_dollar_id_token()) == "#" + name
+
     def validate_from_reference(self, data, dollar_ref):
-        uri, path = dollar_ref.split("#")
+        uri, _, path = dollar_ref.partition("#")
         if len(uri) > 0:
+            remote_schema_validator, remote_schema = self._registry.resolve(
+                self, uri, path, self._load_remote
+            )
+            context = self._local.context
+            depth = len(context.annotation_stack)
             try:
-                loader = self._root_schema._loader
-                remote_schema_root = loader.load(uri)
-            except Exception:
-                if self._file_loader is None:
-                    raise Exception(
-                        "Unable to load '{}' because file loader was not set".format(
-                            uri
-                        )
-                    )
-                remote_schema_root = self._file_loader(uri)
-            remote_schema_validator = Validator(remote_schema_root)
-            remote_schema = remote_schema_validator.walk_schema_from_root(path)
-            return remote_schema_validator.validate(data, remote_schema)
+                if remote_schema_validator.validate(data, remote_schema):
+                    return True
+            except JsonSchemaValidationError as e:
+                if e.error is not None:
+                    # Located from here on as if reported by this validator.
+                    e.error.depth = depth
+                raise
+            # Only reached in lazy mode; otherwise the remote validator raised.
+            if context.probing:
+                context.probe_failed = True
+                return False
+            for error in remote_schema_validator.get_error_records():
+                error.depth = depth
+                self._collect_error(context.errors, error)
+            return False
         else:
             schema = self.walk_schema_from_root(path)
             return self.validate(data, schema)
 
-    def _report_validation_error(self, message: str, data=None, schema=None) -> bool:
-        if hasattr(data, "line") and data.line is not None:
-            message = "Input line {}: {}".format(data.line, message)
-        if hasattr(schema, "line") and schema.line is not None:
-            message = "{} (schema line {})".format(message, schema.line)
+    def _load_remote(self, uri: str) -> Any:
+        try:
+            loader = self._root_schema._loader  # type: ignore[attr-defined]
+            return loader.load(uri)
+        except Exception:
+            if self._file_loader is None:
+                raise Exception(
+                    "Unable to load '{}' because file loader was not set".format(uri)
+                )
+            return self._file_loader(uri)
+
+    def _report_validation_error(
+        self,
+        message: str,
+        data=None,
+        schema=None,
+        *args: Any,
+        keyword: Optional[str] = None,
+    ) -> bool:
+        """Report that *data* failed the *keyword* check against *schema*.
+
+        *message* is formatted with *args* only if the error is read, so
+        callers pass the values it mentions rather than formatting it.
+        """
+        context = self._local.context
+        if context.probing:
+            context.probe_failed = True
+            return False
+        error = ErrorRecord(
+            message, data, schema, args, keyword, len(context.annotation_stack)
+        )
         if not self._lazy_error_reporting:
-            raise JsonSchemaValidationError(message)
-        if not self._temp_ignore_errors:
-            self._errors.append(message)
+            raise JsonSchemaValidationError(str(error), error)
+        self._collect_error(context.errors, error)
         return False
 
+    def _collect_error(self, errors: List[ErrorRecord], error: ErrorRecord) -> None:
+        errors.append(error)
+        if self._max_errors is not None and len(errors) >= self._max_errors:
+            raise ErrorLimitReached("Stopped after {} errors".format(self._max_errors))
+
+    def _locate_errors(self, instance_token: Any, *schema_tokens: Any) -> None:
+        """Add a step to the location of the errors a subschema just reported.
+
+        Called by keywords that apply subschemas when one fails, with the
+        member of the instance (if any) and the path to the subschema from
+        the current schema.
+        """
+        context = self._local.context
+        depth = len(context.annotation_stack)
+        errors = context.errors
+        index = len(errors) - 1
+        while index >= 0 and errors[index].locate(depth, instance_token, schema_tokens):
+            index -= 1
+        if self._aggregated_locations is not None and instance_token is not None:
+            self._aggregate_errors(context, index + 1)
+
+    def _aggregate_errors(self, context: ValidationContext, start: int) -> None:
+        """Count the errors from *start* on, just located at a member of an
+        array or object, in earlier errors at other members that failed the
+        same way."""
+        errors = context.errors
+        groups = context.error_groups
+        # Errors at the same member are never counted in one another.
+        new_groups: Dict[Tuple[Any, ...], ErrorRecord] = {}
+        kept = start
+        for error in errors[start:]:
+            key = error.group_key()
+            group = groups.get(key)
+            if group is not None and group.can_absorb(error):
+                group.absorb(error, self._aggregated_locations)  # type: ignore[arg-type]
+            else:
+                new_groups[key] = error
+                errors[kept] = error
+                kept += 1
+        del errors[kept:]
+        groups.update(new_groups)
+
+    def _locate_raised(
+        self, e: JsonSchemaValidationError, instance_token: Any, *schema_tokens: Any
+    ) -> None:
+        """As :meth:`_locate_errors`, for the error raised by a subschema."""
+        if isinstance(e, ErrorLimitReached):
+            # The errors collected so far are located as they would have
+            # been had the subschema returned.
+            self._locate_errors(instance_token, *schema_tokens)
+        elif e.error is not None:
+            depth = len(self._local.context.annotation_stack)
+            e.error.locate(depth, instance_token, schema_tokens)
+
+    def _probe(
+        self,
+        data: JsonTypes,
+        schema: Any,
+        check: Optional[Callable[[JsonTypes, Any], bool]] = None,
+    ) -> bool:
+        """Return whether *data* matches *schema*, without reporting errors.
+
+        Used by applicators that only need a yes/no answer from a subschema
+        (``anyOf``, ``oneOf``, ``not``, ...).  Failed checks neither raise nor
+        format a message, whatever the error reporting mode.  *check* defaults
+        to ``validate``; it can be any check taking ``(data, schema)``.
+        """
+        context = self._local.context
+        saved = (context.probing, context.probe_failed)
+        context.probing = True
+        context.probe_failed = False
+        try:
+            matched = (self.validate if check is None else check)(data, schema)
+            return bool(matched) and not context.probe_failed
+        except JsonSchemaValidationError:
+            # Raised by a separate validator for a remote reference.
+            return False
+        finally:
+            context.probing, context.probe_failed = saved
+
     def _validate_type_integer(self, data: JsonTypes, schema_type) -> bool:
         if isinstance(data, bool) or not isinstance(data, int):
             return self._report_validation_error(
-                "The value '{}' is not an integer", data, schema_type
+                "The value '{}' is not an integer", data, schema_type, keyword="type"
             )
         return True
 
     def _validate_type(self, data: JsonTypes, schema_type: Union[str, list]) -> bool:
         if isinstance(schema_type, list):
             for st in schema_type:
-                try:
-                    if self._validate_type(data, st):
-                        return True
-                except JsonSchemaValidationError:
-                    pass
+                if self._probe(data, st, self._validate_type):
+                    return True
             return self._report_validation_error(
-                "Data was not a {}".format(" or ".join(schema_type)), data, schema_type
+                "Data was not a {}",
+                data,
+                schema_type,
+                " or ".join(schema_type),
+                keyword="type",
             )
         mapping = {
             "string": str,
@@ -198,21 +757,21 @@ class Validator(object):
         elif schema_type == "null":
             if data is not None:
                 return self._report_validation_error(
-                    "Data type was not null", data, schema_type
+                    "Data type was not null", data, schema_type, keyword="type"
                 )
         elif schema_type == "number":
             if isinstance(data, bool) or (
                 not isinstance(data, int) and not isinstance(data, float)
             ):
                 return self._report_validation_error(
-                    "Data was not a number", data, schema_type
+                    "Data was not a number", data, schema_type, keyword="type"
                 )
             else:
                 return True
         elif schema_type in mapping:
             if not isinstance(data, mapping[schema_type]):
                 return self._report_validation_error(
-                    "Data was not a {}".format(schema_type), data, schema_type
+                    "Data was not a {}", data, schema_type, schema_type, keyword="type"
                 )
         else:
             raise InvalidSchemaError("Unknown type '{}'".format(schema_type))
@@ -223,13 +782,24 @@ class Validator(object):
             raise InvalidSchemaError("Properties schema must be an object")
         if not isinstance(data, dict):
             return self._report_validation_error(
-                "Cannot validate properties on a non-object", data, schema
+                "Cannot validate properties on a non-object",
+                data,
+                schema,
+                keyword="properties",
             )
         retval = True
-        for k, v in data.items():
-            if k in schema:
-                retval = self.validate(v, schema[k]) and retval
-                self._record_evaluated_property(k)
+        frame = self._annotation_frame()
+        try:
+            for k, v in data.items():
+                if k in schema:
+                    if not self.validate(v, schema[k]):
+                        retval = False
+                        self._locate_errors(k, "properties", k)
+                    if frame is not None:
+                        frame.add_property(k)
+        except JsonSchemaValidationError as e:
+            self._locate_raised(e, k, "properties", k)
+            raise
         return retval
 
     def _validate_pattern_properties(
@@ -237,66 +807,110 @@ class Validator(object):
     ) -> bool:
         if not isinstance(data, dict):
             return self._report_validation_error(
-                "patternProperties will only validate against an object", data, schema
+                "patternProperties will only validate against an object",
+                data,
+                schema,
+                keyword="patternProperties",
             )
         if not isinstance(schema, dict):
             raise InvalidSchemaError("patternProperties must be an object")
         retval = True
-        for regex_expression, subschema in schema.items():
-            for k, v in data.items():
-                if _pattern_search(regex_expression, k):
-                    retval = retval and self.validate(v, subschema)
+        if not data:
+            return retval
+        # Sort the keys by pattern in one pass, then validate pattern by pattern
+        # exactly as if every pattern had been searched for in every key.
+        classifier = self._key_classifier(schema)
+        matched_keys: Optional[List[List[str]]] = None
+        for k in data:
+            for idx in classifier.matching(k):
+                if matched_keys is None:
+                    matched_keys = [[] for _ in classifier.patterns]
+                matched_keys[idx].append(k)
+        if matched_keys is None:
+            return retval
+        try:
+            for (pattern, subschema), keys in zip(schema.items(), matched_keys):
+                for k in keys:
+                    if retval and not self.validate(data[k], subschema):
+                        retval = False
+                        self._locate_errors(k, "patternProperties", pattern)
                     self._record_evaluated_property(k)
+        except JsonSchemaValidationError as e:
+            self._locate_raised(e, k, "patternProperties", pattern)
+            raise
         return retval
 
+    def _key_classifier(self, patterns: Collection[str]) -> KeyClassifier:
+        classifier = self._key_classifiers.get(id(patterns))
+        if classifier is None:
+            classifier = KeyClassifier(patterns)
+            self._key_classifiers[id(patterns)] = classifier
+        return classifier
+
     def _validate_additional_properties(
         self,
         data: dict,
         additional: Union[bool, dict],
-        property_keys: Optional[List[str]] = None,
-        property_patterns: Optional[List[str]] = None,
+        property_keys: Optional[Collection[str]] = None,
+        property_patterns: Optional[Collection[str]] = None,
     ) -> bool:
         if not isinstance(data, dict):
             return self._report_validation_error(
                 "additionalProperties will only validate against an object",
                 data,
                 additional,
+                keyword="additionalProperties",
             )
         retval = True
         if additional or additional is not True:
+            failures = 0
+            max_failures = self._max_errors_per_location
+            classifier = None
+            if property_patterns is not None and data:
+                classifier = self._key_classifier(property_patterns)
             for propname in data.keys():
-                found_somewhere = False
-                if property_keys is not None and propname in property_keys:
-                    found_somewhere = True
-                if property_patterns is not None:
-                    for regex_expression in property_patterns:
-                        if _pattern_search(regex_expression, propname):
-                            found_somewhere = True
+                if classifier is not None:
+                    found_somewhere = not classifier.is_additional(
+                        propname, property_keys
+                    )
+                else:
+                    found_somewhere = (
+                        property_keys is not None and propname in property_keys
+                    )
                 if not found_somewhere:
                     self._record_evaluated_property(propname)
-                    if additional is not False and self.validate(
-                        data[propname], additional  # type: ignore[arg-type]
-                    ):
-                        continue
+                    if additional is not False:
+                        try:
+                            if self.validate(data[propname], additional):  # type: ignore[arg-type]
+                                continue
+                        except JsonSchemaValidationError as e:
+                            self._locate_raised(e, propname, "additionalProperties")
+                            raise
+                        self._locate_errors(propname, "additionalProperties")
                     retval = (
                         self._report_validation_error(
-                            "The property '{}' is an additional property which is not allowed".format(
-                                propname
-                            ),
+                            "The property '{}' is an additional property which is not allowed",
                             data,
                             additional,
+                            propname,
+                            keyword="additionalProperties",
                         )
                         and retval
                     )
+                    failures += 1
+                    if failures == max_failures:
+                        break
         return retval
 
     def _validate_maxproperties(self, data: dict, schema: int) -> bool:
         num_props = len(data)
         if num_props > schema:
             return self._report_validation_error(
-                "There are too many properties {} on the object".format(num_props),
+                "There are too many properties {} on the object",
                 data,
                 schema,
+                num_props,
+                keyword="maxProperties",
             )
         return True
 
@@ -304,16 +918,18 @@ class Validator(object):
         num_props = len(data)
         if num_props < schema:
             return self._report_validation_error(
-                "There are too few properties {} on the object".format(num_props),
+                "There are too few properties {} on the object",
                 data,
                 schema,
+                num_props,
+                keyword="minProperties",
             )
         return True
 
     def _validate_required(self, data: dict, schema: List[str]) -> bool:
         if not isinstance(data, dict):
             return self._report_validation_error(
-                "Required schema requires an object", data, schema
+                "Required schema requires an object", data, schema, keyword="required"
             )
         if not isinstance(schema, list):
             raise InvalidSchemaError("Required must be a list of property names")
@@ -322,9 +938,11 @@ class Validator(object):
                 raise InvalidSchemaError("Required property name must be a string")
             if item not in data:
                 return self._report_validation_error(
-                    "The '{}' property is required but was missing".format(item),
+                    "The '{}' property is required but was missing",
                     data,
                     schema,
+                    item,
+                    keyword="required",
                 )
         return True
 
@@ -337,60 +955,61 @@ class Validator(object):
                 if isinstance(consequence, list):
                     retval = self._validate_required(data, consequence) and retval
                 elif isinstance(consequence, dict):
-                    retval = self.validate(data, consequence) and retval
+                    try:
+                        if not self.validate(data, consequence):
+                            retval = False
+                            self._locate_errors(None, "dependencies", requirement)
+                    except JsonSchemaValidationError as e:
+                        self._locate_raised(e, None, "dependencies", requirement)
+                        raise
                 else:
                     return InvalidSchemaError(
                         "Dependency must be either a list or a schema"
                     )
         return retval
 
-    def _validate_anyof(self, data: JsonTypes, schemas: list) -> bool:
+    def _validate_anyof(
+        self,
+        data: JsonTypes,
+        schemas: list,
+        discriminator: Optional[Discriminator] = None,
+    ) -> bool:
         if not isinstance(schemas, list):
             raise InvalidSchemaError("AnyOf schema was not a list")
-        for schema in schemas:
-            try:
-                self._temp_ignore_errors = True
-                if self.validate(data, schema):
-                    self._temp_ignore_errors = False
-                    return True
-            except InvalidSchemaError:
-                raise
-            except JsonSchemaValidationError:
-                pass
-            except Exception:
-                raise
-            finally:
-                self._temp_ignore_errors = False
+        branches = schemas if discriminator is None else discriminator.candidates(data)
+        for schema in branches:
+            if self._probe(data, schema):
+                return True
         return self._report_validation_error(
             "The JSON data did not match any of the provided anyOf schemas",
             data,
             schemas,
+            keyword="anyOf",
         )
 
-    def _validate_oneof(self, data: JsonTypes, schemas: list) -> bool:
+    def _validate_oneof(
+        self,
+        data: JsonTypes,
+        schemas: list,
+        discriminator: Optional[Discriminator] = None,
+    ) -> bool:
         if not isinstance(schemas, list):
             raise InvalidSchemaError("AnyOf schema was not a list")
         valid_count = 0
-        for schema in schemas:
-            try:
-                self._temp_ignore_errors = True
-                if self.validate(data, schema):
-                    valid_count += 1
-            except InvalidSchemaError:
-                raise
-            except JsonSchemaValidationError:
-                pass
-            except Exception:
-                raise
-            finally:
-                self._temp_ignore_errors = False
+        branches = schemas if discriminator is None else discriminator.candidates(data)
+        for schema in branches:
+            if self._probe(data, schema):
+                valid_count += 1
+                if valid_count > 1:
+                    # Further matches can't change the outcome.
+                    break
         if valid_count != 1:
             return self._report_validation_error(
-                "The data matched against {} schemas but was required to match exactly 1".format(
-                    valid_count
-                ),
+                "The data matched against {} schemas but was required to match exactly 1",
                 data,
                 schemas,
+                valid_count,
+                keyword="oneOf",
             )
         return True
 
@@ -398,47 +1017,55 @@ class Validator(object):
         if not isinstance(schemas, list):
             raise InvalidSchemaError("AnyOf schema was not a list")
         retval = True
-        for schema in schemas:
-            retval = self.validate(data, schema) and retval
+        try:
+            for idx, schema in enumerate(schemas):
+                if not self.validate(data, schema):
+                    retval = False
+                    self._locate_errors(None, "allOf", idx)
+        except JsonSchemaValidationError as e:
+            self._locate_raised(e, None, "allOf", idx)
+            raise
         return retval
 
     def _validate_not(self, data: JsonTypes, schema: dict) -> bool:
-        try:
-            self._temp_ignore_errors = True
-            if not self.validate(data, schema):
-                self._temp_ignore_errors = False
-                return True
-        except InvalidSchemaError:
-            raise
-        except JsonSchemaValidationError:
-            self._temp_ignore_errors = False
+        if not self._probe(data, schema):
             return True
-        except Exception:
-            raise
-        else:
-            self._temp_ignore_errors = False
-            return self._report_validation_error(
-                "The data matched against the schema when it was not supposed to",
-                data,
-                schema,
-            )
+        return self._report_validation_error(
+            "The data matched against the schema when it was not supposed to",
+            data,
+            schema,
+            keyword="not",
+        )
 
     def _validate_enum(self, data: JsonTypes, schema: List[JsonTypes]) -> bool:
         if not isinstance(schema, list):
             raise InvalidSchemaError("The enum restriction must be a list of values")
-        fixed_data = replace_bools_for_comparison(data)
-        for x in schema:
-            if fixed_data == replace_bools_for_comparison(x):
-                return True
-
+        if canonical_json(data) in self._canonical_enum(schema):
+            return True
         return self._report_validation_error(
-            "The value '{}' was not in the enumerated list of allowed values".format(
-                data
-            ),
+            "The value '{}' was not in the enumerated list of allowed values",
             data,
             schema,
+            data,
+            keyword="enum",
         )
 
+    def _canonical_enum(self, values: List[JsonTypes]) -> FrozenSet[Any]:
+        key = ("enum", id(values))
+        cached = self._canonical_values.get(key)
+        if cached is None:
+            cached = (values, frozenset(canonical_json(x) for x in values))
+            self._canonical_values[key] = cached
+        return cached[1]
+
+    def _canonical_value(self, value: JsonTypes) -> Any:
+        key = ("const", id(value))
+        cached = self._canonical_values.get(key)
+        if cached is None:
+            cached = (value, canonical_json(value))
+            self._canonical_values[key] = cached
+        return cached[1]
+
     def _validate_minlength(self, data: str, length: int) -> bool:
         if isinstance(length, bool) or not isinstance(length, (int, float)):
             raise InvalidSchemaError("The minLength value must be an integer")
@@ -451,11 +1078,12 @@ class Validator(object):
             return True
         if len(data) < length:
             return self._report_validation_error(
-                "The data length {} was less than the minimum {}".format(
-                    len(data), length
-                ),
+                "The data length {} was less than the minimum {}",
                 data,
                 length,
+                len(data),
+                length,
+                keyword="minLength",
             )
         return True
 
@@ -471,9 +1099,12 @@ class Validator(object):
             return True
         if len(data) > length:
             return self._report_validation_error(
-                "Length of '{}' is more than maximum {}".format(len(data), length),
+                "Length of '{}' is more than maximum {}",
                 data,
                 length,
+                len(data),
+                length,
+                keyword="maxLength",
             )
         return True
 
@@ -482,15 +1113,26 @@ class Validator(object):
             return True
         if not _pattern_search(pattern, data):
             return self._report_validation_error(
-                "The string '{}' did not match the pattern '{}'".format(data, pattern),
+                "The string '{}' did not match the pattern '{}'",
                 data,
                 pattern,
+                data,
+                pattern,
+                keyword="pattern",
             )
         return True
 
     def _validate_format(self, data: str, format: str) -> bool:
-        if format in self._format_validators:
-            return self._format_validators[format](data)
+        check = self._format_validators.get(format)
+        if check is not None and not check(data):
+            return self._report_validation_error(
+                "'{}' is not a valid {}",
+                data,
+                format,
+                data,
+                format,
+                keyword="format",
+            )
         return True
 
     def _is_format_datetime(self, data: str) -> bool:
@@ -504,9 +1146,12 @@ class Validator(object):
             return True
         if (data > value) or (data == value and exclusive is True):
             return self._report_validation_error(
-                "The value {} is greater than the maximum {}".format(data, value),
+                "The value {} is greater than the maximum {}",
+                data,
+                value,
                 data,
                 value,
+                keyword="maximum",
             )
         return True
 
@@ -518,9 +1163,12 @@ class Validator(object):
             return True
         if (data < value) or (data == value and exclusive is True):
             return self._report_validation_error(
-                "The value {} is less than the minimum {}".format(data, value),
+                "The value {} is less than the minimum {}",
                 data,
                 value,
+                data,
+                value,
+                keyword="minimum",
             )
         return True
 
@@ -537,14 +1185,25 @@ class Validator(object):
                 if ((multiplier * data) % (multiplier * value)) == 0:
                     return True
             return self._report_validation_error(
-                "The value {} is not a multiple of {}".format(data, value), data, value
+                "The value {} is not a multiple of {}",
+                data,
+                value,
+                data,
+                value,
+                keyword="multipleOf",
             )
         return True
 
     def _validate_prefixitems(self, data: list, schema: list) -> bool:
         retval = True
         for idx, item in enumerate(data):
-            retval = self.validate(item, schema[idx]) and retval
+            try:
+                if not self.validate(item, schema[idx]):
+                    retval = False
+                    self._locate_errors(idx, "items", idx)
+            except JsonSchemaValidationError as e:
+                self._locate_raised(e, idx, "items", idx)
+                raise
             # Do NOT merge the child frame here: each item is a distinct
             # instance location, so its annotations (evaluated properties/
             # items of the child) must not propagate into this schema's
@@ -564,14 +1223,25 @@ class Validator(object):
             else:
                 if additionalItems is not False:
                     retval = self._validate_prefixitems(data[:schema_len], schema)
+                    failures = 0
+                    max_failures = self._max_errors_per_location
                     for idx, item in enumerate(data[schema_len:], start=schema_len):
                         if additionalItems is True:
                             # Explicit additionalItems: true — mark as evaluated
                             self._record_evaluated_item(idx)
                         elif additionalItems is not None:
                             # additionalItems is a schema — validate & mark
-                            retval = self.validate(item, additionalItems) and retval
+                            try:
+                                if not self.validate(item, additionalItems):
+                                    retval = False
+                                    self._locate_errors(idx, "additionalItems")
+                                    failures += 1
+                            except JsonSchemaValidationError as e:
+                                self._locate_raised(e, idx, "additionalItems")
+                                raise
                             self._record_evaluated_item(idx)
+                            if failures == max_failures:
+                                break
                         # else: additionalItems not present (None) —
                         # items pass validation but are NOT recorded as evaluated
                     return retval
@@ -580,63 +1250,81 @@ class Validator(object):
                         "There are too many items when additional items is false",
                         data,
                         schema,
+                        keyword="additionalItems",
                     )
-        for idx, item in enumerate(data):
-            retval = self.validate(item, schema) and retval
-            self._record_evaluated_item(idx)
+        failures = 0
+        max_failures = self._max_errors_per_location
+        try:
+            for idx, item in enumerate(data):
+                if not self.validate(item, schema):
+                    retval = False
+                    self._locate_errors(idx, "items")
+                    failures += 1
+                    if failures == max_failures:
+                        break
+        except JsonSchemaValidationError as e:
+            self._locate_raised(e, idx, "items")
+            raise
+        frame = self._annotation_frame()
+        if frame is not None:
+            frame.add_items(0, len(data))
         return retval
 
     def _validate_maxitems(self, data: list, maximum: int) -> bool:
         if len(data) > maximum:
             return self._report_validation_error(
-                "There were more items {} than the maximum {}".format(
-                    len(data), maximum
-                ),
+                "There were more items {} than the maximum {}",
                 data,
                 maximum,
+                len(data),
+                maximum,
+                keyword="maxItems",
             )
         return True
 
     def _validate_minitems(self, data: list, minimum: int) -> bool:
         if len(data) < minimum:
             return self._report_validation_error(
-                "There were fewer items {} than the minimum {}".format(
-                    len(data), minimum
-                ),
+                "There were fewer items {} than the minimum {}",
                 data,
                 minimum,
+                len(data),
+                minimum,
+                keyword="minItems",
             )
         return True
 
     def _validate_uniqueitems(self, data: list, uniqueness: bool) -> bool:
-        def is_unique(data: list) -> bool:
-            found = []
-            for item in data:
-                fixed_item = replace_bools_for_comparison(item)
-                if fixed_item in found:
-                    return False
-                found.append(fixed_item)
-            return True
-
         if uniqueness is False:
             return True
-        num_items = len(data)
 
         try:
-            # Easy way
-            unique_items = len(set(data))
-            if num_items == unique_items:
+            # Easy way: distinct under Python equality is distinct in JSON too
+            # (the reverse doesn't hold, since True == 1 in Python).
+            if len(set(data)) == len(data):
                 return True
         except TypeError:
             pass
 
-        if not is_unique(data):
-            return self._report_validation_error(
-                "There were items which were not unique", data, uniqueness
-            )
-
+        first_seen: Dict[Any, int] = {}
+        for idx, item in enumerate(data):
+            first = first_seen.setdefault(canonical_json(item), idx)
+            if first != idx:
+                return self._report_duplicate_items(data, first, idx, uniqueness)
         return True
 
+    def _report_duplicate_items(
+        self, data: Sized, first: int, second: int, uniqueness: bool
+    ) -> bool:
+        return self._report_validation_error(
+            "There were items which were not unique (items {} and {} are equal)",
+            data,
+            uniqueness,
+            first,
+            second,
+            keyword="uniqueItems",
+        )
+
     def _array_validate(self, data: list, schema: dict) -> bool:
         retval = True
         additionalItems = (
@@ -660,7 +1348,7 @@ class Validator(object):
                     schema["properties"].keys() if "properties" in schema else None
                 )
                 property_patterns = (
-                    schema["patternProperties"].keys()
+                    schema["patternProperties"]
                     if "patternProperties" in schema
                     else None
                 )
@@ -678,6 +1366,7 @@ class Validator(object):
                     "Use of additionalProperties to validate a non-object",
                     data,
                     schema["additionalProperties"],
+                    keyword="additionalProperties",
                 )
         return retval
 
@@ -708,9 +1397,9 @@ class Validator(object):
         """Resolve a reference if present in *schema*.
 
         Returns ``(target, is_ref)`` where *target* is the resolved schema
-        node (or ``None`` for raw-string ``$ref`` that needs
-        ``validate_from_reference``) and *is_ref* is ``True`` when a
-        reference keyword was found.
+        node (or ``None`` for a raw-string ``$ref`` that needs
+        ``validate_from_reference``, such as a remote one) and *is_ref* is
+        ``True`` when a reference keyword was found.
 
         Handles three shapes:
 
@@ -733,7 +1422,7 @@ class Validator(object):
                     # DocDynamicReference — use runtime dynamic scope
                     if hasattr(ref_val, "resolve_in_scope"):
                         return (
-                            ref_val.resolve_in_scope(self._dynamic_scope),  # type: ignore[attr-defined]
+                            ref_val.resolve_in_scope(self._local.context.dynamic_scope),  # type: ignore[attr-defined]
                             True,
                         )
                     # DocReference
@@ -741,21 +1430,82 @@ class Validator(object):
                         return ref_val.resolve(), True  # type: ignore[attr-defined]
                     # Raw string $ref (legacy)
                     if isinstance(ref_val, str):
+                        if ref_kw == "$ref" and ref_val.startswith("#"):
+                            return self.walk_schema_from_root(ref_val[1:]), True
                         return None, True
 
         return None, False
 
+    def _is_reference(self, schema: Any) -> bool:
+        """Return ``True`` if :meth:`_resolve_ref_target` would find a reference.
+
+        Only looks at the shape of *schema*; nothing is resolved.
+        """
+        if hasattr(schema, "_reference"):
+            return True
+        if isinstance(schema, dict):
+            for ref_kw in self._ref_keywords:
+                if ref_kw in schema:
+                    ref_val = schema[ref_kw]
+                    if (
+                        hasattr(ref_val, "resolve_in_scope")
+                        or hasattr(ref_val, "resolve")
+                        or isinstance(ref_val, str)
+                    ):
+                        return True
+        return False
+
+    def _static_reference_target(self, schema: Any) -> Any:
+        """Return the schema a reference in *schema* points at, if any.
+
+        Unlike :meth:`_resolve_ref_target` this is meant to be called before
+        validation.  Returns ``None`` if *schema* isn't a reference, or is a
+        remote string ``$ref`` (validated by a separate validator).  Raises
+        ``LookupError`` if the target depends on the dynamic scope.
+        """
+        if hasattr(schema, "_reference"):
+            return schema.resolve()  # type: ignore[attr-defined]
+        if isinstance(schema, dict):
+            for ref_kw in self._ref_keywords:
+                if ref_kw in schema:
+                    ref_val = schema[ref_kw]
+                    if hasattr(ref_val, "resolve_in_scope"):
+                        raise LookupError("{} is resolved dynamically".format(ref_kw))
+                    if hasattr(ref_val, "resolve"):
+                        return ref_val.resolve()  # type: ignore[attr-defined]
+                    if isinstance(ref_val, str):
+                        if ref_kw != "$ref":
+                            raise LookupError(
+                                "{} is resolved dynamically".format(ref_kw)
+                            )
+                        uri, _, path = ref_val.partition("#")
+                        if len(uri) > 0:
+                            return None
+                        return self.walk_schema_from_root(path)
+        return None
+
+    def _validate_reference(self, data: JsonTypes, schema: Any) -> bool:
+        target, _ = self._resolve_ref_target(schema)
+        return self._apply_reference(data, schema, target)
+
+    def _apply_reference(self, data: JsonTypes, schema: Any, target: Any) -> bool:
+        self._local.context.last_frame = None
+        if target is not None:
+            result = self.validate(data, target)
+            if not result:
+                # References add nothing to the error locations.
+                self._locate_errors(None)
+        else:
+            # Raw string $ref — use legacy path
+            result = self.validate_from_reference(data, schema["$ref"])  # type: ignore[index]
+        self._merge_last_frame()
+        return result
+
     def _validate(self, data: JsonTypes, schema: dict) -> bool:
         retval = True
         target, is_ref = self._resolve_ref_target(schema)
         if is_ref:
-            self._last_frame = None
-            if target is not None:
-                result = self.validate(data, target)
-            else:
-                # Raw string $ref — use legacy path
-                result = self.validate_from_reference(data, schema["$ref"])  # type: ignore[index]
-            self._merge_last_frame()
+            result = self._apply_reference(data, schema, target)
             # Bare DocReference (collapsed form) — no siblings to validate,
             # always return.  Only dict schemas with a $ref *key* (the
             # KEEP_REFERENCES shape) can have sibling keywords.
@@ -776,23 +1526,120 @@ class Validator(object):
             retval = self._value_validate(data, schema) and retval
         return retval
 
-    def validate(self, data: JsonTypes, schema: Optional[dict] = None) -> bool:
+    def validate(self, data: JsonTypes, schema: Union[dict, bool, None] = None) -> bool:
         if schema is None:
             schema = self._root_schema
-        frame = AnnotationFrame()
-        self._annotation_stack.append(frame)
-        # Push the schema's base URI onto the dynamic scope if it differs
-        # from the current top (i.e. we've entered a new resource).
-        pushed_dynamic = False
+        context = self._local.context
+        annotation_stack = context.annotation_stack
+        if not annotation_stack:
+            # A top-level call: start from a clean slate.
+            context.reset()
+        untracked = self._untracked
+        if untracked is None:
+            untracked = self._untracked_schemas()
+        frame = None if id(schema) in untracked else AnnotationFrame()
+        annotation_stack.append(frame)
+        pushed_dynamic = hasattr(schema, "base_uri") and self._enter_resource(
+            context, schema
+        )
+        errors = context.errors
+        try:
+            compiled_nodes = self._compiled_nodes
+            if compiled_nodes is not None:
+                node = compiled_nodes.get(id(schema))
+                if node is None:
+                    node = self._compiled_node(schema)
+                result = node.evaluate(data)
+            else:
+                result = self._validate(data, schema)  # type: ignore[arg-type]
+            if result and errors:
+                # A schema that matched reports nothing, whatever failed
+                # within it.  Left behind, those errors (still deeper than
+                # any other) would be located as if a later sibling had
+                # reported them.
+                depth = len(annotation_stack)
+                while errors and errors[-1].depth >= depth:
+                    errors.pop()
+            return result
+        except ErrorLimitReached:
+            if len(annotation_stack) > 1:
+                raise
+            return False
+        finally:
+            annotation_stack.pop()
+            context.last_frame = frame
+            if pushed_dynamic:
+                context.dynamic_scope.pop()
+
+    def _enter_resource(self, context: ValidationContext, schema: Any) -> bool:
+        """Push the schema's base URI onto the dynamic scope if it differs
+        from the current top (i.e. we've entered a new resource).
+
+        Returns ``True`` if it was pushed, and so needs popping afterwards.
+        """
         if hasattr(schema, "base_uri") and hasattr(schema.base_uri, "uri"):
-            uri = schema.base_uri.uri  # type: ignore[attr-defined]
-            if not self._dynamic_scope or self._dynamic_scope[-1] != uri:
-                self._dynamic_scope.append(uri)
-                pushed_dynamic = True
+            uri = schema.base_uri.uri
+            dynamic_scope = context.dynamic_scope
+            if not dynamic_scope or dynamic_scope[-1] != uri:
+                dynamic_scope.append(uri)
+                return True
+        return False
+
+    def validate_many(
+        self,
+        documents: Iterable[JsonTypes],
+        schema: Union[dict, bool, None] = None,
+    ) -> BatchResult:
+        """Validate each of *documents* in turn, returning a :class:`BatchResult`.
+
+        Equivalent to calling ``validate()`` once per document, except that
+        validation errors never propagate: in either error reporting mode a
+        failing document is marked invalid and its errors are kept under its
+        index, to be formatted if they're read.  The per-call setup is done
+        once for the whole batch, and *documents* is consumed lazily, so any
+        iterable (a generator reading a file, say) can be passed.
+        """
+        if schema is None:
+            schema = self._root_schema
+        evaluate: Optional[Callable[[JsonTypes], bool]] = None
+        if self._compiled_nodes is not None:
+            evaluate = self._compiled_node(schema).evaluate
+        interpret = self._validate
+        result = BatchResult()
+        valid = result.valid
+        errors = result.errors
+        context = self._local.context
+        context.reset()
+        # Every document is evaluated inside the same top-level frame (if
+        # any), which is emptied between documents.
+        frame = None if id(schema) in self._untracked_schemas() else AnnotationFrame()
+        annotation_stack = context.annotation_stack
+        annotation_stack.append(frame)
+        pushed_dynamic = self._enter_resource(context, schema)
+        append = valid.append
         try:
-            return self._validate(data, schema)
+            for index, document in enumerate(documents):
+                try:
+                    if evaluate is not None:
+                        passed = evaluate(document)
+                    else:
+                        passed = interpret(document, schema)  # type: ignore[arg-type]
+                except ErrorLimitReached:
+                    passed = False
+                except JsonSchemaValidationError as e:
+                    passed = False
+                    errors[index] = [e.error or ErrorRecord(str(e))]
+                if context.errors:
+                    # Handed over as they are; formatted only if read.
+                    errors[index] = context.errors
+                    context.errors = []
+                    context.error_groups = {}
+                append(1 if passed else 0)
+                if frame is not None:
+                    frame.clear()
         finally:
-            self._annotation_stack.pop()
-            self._last_frame = frame
+            annotation_stack.pop()
+            context.last_frame = None
             if pushed_dynamic:
-                self._dynamic_scope.pop()
+                context.dynamic_scope.pop()
+        return result
@@ -1,12 +1,17 @@
-from typing import Union, List, Dict
+from typing import Any, Union, List, Dict, FrozenSet, Optional, Sized, Tuple
+from functools import partial
 from math import modf
 
 from .draft4 import (
     Validator as Draft4Validator,
+    ErrorLimitReached,
     JsonSchemaValidationError,
     InvalidSchemaError,
 )
-from .json_types import JsonTypes, AnnotationFrame
+from .bool_compare_util import canonical_json
+from .compiler import SchemaNode, Step
+from .formats import DRAFT6_FORMATS
+from .json_types import JsonTypes
 
 
 class Validator(Draft4Validator):
@@ -18,108 +23,73 @@ class Validator(Draft4Validator):
         self.object_validators["propertyNames"] = self._validate_propertynames
         self.value_validators["maximum"] = self._validate_maximum
         self.value_validators["minimum"] = self._validate_minimum
-        self.value_validators["exclusiveMaximum"] = lambda d, s: self._validate_maximum(
-            d, s, True
+        self.value_validators["exclusiveMaximum"] = partial(
+            self._validate_maximum, exclusive=True
         )
-        self.value_validators["exclusiveMinimum"] = lambda d, s: self._validate_minimum(
-            d, s, True
+        self.value_validators["exclusiveMinimum"] = partial(
+            self._validate_minimum, exclusive=True
         )
 
     @staticmethod
     def get_dollar_id_token() -> str:
         return "$id"
 
+    def _builtin_format_names(self) -> FrozenSet[str]:
+        return DRAFT6_FORMATS
+
     def _validate_type_integer(self, data: JsonTypes, schema_type) -> bool:
         if isinstance(data, bool) or (
             (not isinstance(data, float)) and (not isinstance(data, int))
         ):
             return self._report_validation_error(
-                "The data type of '{}' is not an integer".format(data),
+                "The data type of '{}' is not an integer",
                 data,
                 schema_type,
+                data,
+                keyword="type",
             )
         if isinstance(data, float):
             fractional_part, _ = modf(data)
             if fractional_part != 0:
                 self._report_validation_error(
-                    "The data value '{}' is not an integer".format(data),
+                    "The data value '{}' is not an integer",
                     data,
                     schema_type,
+                    data,
+                    keyword="type",
                 )
         elif not isinstance(data, int):
             self._report_validation_error(
-                "The data value '{}' is not an integer".format(data), data, schema_type
+                "The data value '{}' is not an integer",
+                data,
+                schema_type,
+                data,
+                keyword="type",
             )
         return True
 
     def _validate_const(self, data: JsonTypes, const_value: JsonTypes) -> bool:
-        if (
-            isinstance(data, int)
-            and isinstance(const_value, float)
-            and (not isinstance(data, bool))
-            and data == int(const_value)
-        ):
-            return True
-        elif (
-            isinstance(data, float)
-            and isinstance(const_value, int)
-            and (not isinstance(const_value, bool))
-            and int(data) == const_value
-        ):
-            return True
-        elif (
-            isinstance(const_value, list)
-            and isinstance(data, list)
-            and len(const_value) == len(data)
-        ):
-            all_elements_matched = True
-            for i, x in enumerate(const_value):
-                all_elements_matched = (
-                    self._validate_const(data[i], x) and all_elements_matched
-                )
-            if all_elements_matched:
-                return True
-        elif (
-            isinstance(const_value, dict)
-            and isinstance(data, dict)
-            and len(const_value) == len(data)
-        ):
-            all_elements_matched = True
-            for k, v in const_value.items():
-                if k not in data:
-                    all_elements_matched = self._report_validation_error(
-                        "The property '{}' in the const value was not found in the data".format(
-                            k
-                        ),
-                        data,
-                        const_value,
-                    )
-                else:
-                    all_elements_matched = (
-                        self._validate_const(data[k], v) and all_elements_matched
-                    )
-                if all_elements_matched:
-                    return True
-        elif (isinstance(data, bool) and not isinstance(const_value, bool)) or (
-            not isinstance(data, bool) and isinstance(const_value, bool)
-        ):
-            return self._report_validation_error(
-                "The data value '{}' was not the const value '{}'".format(
-                    data, const_value
-                ),
-                data,
-                const_value,
-            )
-        elif data == const_value:
+        if canonical_json(data) == self._canonical_value(const_value):
             return True
         return self._report_validation_error(
-            "The data value '{}' was not the const value '{}'".format(
-                data, const_value
-            ),
+            "The data value '{}' was not the const value '{}'",
+            data,
+            const_value,
             data,
             const_value,
+            keyword="const",
         )
 
+    def _pinned_value(self, schema: Any) -> Optional[Tuple[Any]]:
+        if (
+            isinstance(schema, dict)
+            and "const" in schema
+            and "const" in self.generic_validators
+            and not self._is_reference(schema)
+        ):
+            return (self._canonical_value(schema["const"]),)
+        return super()._pinned_value(schema)
+
     def _validate_propertynames(self, data: dict, schema: dict) -> bool:
         if not isinstance(data, dict):
             return True
@@ -129,41 +99,54 @@ class Validator(Draft4Validator):
         for name in data.keys():
             try:
                 all_names_valid = self._validate(name, schema) and all_names_valid
+            except ErrorLimitReached:
+                raise
             except JsonSchemaValidationError as e:
                 return self._report_validation_error(
                     "Property name '{}' didn't conform to the propertyNames schema: {}".format(
                         name, e
-                    )
+                    ),
+                    keyword="propertyNames",
                 )
         if not all_names_valid:
             return self._report_validation_error(
-                "Property names didn't conform to the propertyNames schema"
+                "Property names didn't conform to the propertyNames schema",
+                keyword="propertyNames",
             )
         return True
 
     def _contains_count(self, data: List[JsonTypes], schema: dict) -> int:
         occurances = 0
         for item in data:
-            self._temp_ignore_errors = True
-            try:
-                if self.validate(item, schema):
-                    occurances += 1
-            except JsonSchemaValidationError:
-                pass
-            except Exception:
-                raise
-            finally:
-                self._temp_ignore_errors = False
+            if self._probe(item, schema):
+                occurances += 1
         return occurances
 
     def _validate_contains(self, data: List[JsonTypes], schema: dict) -> bool:
-        occurances = self._contains_count(data, schema)
+        if self._contains_count(data, schema) < 1:
+            return self._report_no_occurances(data, schema)
+        return True
+
+    def _check_contains_count(
+        self,
+        data: Sized,
+        occurances: int,
+        min_contains: int = 1,
+        max_contains: Optional[int] = None,
+    ) -> bool:
+        # minContains and maxContains only arrive in draft 2019-09.
         if occurances < 1:
-            return self._report_validation_error(
-                "There weren't any occurances in the array", data, schema
-            )
+            return self._report_no_occurances(data, None)
         return True
 
+    def _report_no_occurances(self, data: Sized, schema: Any) -> bool:
+        return self._report_validation_error(
+            "There weren't any occurances in the array",
+            data,
+            schema,
+            keyword="contains",
+        )
+
     def _value_validate(self, data: Union[int, float, str, None], schema: dict) -> bool:
         retval = True
         for k, validator_func in self.value_validators.items():
@@ -182,11 +165,18 @@ class Validator(Draft4Validator):
                         retval = self._report_validation_error(
                             "For the {} property, false schema invalidates data",
                             requirement,
+                            keyword="dependencies",
                         )
                 elif isinstance(consequence, list):
                     retval = self._validate_required(data, consequence) and retval
                 elif isinstance(consequence, dict):
-                    retval = self.validate(data, consequence) and retval
+                    try:
+                        if not self.validate(data, consequence):
+                            retval = False
+                            self._locate_errors(None, "dependencies", requirement)
+                    except JsonSchemaValidationError as e:
+                        self._locate_raised(e, None, "dependencies", requirement)
+                        raise
                     self._merge_last_frame()
                 else:
                     return InvalidSchemaError(
@@ -194,32 +184,30 @@ class Validator(Draft4Validator):
                     )
         return retval
 
+    def _validate_false_schema(self, data: JsonTypes, schema: bool) -> bool:
+        return self._report_validation_error(
+            "False schema always fails validation", data, schema
+        )
+
+    def _compile_node(self, schema: Any) -> SchemaNode:
+        if schema is True:
+            return SchemaNode(schema)
+        if schema is False:
+            node = SchemaNode(schema)
+            node.generic.append((self._validate_false_schema, schema))
+            return node
+        return super()._compile_node(schema)
+
+    def _compile_value_steps(self, schema: dict) -> List[Step]:
+        return [
+            (func, schema[k])
+            for k, func in self.value_validators.items()
+            if k in schema
+        ]
+
     def _validate(self, data: JsonTypes, schema: Union[dict, bool]) -> bool:
         if schema is True:
             return True
         if schema is False:
-            return self._report_validation_error(
-                "False schema always fails validation", data, schema
-            )
+            return self._validate_false_schema(data, schema)
         return super()._validate(data, schema)
-
-    def validate(self, data: JsonTypes, schema: Union[dict, bool, None] = None) -> bool:
-        if schema is None:
-            schema = self._root_schema
-        frame = AnnotationFrame()
-        self._annotation_stack.append(frame)
-        # Push the schema's base URI onto the dynamic scope if it differs
-        # from the current top (i.e. we've entered a new resource).
-        pushed_dynamic = False
-        if hasattr(schema, "base_uri") and hasattr(schema.base_uri, "uri"):
-            uri = schema.base_uri.uri  # type: ignore[attr-defined]
-            if not self._dynamic_scope or self._dynamic_scope[-1] != uri:
-                self._dynamic_scope.append(uri)
-                pushed_dynamic = True
-        try:
-            return self._validate(data, schema)
-        finally:
-            self._annotation_stack.pop()
-            self._last_frame = frame
-            if pushed_dynamic:
-                self._dynamic_scope.pop()
@@ -1,7 +1,9 @@
-from typing import Optional, Union
+from typing import FrozenSet, List, Optional, Union
 
-from .draft4 import InvalidSchemaError, JsonSchemaValidationError
+from .compiler import AfterStep
+from .formats import DRAFT7_FORMATS
 from .json_types import JsonTypes
+from .draft4 import JsonSchemaValidationError
 from .draft6 import Validator as Draft6Validator
 
 
@@ -10,6 +12,9 @@ class Validator(Draft6Validator):
     def __init__(self, schema: dict, lazy_error_reporting: bool = False):
         super().__init__(schema, lazy_error_reporting)
 
+    def _builtin_format_names(self) -> FrozenSet[str]:
+        return DRAFT7_FORMATS
+
     def _validate_if_then_else(
         self,
         data,
@@ -17,20 +22,39 @@ class Validator(Draft6Validator):
         then_schema: Optional[dict] = None,
         else_schema: Optional[dict] = None,
     ) -> bool:
-        try:
-            self.validate(data, if_schema)
-        except InvalidSchemaError:
-            raise
-        except JsonSchemaValidationError:
-            if else_schema is not None:
-                return self.validate(data, else_schema)
-            return True
-        except Exception:
-            raise
-        else:
+        if self._probe(data, if_schema):
             if then_schema is not None:
-                return self.validate(data, then_schema)
+                return self._validate_branch(data, then_schema, "then")
             return True
+        if else_schema is not None:
+            return self._validate_branch(data, else_schema, "else")
+        return True
+
+    def _validate_branch(self, data: JsonTypes, schema: dict, keyword: str) -> bool:
+        """Validate *data* against the ``then`` or ``else`` schema."""
+        try:
+            if self.validate(data, schema):
+                return True
+        except JsonSchemaValidationError as e:
+            self._locate_raised(e, None, keyword)
+            raise
+        self._locate_errors(None, keyword)
+        return False
+
+    def _compile_after_steps(self, schema: dict) -> List[AfterStep]:
+        steps = super()._compile_after_steps(schema)
+        if "if" in schema:
+            if_schema = schema["if"]
+            then_schema = schema["then"] if "then" in schema else None
+            else_schema = schema["else"] if "else" in schema else None
+
+            def if_then_else(data: JsonTypes, retval: bool) -> bool:
+                return retval and self._validate_if_then_else(
+                    data, if_schema, then_schema, else_schema
+                )
+
+            steps.append(if_then_else)
+        return steps
 
     def _validate(self, data: JsonTypes, schema: Union[dict, bool]) -> bool:
         retval = super()._validate(data, schema)
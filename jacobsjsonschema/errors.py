@@ -0,0 +1,278 @@
+"""Validation errors collected in lazy error reporting mode.
+
+An error is kept as the message template and the values it mentions, and
+only turned into text when it's read.  Most failures are never read (those
+inside ``anyOf`` branches, say, or when only the pass/fail result is used),
+and formatting a large offending value is expensive.
+"""
+
+from typing import Any, List, Optional, Tuple
+
+
+def _pointer(tokens: List[Any]) -> str:
+    return "".join(
+        "/" + str(token).replace("~", "~0").replace("/", "~1")
+        for token in reversed(tokens)
+    )
+
+
+def _bounded_str(value: Any, limit: int) -> str:
+    """Return ``str(value)``, or at least its first *limit* characters if
+    it's longer, without building the whole of it for a long string or a
+    large array or object."""
+    parts: List[str] = []
+    _write(value, parts, limit, False)
+    return "".join(parts)
+
+
+def _repr_start(value: str, length: int) -> str:
+    """Return ``repr()`` of the first *length* characters of *value*, quoted
+    as ``repr(value)`` would be."""
+    text = repr(value[:length])
+    quote = '"' if "'" in value and '"' not in value else "'"
+    if text[0] != quote:
+        inner = text[1:-1]
+        if quote == "'":
+            inner = inner.replace("'", "\\'")
+        text = quote + inner + quote
+    return text
+
+
+def _write(value: Any, parts: List[str], budget: int, nested: bool) -> int:
+    """Append the text of *value* to *parts* as ``str()`` would (``repr()``
+    if *nested* in an array or object), stopping once *budget* characters
+    have been written; returns what's left of the budget."""
+    kind = type(value)
+    if kind.__repr__ is list.__repr__ and kind.__str__ is object.__str__:
+        parts.append("[")
+        budget -= 1
+        for index, item in enumerate(value):
+            if budget <= 0:
+                return budget
+            if index:
+                parts.append(", ")
+                budget -= 2
+            budget = _write(item, parts, budget, True)
+        parts.append("]")
+        return budget - 1
+    if kind.__repr__ is dict.__repr__ and kind.__str__ is object.__str__:
+        parts.append("{")
+        budget -= 1
+        for index, (key, item) in enumerate(value.items()):
+            if budget <= 0:
+                return budget
+            if index:
+                parts.append(", ")
+                budget -= 2
+            budget = _write(key, parts, budget, True)
+            parts.append(": ")
+            budget = _write(item, parts, budget - 2, True)
+        parts.append("}")
+        return budget - 1
+    if isinstance(value, str) and len(value) > budget:
+        # Only the start of a long string is shown.
+        if nested and kind.__repr__ is str.__repr__:
+            text = _repr_start(value, max(budget, 0))
+        elif not nested and kind.__str__ is str.__str__:
+            text = value[: max(budget, 0)]
+        else:
+            text = repr(value) if nested else str(value)
+    else:
+        text = repr(value) if nested else str(value)
+    parts.append(text)
+    return budget - len(text)
+
+
+class ErrorRecord(object):
+    """One validation error.
+
+    *template* is a ``str.format`` template for *args*; *data* is the
+    offending value and *schema* the part of the schema it failed, which
+    provide the line numbers of integrated-mode documents.  ``str()`` gives
+    the message, with any value longer than ``max_value_length`` characters
+    truncated.  Once the message is formatted, the record lets go of *data*
+    and *args* (``data`` is ``None`` from then on), so errors that have been
+    read don't keep the document alive.
+
+    *keyword* is the keyword that failed.  ``instance_path`` and
+    ``schema_path`` are JSON pointers to the offending value and to the
+    keyword, with references followed transparently (the schema path runs
+    through the referring schemas, as if each reference were replaced by
+    its target).
+
+    With error aggregation, one record stands for every member of an array
+    or object that failed the same way: ``count`` is how many did,
+    ``instance_paths`` the paths of the first few, and *data* (the value
+    shown) that of the first.
+    """
+
+    __slots__ = (
+        "template",
+        "args",
+        "data",
+        "schema",
+        "keyword",
+        "depth",
+        "instance_tokens",
+        "schema_tokens",
+        "count",
+        "members",
+        "member_level",
+        "_message",
+    )
+
+    max_value_length = 200
+
+    def __init__(
+        self,
+        template: str,
+        data: Any = None,
+        schema: Any = None,
+        args: Tuple[Any, ...] = (),
+        keyword: Optional[str] = None,
+        depth: int = 0,
+    ):
+        self.template = template
+        self.args = args
+        self.data = data
+        self.schema = schema
+        self.keyword = keyword
+        # The locations are built up, leaf first, as the validate() calls
+        # the error was reported in return (see locate()).  depth is the
+        # number of those still to return.
+        self.depth = depth
+        self.instance_tokens: List[Any] = []
+        self.schema_tokens: List[Any] = []
+        # The aggregated failures, once there's more than one: the member
+        # tokens of the first few, and where they go in instance_tokens.
+        self.count = 1
+        self.members: Optional[List[Any]] = None
+        self.member_level = 0
+        self._message: Optional[str] = None
+
+    @property
+    def instance_path(self) -> str:
+        return _pointer(self.instance_tokens)
+
+    @property
+    def instance_paths(self) -> List[str]:
+        """The paths of the first few failures this record stands for."""
+        if self.members is None:
+            return [self.instance_path]
+        tokens = list(self.instance_tokens)
+        paths = []
+        for member in self.members:
+            tokens[self.member_level] = member
+            paths.append(_pointer(tokens))
+        return paths
+
+    @property
+    def schema_path(self) -> str:
+        if self.keyword is None:
+            return _pointer(self.schema_tokens)
+        return _pointer([self.keyword] + self.schema_tokens)
+
+    def locate(
+        self, depth: int, instance_token: Any, schema_tokens: Tuple[Any, ...]
+    ) -> bool:
+        """Prepend a step to the locations, if the error was reported deeper
+        than *depth*; returns whether it was."""
+        if self.depth <= depth:
+            return False
+        self.depth = depth
+        if instance_token is not None:
+            self.instance_tokens.append(instance_token)
+        self.schema_tokens.extend(reversed(schema_tokens))
+        return True
+
+    def group_key(self) -> Tuple[Any, ...]:
+        """What failures of different members of an array or object, just
+        located there, have in common if they failed the same way."""
+        return (
+            self.depth,
+            self.keyword,
+            tuple(self.schema_tokens),
+            tuple(self.instance_tokens[:-1]),
+        )
+
+    def can_absorb(self, other: "ErrorRecord") -> bool:
+        """Return whether *other*, with the same :meth:`group_key`, can be
+        counted in this record."""
+        if other.count != 1 or other.depth != self.depth:
+            return False
+        return (
+            self.members is None or self.member_level == len(self.instance_tokens) - 1
+        )
+
+    def absorb(self, other: "ErrorRecord", max_members: int) -> None:
+        """Count *other*'s failure in this record, keeping its location if
+        fewer than *max_members* are kept so far."""
+        if self.members is None:
+            self.member_level = len(self.instance_tokens) - 1
+            self.members = [self.instance_tokens[-1]]
+        self.count += 1
+        if len(self.members) < max_members:
+            self.members.append(other.instance_tokens[-1])
+
+    def __str__(self) -> str:
+        message = self._message
+        if message is None:
+            message = self._message = self._render()
+            self.args = ()
+            self.data = None
+        if self.members is not None:
+            message = "{} ({} times, at {}{})".format(
+                message,
+                self.count,
+                ", ".join(self.instance_paths),
+                ", ..." if self.count > len(self.members) else "",
+            )
+        return message
+
+    def __repr__(self) -> str:
+        return "<ErrorRecord {!r}>".format(str(self))
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        # The values referred to may be large, or not picklable, so only the
+        # formatted message is kept.
+        str(self)
+        return (
+            self._message,
+            self.keyword,
+            self.instance_tokens,
+            self.schema_tokens,
+            self.count,
+            self.members,
+            self.member_level,
+        )
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        message, keyword = state[:2]
+        self.__init__(message, keyword=keyword)  # type: ignore[misc]
+        (
+            self.instance_tokens,
+            self.schema_tokens,
+            self.count,
+            self.members,
+            self.member_level,
+        ) = state[2:]
+        self._message = message
+
+    def _render(self) -> str:
+        message = self.template
+        if self.args:
+            message = message.format(*[self._value(arg) for arg in self.args])
+        data, schema = self.data, self.schema
+        if hasattr(data, "line") and data.line is not None:
+            message = "Input line {}: {}".format(data.line, message)
+        if hasattr(schema, "line") and schema.line is not None:
+            message = "{} (schema line {})".format(message, schema.line)
+        return message
+
+    def _value(self, value: Any) -> Any:
+        if isinstance(value, (bool, int, float)) or value is None:
+            return value
+        text = _bounded_str(value, self.max_value_length + 1)
+        if len(text) > self.max_value_length:
+            text = text[: self.max_value_length] + "..."
+        return text
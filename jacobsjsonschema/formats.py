@@ -0,0 +1,292 @@
+"""Checks for the string formats defined by the JSON Schema specifications.
+
+Each check takes any instance and returns whether it's valid for the format;
+like every format, they only constrain strings, so other values pass.  They
+are plain functions over precompiled, anchored patterns (or no pattern at
+all), with the few range checks the patterns can't express done on the
+matched digits, so a valid string costs one match and a handful of integer
+comparisons.
+
+Formats are annotations unless asked for: a validator only checks them after
+:meth:`~jacobsjsonschema.draft4.Validator.use_builtin_formats`, and then only
+those its dialect defines (``DRAFT4_FORMATS``, ``DRAFT6_FORMATS`` and so on).
+"""
+
+import re
+from typing import Any, Callable, Dict, FrozenSet
+
+from .regex_cache import pattern_cache
+
+_DATE = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})\Z")
+_TIME = re.compile(
+    r"([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\.[0-9]+)?"
+    r"(?:[zZ]|([+-])([0-9]{2}):([0-9]{2}))\Z"
+)
+_DURATION = re.compile(
+    r"P(?:(?:[0-9]+Y(?:[0-9]+M(?:[0-9]+D)?)?|[0-9]+M(?:[0-9]+D)?|[0-9]+D)"
+    r"(?:T(?:[0-9]+H(?:[0-9]+M(?:[0-9]+S)?)?|[0-9]+M(?:[0-9]+S)?|[0-9]+S))?"
+    r"|T(?:[0-9]+H(?:[0-9]+M(?:[0-9]+S)?)?|[0-9]+M(?:[0-9]+S)?|[0-9]+S)"
+    r"|[0-9]+W)\Z"
+)
+_LABEL = re.compile(r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\Z")
+_IPV4 = re.compile(
+    r"(?:(?:25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9]?[0-9])\.){3}"
+    r"(?:25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9]?[0-9])\Z"
+)
+_HEX = frozenset("0123456789abcdefABCDEF")
+_LOCAL_PART = re.compile(
+    r"(?:[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r'|"(?:[^"\\\r\n]|\\.)*")\Z'
+)
+_UUID = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\Z"
+)
+_JSON_POINTER = re.compile(r"(?:/(?:[^~/]|~[01])*)*\Z")
+
+# RFC 3986, with the IP literal of a host checked separately.
+_UNRESERVED = r"A-Za-z0-9\-._~"
+_SUB_DELIMS = r"!$&'()*+,;="
+_PCT = r"%[0-9A-Fa-f]{2}"
+_PCHAR = r"(?:[{}{}:@]|{})".format(_UNRESERVED, _SUB_DELIMS, _PCT)
+_SEGMENT_NC = r"(?:[{}{}@]|{})+".format(_UNRESERVED, _SUB_DELIMS, _PCT)
+# userinfo@, then an IP literal (captured) or a registered name, then :port.
+_AUTHORITY = (
+    r"(?:(?:[{0}{1}:]|{2})*@)?(?:\[([^\]]*)\]|(?:[{0}{1}]|{2})*)(?::[0-9]*)?".format(
+        _UNRESERVED, _SUB_DELIMS, _PCT
+    )
+)
+_QUERY = r"(?:\?(?:{}|[/?])*)?(?:#(?:{}|[/?])*)?".format(_PCHAR, _PCHAR)
+_URI = re.compile(
+    r"[A-Za-z][A-Za-z0-9+\-.]*:"
+    r"(?://{0}(?:/{1}*)*|/?(?:{1}+(?:/{1}*)*)?)".format(_AUTHORITY, _PCHAR)
+    + _QUERY
+    + r"\Z"
+)
+_RELATIVE_REF = re.compile(
+    r"(?://{0}(?:/{1}*)*|/(?:{1}+(?:/{1}*)*)?|{2}(?:/{1}*)*|)".format(
+        _AUTHORITY, _PCHAR, _SEGMENT_NC
+    )
+    + _QUERY
+    + r"\Z"
+)
+_IP_FUTURE = re.compile(r"v[0-9A-Fa-f]+\.[{}{}:]+\Z".format(_UNRESERVED, _SUB_DELIMS))
+
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _valid_date(year: int, month: int, day: int) -> bool:
+    if not 1 <= month <= 12 or not 1 <= day <= _DAYS_IN_MONTH[month]:
+        return False
+    if month == 2 and day == 29:
+        return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    return True
+
+
+def _valid_time(match: Any) -> bool:
+    hour, minute, second, sign, offset_hour, offset_minute = match.groups()
+    hour = int(hour)
+    minute = int(minute)
+    if hour > 23 or minute > 59:
+        return False
+    if sign is not None:
+        offset_hour = int(offset_hour)
+        offset_minute = int(offset_minute)
+        if offset_hour > 23 or offset_minute > 59:
+            return False
+    second = int(second)
+    if second < 60:
+        return True
+    if second > 60:
+        return False
+    # A leap second is only valid at the end of a UTC day.
+    utc = hour * 60 + minute
+    if sign == "+":
+        utc -= offset_hour * 60 + offset_minute
+    elif sign == "-":
+        utc += offset_hour * 60 + offset_minute
+    return utc % 1440 == 23 * 60 + 59
+
+
+def is_date_time(value: Any) -> bool:
+    """RFC 3339 ``date-time``."""
+    if not isinstance(value, str):
+        return True
+    if len(value) < 20 or value[10] not in "Tt":
+        return False
+    date = _DATE.match(value, 0, 10)
+    time = _TIME.match(value, 11)
+    if date is None or time is None:
+        return False
+    year, month, day = date.groups()
+    return _valid_date(int(year), int(month), int(day)) and _valid_time(time)
+
+
+def is_date(value: Any) -> bool:
+    """RFC 3339 ``full-date``."""
+    if not isinstance(value, str):
+        return True
+    match = _DATE.match(value)
+    if match is None:
+        return False
+    year, month, day = match.groups()
+    return _valid_date(int(year), int(month), int(day))
+
+
+def is_time(value: Any) -> bool:
+    """RFC 3339 ``full-time``, which includes the offset from UTC."""
+    if not isinstance(value, str):
+        return True
+    match = _TIME.match(value)
+    return match is not None and _valid_time(match)
+
+
+def is_duration(value: Any) -> bool:
+    """RFC 3339 (appendix A) ``duration``."""
+    if not isinstance(value, str):
+        return True
+    return _DURATION.match(value) is not None
+
+
+def is_hostname(value: Any) -> bool:
+    """RFC 1123 host name."""
+    if not isinstance(value, str):
+        return True
+    if not value or len(value) > 253:
+        return False
+    for label in value.split("."):
+        if _LABEL.match(label) is None:
+            return False
+    return True
+
+
+def is_ipv4(value: Any) -> bool:
+    """Dotted-quad IPv4 address, without leading zeros."""
+    if not isinstance(value, str):
+        return True
+    return _IPV4.match(value) is not None
+
+
+def _is_hex_group(group: str) -> bool:
+    return 0 < len(group) <= 4 and _HEX.issuperset(group)
+
+
+def _ipv6_units(groups: str, last: bool) -> int:
+    """Return the number of 16-bit units in a colon-separated run of
+    *groups*, the *last* of which may be an IPv4 address; -1 if invalid."""
+    if not groups:
+        return 0
+    parts = groups.split(":")
+    units = len(parts)
+    if last and "." in parts[-1]:
+        if _IPV4.match(parts[-1]) is None:
+            return -1
+        parts.pop()
+        units += 1
+    for part in parts:
+        if not _is_hex_group(part):
+            return -1
+    return units
+
+
+def is_ipv6(value: Any) -> bool:
+    """RFC 4291 IPv6 address, in any of its text forms (but without a zone)."""
+    if not isinstance(value, str):
+        return True
+    if not 2 <= len(value) <= 45:
+        return False
+    head, compressed, tail = value.partition("::")
+    if not compressed:
+        return _ipv6_units(value, True) == 8
+    if "::" in tail:
+        return False
+    head_units = _ipv6_units(head, False)
+    tail_units = _ipv6_units(tail, True)
+    return head_units >= 0 and tail_units >= 0 and head_units + tail_units <= 7
+
+
+def is_email(value: Any) -> bool:
+    """RFC 5321 mailbox: a dot-atom or quoted local part, and a host name or
+    an address literal."""
+    if not isinstance(value, str):
+        return True
+    local, at, domain = value.rpartition("@")
+    if not at or not local or _LOCAL_PART.match(local) is None:
+        return False
+    if domain.startswith("[") and domain.endswith("]"):
+        literal = domain[1:-1]
+        if literal[:5].lower() == "ipv6:":
+            return is_ipv6(literal[5:])
+        return is_ipv4(literal)
+    return is_hostname(domain)
+
+
+def _valid_authority(match: Any) -> bool:
+    literal = match.group(1)
+    return literal is None or is_ipv6(literal) or _IP_FUTURE.match(literal) is not None
+
+
+def is_uri(value: Any) -> bool:
+    """RFC 3986 absolute URI (with a scheme)."""
+    if not isinstance(value, str):
+        return True
+    match = _URI.match(value)
+    return match is not None and _valid_authority(match)
+
+
+def is_uri_reference(value: Any) -> bool:
+    """RFC 3986 URI or relative reference."""
+    if not isinstance(value, str):
+        return True
+    match = _URI.match(value) or _RELATIVE_REF.match(value)
+    return match is not None and _valid_authority(match)
+
+
+def is_uuid(value: Any) -> bool:
+    """RFC 4122 UUID, in its hyphenated form."""
+    if not isinstance(value, str):
+        return True
+    return _UUID.match(value) is not None
+
+
+def is_json_pointer(value: Any) -> bool:
+    """RFC 6901 JSON pointer."""
+    if not isinstance(value, str):
+        return True
+    return _JSON_POINTER.match(value) is not None
+
+
+def is_regex(value: Any) -> bool:
+    """A regular expression that compiles (see
+    :mod:`~jacobsjsonschema.regex_cache`)."""
+    if not isinstance(value, str):
+        return True
+    try:
+        pattern_cache.compile(value)
+    except Exception:  # re.error, or the regex module's error
+        return False
+    return True
+
+
+FORMAT_CHECKERS: Dict[str, Callable[[Any], bool]] = {
+    "date-time": is_date_time,
+    "date": is_date,
+    "time": is_time,
+    "duration": is_duration,
+    "email": is_email,
+    "hostname": is_hostname,
+    "ipv4": is_ipv4,
+    "ipv6": is_ipv6,
+    "uri": is_uri,
+    "uri-reference": is_uri_reference,
+    "uuid": is_uuid,
+    "json-pointer": is_json_pointer,
+    "regex": is_regex,
+}
+
+# The formats each dialect defines, out of those above.
+DRAFT4_FORMATS: FrozenSet[str] = frozenset(
+    {"date-time", "email", "hostname", "ipv4", "ipv6", "uri"}
+)
+DRAFT6_FORMATS: FrozenSet[str] = DRAFT4_FORMATS | {"uri-reference", "json-pointer"}
+DRAFT7_FORMATS: FrozenSet[str] = DRAFT6_FORMATS | {"date", "time", "regex"}
+DRAFT2019_09_FORMATS: FrozenSet[str] = DRAFT7_FORMATS | {"duration", "uuid"}
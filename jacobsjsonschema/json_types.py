@@ -1,15 +1,107 @@
-from typing import Set, Union
-from dataclasses import dataclass, field
+from typing import Optional, Set, Union
 
 JsonTypes = Union[str, dict, list, int, float, None]
 
 
-@dataclass
-class AnnotationFrame:
+class EvaluatedItems(object):
+    """The indices of an array's items that were evaluated.
+
+    Items are nearly always evaluated from the start of the array (``items``,
+    ``prefixItems``, ``unevaluatedItems``), so that's kept as a high-water
+    mark: every index below ``prefix`` was evaluated.  Any other indices (from
+    2020-12 ``contains``, say) are set in the ``bits`` bitset.
+    """
+
+    __slots__ = ("prefix", "bits")
+
+    def __init__(self) -> None:
+        self.prefix = 0
+        self.bits = bytearray()
+
+    def add(self, index: int) -> None:
+        if index == self.prefix:
+            self.prefix += 1
+        elif index > self.prefix:
+            byte = index >> 3
+            if byte >= len(self.bits):
+                self.bits.extend(bytes(byte + 1 - len(self.bits)))
+            self.bits[byte] |= 1 << (index & 7)
+
+    def add_range(self, start: int, stop: int) -> None:
+        if start <= self.prefix:
+            if stop > self.prefix:
+                self.prefix = stop
+        else:
+            for index in range(start, stop):
+                self.add(index)
+
+    def update(self, other: "EvaluatedItems") -> None:
+        self.add_range(0, other.prefix)
+        if other.bits:
+            size = max(len(self.bits), len(other.bits))
+            merged = int.from_bytes(self.bits, "little") | int.from_bytes(
+                other.bits, "little"
+            )
+            self.bits = bytearray(merged.to_bytes(size, "little"))
+
+    def __contains__(self, index: int) -> bool:
+        if index < self.prefix:
+            return True
+        byte = index >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] >> (index & 7) & 1)
+
+
+class AnnotationFrame(object):
     """Tracks which properties/items were evaluated during a single schema evaluation.
 
-    Used by unevaluatedProperties/unevaluatedItems in draft 2019-09+.
+    Used by unevaluatedProperties/unevaluatedItems in draft 2019-09+.  Nothing
+    is allocated until something is recorded, and merging into an empty frame
+    takes over the other frame's records rather than copying them, so frames
+    cost next to nothing for schemas that evaluate no properties or items.
     """
 
-    evaluated_property_keys: Set[str] = field(default_factory=set)
-    evaluated_item_indices: Set[int] = field(default_factory=set)
+    __slots__ = ("property_keys", "items")
+
+    def __init__(self) -> None:
+        self.property_keys: Optional[Set[str]] = None
+        self.items: Optional[EvaluatedItems] = None
+
+    def add_property(self, key: str) -> None:
+        if self.property_keys is None:
+            self.property_keys = {key}
+        else:
+            self.property_keys.add(key)
+
+    def has_property(self, key: str) -> bool:
+        return self.property_keys is not None and key in self.property_keys
+
+    def add_item(self, index: int) -> None:
+        if self.items is None:
+            self.items = EvaluatedItems()
+        self.items.add(index)
+
+    def add_items(self, start: int, stop: int) -> None:
+        if self.items is None:
+            self.items = EvaluatedItems()
+        self.items.add_range(start, stop)
+
+    def has_item(self, index: int) -> bool:
+        return self.items is not None and index in self.items
+
+    def merge(self, other: "AnnotationFrame") -> None:
+        """Add *other*'s records to this frame.  *other* mustn't be used
+        afterwards, as its records may now be shared."""
+        if other.property_keys is not None:
+            if self.property_keys is None:
+                self.property_keys = other.property_keys
+            else:
+                self.property_keys.update(other.property_keys)
+        if other.items is not None:
+            if self.items is None:
+                self.items = other.items
+            else:
+                self.items.update(other.items)
+
+    def clear(self) -> None:
+        self.property_keys = None
+        self.items = None
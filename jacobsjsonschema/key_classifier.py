@@ -0,0 +1,93 @@
+"""Classification of object keys against a schema's ``patternProperties``.
+
+``patternProperties`` and ``additionalProperties`` both need to know which
+patterns match each key of an object.  Searching every pattern for every key,
+once per keyword, costs ``keys x patterns x 2`` regex searches per object.  A
+:class:`KeyClassifier` answers the question with one search per key and
+remembers the answer, since the same keys tend to turn up in every document.
+"""
+
+import re
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from .regex_cache import pattern_cache
+
+# Numeric backreferences would refer to the wrong group once patterns are
+# combined, so patterns containing anything that looks like one are searched
+# individually instead.
+_NUMERIC_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+class KeyClassifier(object):
+    """Finds which of a fixed set of patterns match a given key.
+
+    Where possible the patterns are combined into a single regex: one
+    optional, zero-width lookahead per pattern, each followed by a named empty
+    group that participates in the match only if its pattern is found
+    somewhere in the key.  Otherwise each pattern is searched in turn through
+    the shared pattern cache.
+    """
+
+    def __init__(self, patterns: Collection[str], memo_size: int = 4096):
+        # Holding the collection keeps it alive, so its id() can key caches.
+        self.source = patterns
+        self.patterns: List[str] = list(patterns)
+        self.memo_size = memo_size
+        self._memo: Dict[str, Tuple[int, ...]] = {}
+        self._combined = self._combine(self.patterns)
+        self._group_numbers: List[int] = []
+        if self._combined is not None:
+            self._group_numbers = [
+                self._combined.groupindex["_jjs{}".format(idx)]
+                for idx in range(len(self.patterns))
+            ]
+
+    @staticmethod
+    def _combine(patterns: List[str]) -> Optional[Any]:
+        if not patterns:
+            return None
+        for pattern in patterns:
+            if _NUMERIC_BACKREFERENCE.search(pattern):
+                return None
+            try:
+                if pattern_cache.engine(pattern) != "re":
+                    return None
+            except Exception:
+                # Reported when the pattern is first searched, as before.
+                return None
+        combined = "".join(
+            "(?:(?=[\\s\\S]*?(?:{}))(?P<_jjs{}>))?".format(pattern, idx)
+            for idx, pattern in enumerate(patterns)
+        )
+        try:
+            return re.compile(combined)
+        except re.error:
+            return None
+
+    def matching(self, key: str) -> Tuple[int, ...]:
+        """Return the indices of the patterns found in *key*, in schema order."""
+        found = self._memo.get(key)
+        if found is not None:
+            return found
+        if self._combined is not None:
+            match = self._combined.match(key)
+            found = tuple(
+                idx
+                for idx, group in enumerate(self._group_numbers)
+                if match.start(group) != -1
+            )
+        else:
+            found = tuple(
+                idx
+                for idx, pattern in enumerate(self.patterns)
+                if pattern_cache.search(pattern, key)
+            )
+        if len(self._memo) < self.memo_size:
+            self._memo[key] = found
+        return found
+
+    def is_additional(self, key: str, properties: Optional[Collection[str]]) -> bool:
+        """Return ``True`` if *key* is neither a named property nor pattern-matched."""
+        if properties is not None and key in properties:
+            return False
+        return not self.matching(key)
@@ -0,0 +1,186 @@
+"""Validating large newline-delimited JSON files.
+
+The file is memory-mapped rather than read, and each line is decoded
+straight from the map, so only the line being validated is ever copied into
+Python.  Invalid lines are reported by their byte offset, which
+:func:`read_line` can use to fetch them again without another scan.
+"""
+
+import mmap
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+from . import parallel
+from .batch import ErrorMessages
+from .draft4 import Validator
+from .parallel import validate_encoded
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+class NdjsonResult(object):
+    """Outcome of validating the lines of an NDJSON file.
+
+    ``count`` is the number of documents (non-blank lines) validated.
+    ``invalid_offsets`` holds the byte offset of each invalid line, in file
+    order, and ``errors`` maps each of those offsets to its messages.
+    """
+
+    __slots__ = ("count", "invalid_offsets", "errors")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.invalid_offsets = array("Q")
+        self.errors = ErrorMessages()
+
+    @property
+    def valid_count(self) -> int:
+        return self.count - len(self.invalid_offsets)
+
+    @property
+    def all_valid(self) -> bool:
+        return not self.invalid_offsets
+
+    def extend(self, other: "NdjsonResult") -> None:
+        """Append the result of a later part of the same file."""
+        self.count += other.count
+        self.invalid_offsets.extend(other.invalid_offsets)
+        for offset in other.errors:
+            self.errors[offset] = other.errors.records(offset)
+
+    def __repr__(self) -> str:
+        return "<NdjsonResult {} documents, {} invalid>".format(
+            self.count, len(self.invalid_offsets)
+        )
+
+
+def iter_lines(
+    buffer: Buffer, start: int = 0, end: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """Yield the start and end offsets of each non-empty line of *buffer*
+    between *start* and *end*, without the line ending."""
+    if end is None:
+        end = len(buffer)
+    while start < end:
+        stop = buffer.find(b"\n", start, end)
+        if stop == -1:
+            stop = end
+        line_end = stop
+        if line_end > start and buffer[line_end - 1] == 0x0D:
+            line_end -= 1
+        if line_end > start:
+            yield start, line_end
+        start = stop + 1
+
+
+def line_offsets(buffer: Buffer) -> array:
+    """Index the start offset of every non-empty line of *buffer*."""
+    return array("Q", (start for start, _ in iter_lines(buffer)))
+
+
+def split_ranges(buffer: Buffer, parts: int) -> List[Tuple[int, int]]:
+    """Split *buffer* into at most *parts* byte ranges of roughly equal size,
+    each starting at the beginning of a line."""
+    size = len(buffer)
+    bounds = [0]
+    for part in range(1, parts):
+        position = buffer.find(b"\n", max(size * part // parts, bounds[-1]))
+        position = size if position == -1 else position + 1
+        if position >= size:
+            break
+        if position > bounds[-1]:
+            bounds.append(position)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def validate_range(
+    validator: Validator,
+    buffer: Buffer,
+    start: int = 0,
+    end: Optional[int] = None,
+    chunk_size: int = 1024,
+) -> NdjsonResult:
+    """Validate each non-empty line of *buffer* between *start* and *end*,
+    which must fall on line boundaries."""
+    result = NdjsonResult()
+    lines = iter_lines(buffer, start, end)
+    while True:
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == chunk_size:
+                break
+        if not chunk:
+            return result
+        checked = validate_encoded(validator, [buffer[a:b] for a, b in chunk])
+        result.count += len(chunk)
+        for index in checked.invalid_indices():
+            offset = chunk[index][0]
+            result.invalid_offsets.append(offset)
+            result.errors[offset] = checked.errors.records(index)
+
+
+def _validate_range_in_worker(
+    path: str, start: int, end: int, chunk_size: int
+) -> NdjsonResult:
+    assert parallel._worker_validator is not None
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return validate_range(
+                parallel._worker_validator, buffer, start, end, chunk_size
+            )
+
+
+def validate_file(
+    validator: Union[Validator, Callable[[], Validator]],
+    path: str,
+    workers: int = 1,
+    chunk_size: int = 1024,
+    mp_context: Any = None,
+) -> NdjsonResult:
+    """Validate every non-empty line of the NDJSON file at *path*.
+
+    With more than one worker, the file is split into byte ranges that are
+    validated in a pool of *workers* processes, each mapping the file
+    itself; *validator* can then be a factory, as for
+    :class:`~jacobsjsonschema.parallel.ParallelValidator`.  Lines that aren't
+    valid JSON are reported as invalid.
+    """
+    result = NdjsonResult()
+    with open(path, "rb") as f:
+        if not f.seek(0, 2):
+            return result
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if workers <= 1:
+                if not isinstance(validator, Validator):
+                    validator = validator()
+                return validate_range(validator, buffer, 0, None, chunk_size)
+            ranges = split_ranges(buffer, workers * 4)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=parallel._init_worker,
+        initargs=(validator,),
+    ) as executor:
+        futures = [
+            executor.submit(_validate_range_in_worker, path, start, end, chunk_size)
+            for start, end in ranges
+        ]
+        for future in futures:
+            result.extend(future.result())
+    return result
+
+
+def read_line(path: str, offset: int) -> bytes:
+    """Read the line of the file at *path* that starts at *offset*."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        line = f.readline()
+    # One line ending, as iter_lines() strips it.
+    if line.endswith(b"\n"):
+        line = line[:-1]
+    if line.endswith(b"\r"):
+        line = line[:-1]
+    return line
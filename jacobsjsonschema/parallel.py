@@ -0,0 +1,147 @@
+"""Validating documents across several worker processes.
+
+Validation is CPU-bound pure Python, so a single process only ever uses one
+core.  :class:`ParallelValidator` sends a validator to each process of a pool
+once, then streams chunks of documents to the workers and collects their
+results back in input order.
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .batch import BatchResult, ErrorMessages
+from .draft4 import Validator
+from .errors import ErrorRecord
+
+# Set in each worker process by _init_worker().
+_worker_validator: Optional[Validator] = None
+
+ChunkResult = Tuple[bytes, ErrorMessages]
+
+
+def _init_worker(validator: Union[Validator, Callable[[], Validator]]) -> None:
+    global _worker_validator
+    if isinstance(validator, Validator):
+        _worker_validator = validator
+    else:
+        _worker_validator = validator()
+
+
+def _decoded(
+    documents: List[Union[bytes, str]], errors: Dict[int, List[ErrorRecord]]
+) -> Iterator[Any]:
+    for index, document in enumerate(documents):
+        try:
+            yield json.loads(document)
+        except ValueError as e:
+            errors[index] = [ErrorRecord("Document is not valid JSON: {}".format(e))]
+            # Keeps the indices aligned; the result is overwritten later.
+            yield None
+
+
+def validate_encoded(
+    validator: Validator, documents: List[Union[bytes, str]]
+) -> BatchResult:
+    """Decode and validate each of *documents*, which are JSON text.
+
+    Text that isn't valid JSON is reported as an invalid document.
+    """
+    decode_errors: Dict[int, List[ErrorRecord]] = {}
+    result = validator.validate_many(_decoded(documents, decode_errors))
+    for index in decode_errors:
+        result.valid[index] = 0
+        result.errors[index] = decode_errors[index]
+    return result
+
+
+def _validate_chunk(documents: List[Any], encoded: bool) -> ChunkResult:
+    assert _worker_validator is not None
+    if encoded:
+        result = validate_encoded(_worker_validator, documents)
+    else:
+        result = _worker_validator.validate_many(documents)
+    return bytes(result.valid), result.errors
+
+
+class ParallelValidator(object):
+    """Validates documents in a pool of worker processes.
+
+    *validator* is pickled and sent to each worker once, when the pool
+    starts.  A validator whose schema can't be pickled (one loaded with
+    ``jacobs-json-doc``, for example) can be replaced by a picklable factory,
+    such as a module-level function, that builds it in each worker.
+
+    *workers* defaults to the number of CPUs.  Documents are sent to the
+    workers *chunk_size* at a time, with at most two chunks per worker
+    outstanding, so the input is read no faster than it's validated.
+    """
+
+    def __init__(
+        self,
+        validator: Union[Validator, Callable[[], Validator]],
+        workers: Optional[int] = None,
+        chunk_size: int = 512,
+        mp_context: Any = None,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(validator,),
+        )
+
+    def validate_many(
+        self, documents: Iterable[Any], encoded: bool = False
+    ) -> BatchResult:
+        """Validate *documents* in the worker processes.
+
+        Returns the same :class:`BatchResult` that ``Validator.validate_many``
+        would.  With *encoded*, each document is JSON text (``bytes`` or
+        ``str``) and is decoded in the worker, which saves pickling the decoded
+        objects; text that isn't valid JSON is reported as an invalid document.
+        """
+        result = BatchResult()
+        pending: Deque[Future] = deque()
+        offset = 0
+        iterator = iter(documents)
+        while True:
+            while len(pending) < 2 * self.workers:
+                chunk = list(islice(iterator, self.chunk_size))
+                if not chunk:
+                    break
+                pending.append(self._executor.submit(_validate_chunk, chunk, encoded))
+            if not pending:
+                return result
+            valid, errors = pending.popleft().result()
+            for index in errors:
+                result.errors[offset + index] = errors.records(index)
+            result.valid += valid
+            offset += len(valid)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "ParallelValidator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
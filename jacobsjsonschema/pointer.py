@@ -0,0 +1,41 @@
+"""JSON Pointers (RFC 6901), as found in the fragment of a ``$ref``."""
+
+from typing import Any, List
+from urllib.parse import unquote
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Split *pointer* into its reference tokens, unescaping ``~1`` and ``~0``.
+
+    *pointer* may be percent-encoded, as it is in a URI fragment.  The empty
+    pointer, which refers to the whole document, has no tokens.
+    """
+    pointer = unquote(pointer)
+    if not pointer:
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError("Invalid JSON pointer '{}'".format(pointer))
+    return [
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    ]
+
+
+def resolve_pointer(document: Any, pointer: str) -> Any:
+    """Return the value within *document* that *pointer* refers to.
+
+    Raises ``LookupError`` (``KeyError`` or ``IndexError``) if there's no such
+    value.
+    """
+    node = document
+    for token in parse_pointer(pointer):
+        if isinstance(node, list):
+            if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+                raise IndexError(
+                    "Invalid array index '{}' in JSON pointer '{}'".format(
+                        token, pointer
+                    )
+                )
+            node = node[int(token)]
+        else:
+            node = node[token]
+    return node
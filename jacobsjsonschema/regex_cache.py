@@ -0,0 +1,90 @@
+"""Process-wide cache of compiled ``pattern``/``patternProperties`` regexes.
+
+JSON Schema patterns are ECMA-262 regexes.  Most compile with Python's ``re``,
+but some (``\\p{Letter}`` and other unicode property escapes) need the
+``regex`` module.  Compiling through this cache tries each engine once per
+pattern and remembers the result, so evaluating a pattern costs one dict
+lookup instead of a compile attempt (and, for ECMA-only patterns, a failed
+``re`` compile every time).
+"""
+
+import re
+from collections import OrderedDict, namedtuple
+from typing import Any
+
+try:
+    import regex as _regex  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover
+    _regex = None  # type: ignore[assignment]
+
+PatternCacheInfo = namedtuple(
+    "PatternCacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"]
+)
+
+
+class PatternCache(object):
+    """A bounded LRU mapping of pattern source strings to compiled patterns.
+
+    The cache takes no locks.  Concurrent use from several threads is safe, but
+    the statistics and recency order are then approximate.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._patterns: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def compile(self, pattern: str) -> Any:
+        """Return the compiled form of *pattern*, compiling it on first use.
+
+        Raises ``re.error`` (or the ``regex`` module's error) if no engine can
+        compile the pattern; failures are not cached.
+        """
+        compiled = self._patterns.get(pattern)
+        if compiled is not None:
+            self.hits += 1
+            try:
+                self._patterns.move_to_end(pattern)
+            except KeyError:  # evicted by another thread meanwhile
+                pass
+            return compiled
+        self.misses += 1
+        try:
+            compiled = re.compile(pattern)
+        except re.error:
+            if _regex is None:
+                raise
+            compiled = _regex.compile(pattern)
+        self._patterns[pattern] = compiled
+        while len(self._patterns) > self.maxsize:
+            try:
+                self._patterns.popitem(last=False)
+            except KeyError:
+                break
+            self.evictions += 1
+        return compiled
+
+    def search(self, pattern: str, string: str) -> Any:
+        return self.compile(pattern).search(string)
+
+    def engine(self, pattern: str) -> str:
+        """Return ``"re"`` or ``"regex"``: the module that compiles *pattern*."""
+        return "re" if isinstance(self.compile(pattern), re.Pattern) else "regex"
+
+    def cache_info(self) -> PatternCacheInfo:
+        return PatternCacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self._patterns)
+        )
+
+    def clear(self) -> None:
+        """Drop every cached pattern and reset the statistics."""
+        self._patterns.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+# Shared by every validator in the process.
+pattern_cache = PatternCache()
@@ -0,0 +1,119 @@
+"""Cache of remote schema documents referenced with a string ``$ref``.
+
+A ``$ref`` to another document (``"other.json#/definitions/thing"``) is
+validated by a separate validator for that document.  The registry loads each
+document once, keeps its validator, and remembers where each JSON pointer in
+it leads, so following a remote reference again costs a couple of dict
+lookups.
+"""
+
+from collections import OrderedDict, namedtuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .draft4 import Validator
+
+RegistryInfo = namedtuple(
+    "RegistryInfo", ["hits", "misses", "evictions", "maxsize", "currsize"]
+)
+
+
+class _Document(object):
+    __slots__ = ("validator", "targets")
+
+    def __init__(self, validator: "Validator") -> None:
+        self.validator = validator
+        # Subschemas of the document, keyed by JSON pointer.
+        self.targets: Dict[str, Any] = {}
+
+
+class ReferenceRegistry(object):
+    """Remote schema documents and their validators, keyed by URI.
+
+    A validator is kept per document and per validator configuration (class,
+    error reporting mode, error limits and aggregation, custom formats, file
+    loader and compile backend), since documents are validated by the same
+    kind of validator as the one holding the reference.  Validators with
+    different configurations can share a registry; each gets validators
+    configured like itself.  With a
+    *maxsize*, the least recently used documents are evicted beyond that
+    many.  Like :class:`~jacobsjsonschema.regex_cache.PatternCache`, the
+    registry takes no locks; concurrent use is safe, but the statistics are
+    then approximate.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = maxsize
+        self._documents: "OrderedDict[Tuple[Any, ...], _Document]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def resolve(
+        self, owner: "Validator", uri: str, path: str, load: Callable[[str], Any]
+    ) -> Tuple["Validator", Any]:
+        """Return the validator for the document at *uri* and the subschema
+        at *path* within it, loading the document with *load* on first use.
+
+        The validator is built like *owner*, with the same error limits and
+        aggregation, and shares its custom formats, file loader and this
+        registry.
+        """
+        key = (
+            uri,
+            owner.__class__,
+            owner._lazy_error_reporting,
+            owner._max_errors,
+            owner._max_errors_per_location,
+            owner._aggregated_locations,
+            # By id(): the remote validator holds on to both, so the ids
+            # stay valid while the key is in use.
+            owner._custom_formats_key(),
+            id(owner._file_loader),
+            owner._compile_backend,
+        )
+        document = self._documents.get(key)
+        if document is not None:
+            self.hits += 1
+            if self.maxsize is not None:
+                try:
+                    self._documents.move_to_end(key)
+                except KeyError:  # evicted by another thread meanwhile
+                    pass
+        else:
+            self.misses += 1
+            validator = owner.__class__(load(uri), owner._lazy_error_reporting)
+            validator._format_validators.update(owner._custom_formats())
+            validator._max_errors = owner._max_errors
+            validator._max_errors_per_location = owner._max_errors_per_location
+            validator._aggregated_locations = owner._aggregated_locations
+            validator._file_loader = owner._file_loader
+            validator._registry = self
+            if owner._compile_backend is not None:
+                validator.compile(owner._compile_backend)
+            document = _Document(validator)
+            self._documents[key] = document
+            if self.maxsize is not None:
+                while len(self._documents) > self.maxsize:
+                    try:
+                        self._documents.popitem(last=False)
+                    except KeyError:
+                        break
+                    self.evictions += 1
+        target = document.targets.get(path)
+        if target is None:
+            target = document.validator.walk_schema_from_root(path)
+            document.targets[path] = target
+        return document.validator, target
+
+    def cache_info(self) -> RegistryInfo:
+        return RegistryInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self._documents)
+        )
+
+    def clear(self) -> None:
+        """Drop every cached document and reset the statistics."""
+        self._documents.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -0,0 +1,560 @@
+"""Validating a JSON document while it's being read.
+
+:func:`iter_events` tokenizes JSON text incrementally, turning it into a
+stream of parse events, and :class:`StreamingValidator` applies a schema to
+those events as they arrive.  Arrays and objects whose schema only uses
+keywords that can be checked one member at a time (``items``,
+``properties``, ``required``, ``minItems``, ``contains`` and the like) are
+never built: each member is checked and dropped, and only counts, the
+required keys seen and, for ``uniqueItems``, a canonical copy of each item
+are kept.  Any other value is built and handed to ``Validator.validate``, so
+memory depends on the nesting depth and the largest such value, not on the
+whole document.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .bool_compare_util import canonical_json
+from .draft4 import ErrorLimitReached, JsonSchemaValidationError, Validator
+from .json_types import AnnotationFrame
+
+Event = Tuple[str, Any]
+
+_TOKEN = re.compile(
+    r"""
+    [ \t\n\r]*
+    (?:
+        ([{}\[\],:])
+      | "([^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*)"
+      | (-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?)
+      | (true|false|null)
+    )
+    """,
+    re.VERBOSE,
+)
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+# Parser states: what's allowed next.
+_VALUE, _FIRST_VALUE, _KEY, _FIRST_KEY, _COLON, _AFTER_VALUE = range(6)
+
+
+def _tokens(stream: Any, chunk_size: int) -> Iterator[Tuple[str, Any, int]]:
+    # Yields (kind, value, position), where kind is a punctuation character,
+    # "string" or "scalar".
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    consumed = 0
+    eof = False
+    while True:
+        match = _TOKEN.match(buf, pos)
+        if match is None or (
+            # A number running to the end of the buffer may continue.
+            not eof
+            and match.group(3) is not None
+            and _NUMBER_TAIL.match(buf, match.end()).end() == len(buf)  # type: ignore[union-attr]
+        ):
+            rest = buf[pos:].lstrip(" \t\n\r")
+            # Only an unfinished string can be longer than the longest
+            # partial token that more text could complete.
+            if rest and (eof or match is None and rest[0] != '"' and len(rest) > 5):
+                raise ValueError(
+                    "Invalid JSON at character {}".format(
+                        consumed + len(buf) - len(rest)
+                    )
+                )
+            if eof:
+                return
+            chunk = stream.read(chunk_size)
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk, not chunk)
+            if not chunk:
+                eof = True
+            consumed += pos
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        pos = match.end()
+        punctuation, string, number, fraction, exponent, literal = match.groups()
+        start = consumed + pos - len(match.group(0).lstrip(" \t\n\r"))
+        if punctuation is not None:
+            yield punctuation, None, start
+        elif string is not None:
+            if "\\" in string:
+                string = json.loads('"' + string + '"')
+            yield "string", string, start
+        elif number is not None:
+            if fraction is None and exponent is None:
+                yield "scalar", int(number), start
+            else:
+                yield "scalar", float(number), start
+        else:
+            yield "scalar", _LITERALS[literal], start
+
+
+def iter_events(stream: Any, chunk_size: int = 65536) -> Iterator[Event]:
+    """Parse the JSON document read from *stream*, a binary (UTF-8) or text
+    file object, into ``(event, value)`` pairs.
+
+    The events are ``start_object``, ``key`` (with the key), ``end_object``,
+    ``start_array``, ``end_array`` and ``scalar`` (with the string, number,
+    boolean or ``None``).  *stream* is read *chunk_size* at a time.  Raises
+    ``ValueError`` if the text isn't a single JSON document.
+    """
+    stack: List[str] = []
+    expect = _VALUE
+    for kind, value, position in _tokens(stream, chunk_size):
+        if expect == _AFTER_VALUE and stack:
+            if kind == ",":
+                expect = _KEY if stack[-1] == "{" else _VALUE
+                continue
+            if kind == "]" and stack[-1] == "[":
+                stack.pop()
+                yield "end_array", None
+                continue
+            if kind == "}" and stack[-1] == "{":
+                stack.pop()
+                yield "end_object", None
+                continue
+        elif expect == _COLON:
+            if kind == ":":
+                expect = _VALUE
+                continue
+        elif expect == _KEY or expect == _FIRST_KEY:
+            if kind == "string":
+                yield "key", value
+                expect = _COLON
+                continue
+            if kind == "}" and expect == _FIRST_KEY:
+                stack.pop()
+                yield "end_object", None
+                expect = _AFTER_VALUE
+                continue
+        elif expect != _AFTER_VALUE:
+            if kind == "string" or kind == "scalar":
+                yield "scalar", value
+                expect = _AFTER_VALUE
+                continue
+            if kind == "[":
+                stack.append(kind)
+                yield "start_array", None
+                expect = _FIRST_VALUE
+                continue
+            if kind == "{":
+                stack.append(kind)
+                yield "start_object", None
+                expect = _FIRST_KEY
+                continue
+            if kind == "]" and expect == _FIRST_VALUE:
+                stack.pop()
+                yield "end_array", None
+                expect = _AFTER_VALUE
+                continue
+        raise ValueError("Invalid JSON at character {}".format(position))
+    if stack or expect != _AFTER_VALUE:
+        raise ValueError("Unexpected end of JSON document")
+
+
+def build_value(event: str, value: Any, events: Iterator[Event]) -> Any:
+    """Build the value that starts with *event*, taking the rest from
+    *events*."""
+    if event == "scalar":
+        return value
+    root: Union[list, dict] = [] if event == "start_array" else {}
+    containers: List[Any] = [root]
+    keys: List[Optional[str]] = [None]
+    for event, value in events:
+        if event == "key":
+            keys[-1] = value
+            continue
+        if event == "end_array" or event == "end_object":
+            containers.pop()
+            keys.pop()
+            if not containers:
+                return root
+            continue
+        if event == "start_array" or event == "start_object":
+            value = [] if event == "start_array" else {}
+        parent = containers[-1]
+        if isinstance(parent, list):
+            parent.append(value)
+        else:
+            parent[keys[-1]] = value
+        if event != "scalar":
+            containers.append(value)
+            keys.append(None)
+    raise ValueError("Unexpected end of JSON document")
+
+
+def _skip_value(event: str, events: Iterator[Event]) -> None:
+    if event == "scalar":
+        return
+    depth = 1
+    for event, _ in events:
+        if event == "start_array" or event == "start_object":
+            depth += 1
+        elif event == "end_array" or event == "end_object":
+            depth -= 1
+            if not depth:
+                return
+
+
+# Keywords that only apply to strings and numbers, so are ignored on arrays
+# and objects, and keywords that don't validate at all.
+_IGNORED_KEYWORDS = {
+    "minLength",
+    "maxLength",
+    "pattern",
+    "format",
+    "multipleOf",
+    "maximum",
+    "minimum",
+    "exclusiveMaximum",
+    "exclusiveMinimum",
+    "$schema",
+    "$comment",
+    "title",
+    "description",
+    "default",
+    "examples",
+    "definitions",
+    "$defs",
+    "deprecated",
+    "readOnly",
+    "writeOnly",
+    "contentMediaType",
+    "contentEncoding",
+    "contentSchema",
+}
+_ARRAY_KEYWORDS = {
+    "type",
+    "items",
+    "additionalItems",
+    "minItems",
+    "maxItems",
+    "uniqueItems",
+    "contains",
+    "minContains",
+    "maxContains",
+}
+_OBJECT_KEYWORDS = {
+    "type",
+    "properties",
+    "patternProperties",
+    "additionalProperties",
+    "required",
+    "minProperties",
+    "maxProperties",
+}
+# Each kind of keyword is also ignored on the other kind of container.
+_STREAMED_ARRAY_KEYWORDS = frozenset(
+    _ARRAY_KEYWORDS | _IGNORED_KEYWORDS | _OBJECT_KEYWORDS
+)
+_STREAMED_OBJECT_KEYWORDS = frozenset(
+    _OBJECT_KEYWORDS | _IGNORED_KEYWORDS | _ARRAY_KEYWORDS
+)
+
+
+class StreamingValidator(object):
+    """Validates JSON documents from files or parse events, using the schema
+    and settings of *validator*.
+
+    Results are reported the way ``validator.validate`` reports them: an
+    exception, or ``False`` with the messages available from
+    ``validator.get_errors()`` in lazy mode.  The same documents fail, but in
+    lazy mode the messages may come in a different order.
+    """
+
+    def __init__(self, validator: Validator):
+        self.validator = validator
+        # Whether each (array, object) schema can be streamed, keyed by id()
+        # of the schema.
+        self._streamable: Dict[int, Tuple[Any, bool, bool]] = {}
+
+    def validate(
+        self, stream: Any, schema: Any = None, chunk_size: int = 65536
+    ) -> bool:
+        """Validate the JSON document read from the file object *stream*."""
+        return self.validate_events(iter_events(stream, chunk_size), schema)
+
+    def validate_events(self, events: Iterator[Event], schema: Any = None) -> bool:
+        """Validate the document described by *events*, as produced by
+        :func:`iter_events`."""
+        validator = self.validator
+        if schema is None:
+            schema = validator._root_schema
+        events = iter(events)
+        context = validator._local.context
+        context.reset()
+        # Values validated along the way are nested inside this frame, so
+        # that they don't reset the errors collected so far.
+        context.annotation_stack.append(AnnotationFrame())
+        try:
+            first = next(events, None)
+            if first is None:
+                raise ValueError("Empty JSON document")
+            retval = self._validate_value(schema, first[0], first[1], events)
+            if next(events, None) is not None:
+                raise ValueError("Unexpected data after the JSON document")
+            return retval
+        except ErrorLimitReached:
+            # The rest of the document isn't read.
+            return False
+        finally:
+            context.annotation_stack.pop()
+            context.last_frame = None
+
+    def _can_stream(self, schema: Any) -> Tuple[bool, bool]:
+        cached = self._streamable.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return cached[1], cached[2]
+        array = obj = False
+        if type(schema) is dict:
+            array = not isinstance(schema.get("items"), list) and all(
+                k in _STREAMED_ARRAY_KEYWORDS for k in schema
+            )
+            obj = (
+                isinstance(schema.get("properties", {}), dict)
+                and isinstance(schema.get("patternProperties", {}), dict)
+                and all(k in _STREAMED_OBJECT_KEYWORDS for k in schema)
+            )
+        self._streamable[id(schema)] = (schema, array, obj)
+        return array, obj
+
+    def _active(self, keyword: str) -> bool:
+        keyword_active = getattr(self.validator, "_keyword_active", None)
+        return keyword_active is None or keyword_active(keyword)
+
+    def _validate_value(
+        self, schema: Any, event: str, value: Any, events: Iterator[Event]
+    ) -> bool:
+        if event == "scalar":
+            return self.validator.validate(value, schema)
+        if schema is True:
+            _skip_value(event, events)
+            return True
+        array, obj = self._can_stream(schema)
+        if event == "start_array" and array:
+            return self._validate_streamed(self._validate_array, schema, events)
+        if event == "start_object" and obj:
+            return self._validate_streamed(self._validate_object, schema, events)
+        return self.validator.validate(build_value(event, value, events), schema)
+
+    def _validate_streamed(
+        self, check: Any, schema: dict, events: Iterator[Event]
+    ) -> bool:
+        # Stands in for the validate() call the value would have had, so that
+        # the errors of its members are located as they are by validate().
+        annotation_stack = self.validator._local.context.annotation_stack
+        annotation_stack.append(None)
+        try:
+            return check(schema, events)
+        finally:
+            annotation_stack.pop()
+
+    def _validate_member(
+        self,
+        schema: Any,
+        event: str,
+        value: Any,
+        events: Iterator[Event],
+        instance_token: Any,
+        *schema_tokens: Any,
+    ) -> bool:
+        """Validate an array item or property value against *schema*, adding
+        its location to any errors."""
+        validator = self.validator
+        try:
+            if self._validate_value(schema, event, value, events):
+                return True
+        except JsonSchemaValidationError as e:
+            validator._locate_raised(e, instance_token, *schema_tokens)
+            raise
+        validator._locate_errors(instance_token, *schema_tokens)
+        return False
+
+    def _validate_array(self, schema: dict, events: Iterator[Event]) -> bool:
+        validator = self.validator
+        retval = True
+        if "type" in schema and "type" in validator.generic_validators:
+            retval = validator.generic_validators["type"]([], schema["type"])
+        items = schema["items"] if "items" in schema else None
+        if not self._active("items"):
+            items = None
+        contains = None
+        if "contains" in schema:
+            if "contains" in validator.array_validators:
+                # Draft 6 and 7 don't have minContains and maxContains.
+                contains = (schema["contains"], 1, None)
+            elif hasattr(validator, "_check_contains_count") and self._active(
+                "contains"
+            ):
+                contains = (
+                    schema["contains"],
+                    schema["minContains"] if "minContains" in schema else 1,
+                    schema["maxContains"] if "maxContains" in schema else None,
+                )
+        unique = (
+            "uniqueItems" in schema
+            and schema["uniqueItems"] is True
+            and "uniqueItems" in validator.array_validators
+        )
+        count = 0
+        occurances = 0
+        failures = 0
+        max_failures = validator._max_errors_per_location
+        first_seen: Dict[Any, int] = {}
+        for event, value in events:
+            if event == "end_array":
+                break
+            if contains is None and not unique:
+                if items is None:
+                    _skip_value(event, events)
+                    passed = True
+                else:
+                    passed = self._validate_member(
+                        items, event, value, events, count, "items"
+                    )
+            else:
+                item = build_value(event, value, events)
+                # A built value is validated like a scalar.
+                passed = items is None or self._validate_member(
+                    items, "scalar", item, events, count, "items"
+                )
+                if contains is not None and validator._probe(item, contains[0]):
+                    occurances += 1
+                if unique:
+                    first = first_seen.setdefault(canonical_json(item), count)
+                    if first != count:
+                        unique = False
+                        first_seen.clear()
+                        retval = (
+                            validator._report_duplicate_items(
+                                range(count + 1), first, count, True
+                            )
+                            and retval
+                        )
+            if not passed:
+                retval = False
+                failures += 1
+                if failures == max_failures:
+                    # The remaining items are only counted.
+                    items = None
+            count += 1
+        # The checks of the array as a whole only need its length.
+        length = range(count)
+        for k in ("maxItems", "minItems"):
+            if k in schema and k in validator.array_validators:
+                retval = validator.array_validators[k](length, schema[k]) and retval
+        if contains is not None:
+            retval = (
+                validator._check_contains_count(  # type: ignore[attr-defined]
+                    length, occurances, contains[1], contains[2]
+                )
+                and retval
+            )
+        return retval
+
+    def _validate_object(self, schema: dict, events: Iterator[Event]) -> bool:
+        validator = self.validator
+        object_validators = validator.object_validators
+        retval = True
+        if "type" in schema and "type" in validator.generic_validators:
+            retval = validator.generic_validators["type"]({}, schema["type"])
+        properties = schema["properties"] if "properties" in schema else None
+        if "properties" not in object_validators:
+            properties = None
+        patterns = (
+            schema["patternProperties"] if "patternProperties" in schema else None
+        )
+        classifier = None
+        pattern_schemas: List[Tuple[Any, str]] = []
+        if patterns and "patternProperties" in object_validators:
+            classifier = validator._key_classifier(patterns)
+            pattern_schemas = [
+                (subschema, pattern) for pattern, subschema in patterns.items()
+            ]
+        additional = (
+            schema["additionalProperties"]
+            if "additionalProperties" in schema and self._active("additionalProperties")
+            else None
+        )
+        property_keys = properties.keys() if properties is not None else None
+        # Of the keys, only those required are kept; the rest are counted for
+        # minProperties and maxProperties (a key repeated in the text counts
+        # each time).
+        required = (
+            schema["required"]
+            if "required" in schema and "required" in object_validators
+            else None
+        )
+        wanted = (
+            {name for name in required if isinstance(name, str)}
+            if isinstance(required, list)
+            else set()
+        )
+        keys: Dict[str, None] = {}
+        count = 0
+        failures = 0
+        max_failures = validator._max_errors_per_location
+        for event, key in events:
+            if event == "end_object":
+                break
+            if key in wanted:
+                keys[key] = None
+            count += 1
+            event, value = next(events)
+            # The subschemas that apply, with the keyword and the name within
+            # it, for the error locations.
+            subschemas = []
+            if properties is not None and key in properties:
+                subschemas.append((properties[key], "properties", key))
+            if classifier is not None:
+                for i in classifier.matching(key):
+                    subschema, pattern = pattern_schemas[i]
+                    subschemas.append((subschema, "patternProperties", pattern))
+            if not subschemas and additional is not None and additional is not True:
+                if additional is False:
+                    _skip_value(event, events)
+                    value = None
+                else:
+                    value = build_value(event, value, events)
+                if not validator._validate_additional_properties(
+                    {key: value}, additional, property_keys, patterns
+                ):
+                    retval = False
+                    failures += 1
+                    if failures == max_failures:
+                        # The remaining additional properties are skipped.
+                        additional = None
+            elif len(subschemas) == 1:
+                subschema, keyword, name = subschemas[0]
+                retval = (
+                    self._validate_member(
+                        subschema, event, value, events, key, keyword, name
+                    )
+                    and retval
+                )
+            elif not subschemas:
+                _skip_value(event, events)
+            else:
+                value = build_value(event, value, events)
+                for subschema, keyword, name in subschemas:
+                    retval = (
+                        self._validate_member(
+                            subschema, "scalar", value, events, key, keyword, name
+                        )
+                        and retval
+                    )
+        if required is not None:
+            retval = object_validators["required"](keys, required) and retval
+        # The checks of the number of properties only need the count.
+        length = range(count)
+        for k in ("minProperties", "maxProperties"):
+            if k in schema and k in object_validators:
+                retval = object_validators[k](length, schema[k]) and retval
+        return retval
@@ -62,3 +62,15 @@ def test_d2020_12_doc(schema, data, valid):
     else:
         with pytest.raises(draft4.JsonSchemaValidationError):
             validator.validate(data)
+
+
+@pytest.mark.parametrize("backend", ["closures", "codegen"])
+def test_d2020_12_doc_compiled(schema, data, valid, backend):
+    if sys.version_info.minor < 7:
+        pytest.skip()
+    validator = Validator(schema).compile(backend)
+    if valid:
+        assert validator.validate(data) == valid
+    else:
+        with pytest.raises(draft4.JsonSchemaValidationError):
+            validator.validate(data)
@@ -58,3 +58,21 @@ def test_draft4_lazy(schema, data, valid):
     assert lazy_validator.validate(data) == valid
     if not valid:
         assert len(lazy_validator.get_errors()) > 0
+
+
+@pytest.mark.parametrize("backend", ["closures", "codegen"])
+def test_draft4_compiled(schema, data, valid, backend):
+    validator = Validator(schema).compile(backend)
+    if valid:
+        assert validator.validate(data) == valid
+    else:
+        with pytest.raises(draft4.JsonSchemaValidationError):
+            validator.validate(data)
+
+
+@pytest.mark.parametrize("backend", ["closures", "codegen"])
+def test_draft4_compiled_lazy(schema, data, valid, backend):
+    lazy_validator = Validator(schema, lazy_error_reporting=True).compile(backend)
+    assert lazy_validator.validate(data) == valid
+    if not valid:
+        assert len(lazy_validator.get_errors()) > 0
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+import unittest
+
+import pytest
+
+from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.aio import AsyncValidator, exceeds_size
+from jacobsjsonschema.draft4 import JsonSchemaValidationError
+from jacobsjsonschema.ndjson import validate_range
+
+SCHEMA = {
+    "type": "array",
+    "items": {"type": "integer", "maximum": 10},
+}
+
+
+class TestExceedsSize(unittest.TestCase):
+
+    def test_counts_nested_values(self):
+        data = {"a": [1, 2, {"b": 3}], "c": "x"}
+        self.assertFalse(exceeds_size(data, 7))
+        self.assertTrue(exceeds_size(data, 6))
+        self.assertFalse(exceeds_size(1, 1))
+
+    def test_stops_early(self):
+        class Unvisited(list):
+            def __iter__(self):
+                raise AssertionError("members visited")
+
+        self.assertTrue(exceeds_size({"a": Unvisited(range(100))}, 50))
+
+
+class TestAsyncValidator(unittest.TestCase):
+
+    def run_async(self, coroutine):
+        return asyncio.new_event_loop().run_until_complete(coroutine)
+
+    def test_inline_and_offloaded_agree(self):
+        validator = Validator(SCHEMA, lazy_error_reporting=True).compile()
+        wrapper = AsyncValidator(validator, inline_limit=100)
+        small = [1, 2, 30]
+        large = [1] * 200 + [30, 40]
+
+        async def check():
+            self.assertFalse(await wrapper.validate(small))
+            self.assertEqual(len(wrapper.get_errors()), 1)
+            self.assertFalse(await wrapper.validate(large))
+            self.assertEqual(len(wrapper.get_errors()), 2)
+            self.assertTrue(await wrapper.validate([1] * 200))
+            self.assertEqual(wrapper.get_errors(), [])
+
+        self.run_async(check())
+
+    def test_large_document_leaves_the_loop(self):
+        seen = []
+
+        class Recording(Validator):
+            def validate(self, data, schema=None):
+                seen.append(threading.current_thread())
+                return super().validate(data, schema)
+
+        wrapper = AsyncValidator(Recording(SCHEMA), inline_limit=10)
+        self.run_async(wrapper.validate([1] * 5))
+        self.run_async(wrapper.validate([1] * 50))
+        self.assertIs(seen[0], threading.current_thread())
+        self.assertIsNot(seen[-1], threading.current_thread())
+
+    def test_raises_when_not_lazy(self):
+        wrapper = AsyncValidator(Validator(SCHEMA), inline_limit=10)
+        with pytest.raises(JsonSchemaValidationError):
+            self.run_async(wrapper.validate([1] * 50 + [30]))
+
+    def test_ndjson(self):
+        wrapper = AsyncValidator(Validator(SCHEMA, lazy_error_reporting=True))
+        lines = [json.dumps([n, n * 2]) for n in range(20)]
+        lines.insert(5, "")
+        lines.insert(9, "[1, ")
+
+        async def check():
+            reader = asyncio.StreamReader()
+            reader.feed_data("\n".join(lines).encode())
+            reader.feed_eof()
+            return await wrapper.validate_ndjson(reader, chunk_size=3)
+
+        result = self.run_async(check())
+        self.assertEqual(len(result), 21)
+        self.assertFalse(result[8])
+        self.assertTrue(result.errors[8][0].startswith("Document is not valid JSON"))
+        # [6, 12] onwards are over the maximum; the bad line is document 8.
+        self.assertEqual(list(result.invalid_indices()), list(range(6, 21)))
+
+    def read_ndjson(self, wrapper, data, limit=2**16):
+        async def check():
+            reader = asyncio.StreamReader(limit=limit)
+            reader.feed_data(data)
+            reader.feed_eof()
+            return await wrapper.validate_ndjson(reader, chunk_size=2)
+
+        return self.run_async(check())
+
+    def test_ndjson_long_line(self):
+        wrapper = AsyncValidator(Validator(SCHEMA, lazy_error_reporting=True))
+        long_line = json.dumps([1] * 100).encode()
+        for ending in (b"\n", b""):
+            # The last line is too long too, with or without a line ending.
+            data = b"[1]\n" + long_line + b"\n" + b"[2]\n" * 3 + long_line + ending
+            result = self.read_ndjson(wrapper, data, limit=64)
+            self.assertEqual(len(result), 6)
+            self.assertEqual(list(result.invalid_indices()), [1, 5])
+            self.assertEqual(
+                result.errors[1], ["Line is longer than the stream reader's limit"]
+            )
+
+    def test_ndjson_lines_as_in_files(self):
+        wrapper = AsyncValidator(Validator(SCHEMA, lazy_error_reporting=True))
+        data = b"[1]\r\n\n  \n[2]\n\r\n[30]\n[3]"
+        result = self.read_ndjson(wrapper, data)
+        expected = validate_range(Validator(SCHEMA, lazy_error_reporting=True), data)
+        self.assertEqual(len(result), expected.count)
+        self.assertEqual(len(result), 5)
+        self.assertEqual(list(result.invalid_indices()), [1, 3])
@@ -0,0 +1,81 @@
+import unittest
+
+import pytest
+
+from jacobsjsonschema.draft4 import JsonSchemaValidationError
+from jacobsjsonschema.draft2019_09 import Validator as Draft201909Validator
+from jacobsjsonschema.draft2020_12 import Validator as Draft202012Validator
+from jacobsjsonschema.json_types import AnnotationFrame, EvaluatedItems
+
+
+class TestEvaluatedItems(unittest.TestCase):
+
+    def test_prefix_and_bits(self):
+        items = EvaluatedItems()
+        items.add_range(0, 3)
+        items.add(3)
+        items.add(10)
+        items.add(12)
+        self.assertEqual(items.prefix, 4)
+        self.assertEqual([i for i in range(15) if i in items], [0, 1, 2, 3, 10, 12])
+        items.add_range(2, 8)
+        self.assertEqual(items.prefix, 8)
+        self.assertEqual(len(items.bits), 2)
+
+    def test_update(self):
+        first = EvaluatedItems()
+        first.add_range(0, 2)
+        first.add(20)
+        second = EvaluatedItems()
+        second.add(5)
+        second.add_range(7, 9)
+        first.update(second)
+        self.assertEqual([i for i in range(25) if i in first], [0, 1, 5, 7, 8, 20])
+
+
+class TestAnnotationFrame(unittest.TestCase):
+
+    def test_nothing_allocated_until_recorded(self):
+        frame = AnnotationFrame()
+        self.assertIsNone(frame.property_keys)
+        self.assertIsNone(frame.items)
+        self.assertFalse(frame.has_property("a"))
+        self.assertFalse(frame.has_item(0))
+
+    def test_merge_takes_over_records(self):
+        child = AnnotationFrame()
+        child.add_property("a")
+        child.add_items(0, 1000)
+        parent = AnnotationFrame()
+        parent.merge(child)
+        self.assertIs(parent.property_keys, child.property_keys)
+        self.assertIs(parent.items, child.items)
+        other = AnnotationFrame()
+        other.add_property("b")
+        other.add_item(2000)
+        parent.merge(other)
+        self.assertEqual(parent.property_keys, {"a", "b"})
+        self.assertTrue(parent.has_item(999))
+        self.assertFalse(parent.has_item(1000))
+        self.assertTrue(parent.has_item(2000))
+        parent.clear()
+        self.assertIsNone(parent.property_keys)
+
+
+class TestUnevaluatedItems(unittest.TestCase):
+
+    def test_large_arrays(self):
+        schema = {
+            "allOf": [{"prefixItems": [{"type": "integer"}]}],
+            "contains": {"type": "string"},
+            "unevaluatedItems": {"type": "null"},
+        }
+        validator = Draft202012Validator(schema)
+        self.assertTrue(validator.validate([1] + ["a", None] * 50000))
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate([1] + ["a", None] * 50000 + [2])
+
+    def test_items_are_evaluated(self):
+        schema = {"allOf": [{"items": {"type": "integer"}}], "unevaluatedItems": False}
+        validator = Draft201909Validator(schema)
+        self.assertTrue(validator.validate(list(range(100000))))
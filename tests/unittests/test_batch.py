@@ -0,0 +1,82 @@
+import unittest
+
+
+from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.draft2019_09 import Validator as Draft201909Validator
+from jacobsjsonschema.batch import BatchResult
+
+
+class TestValidateMany(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = {
+            "type": "object",
+            "properties": {"n": {"type": "integer", "maximum": 10}},
+            "required": ["n"],
+        }
+        self.documents = [{"n": 1}, {"n": 11}, {}, {"n": 5}, {"n": "x"}]
+
+    def test_result(self):
+        for lazy in (False, True):
+            for validator in (
+                Validator(self.schema, lazy_error_reporting=lazy),
+                Validator(self.schema, lazy_error_reporting=lazy).compile(),
+                Validator(self.schema, lazy_error_reporting=lazy).compile("codegen"),
+            ):
+                result = validator.validate_many(self.documents)
+                self.assertIsInstance(result, BatchResult)
+                self.assertEqual(len(result), 5)
+                self.assertEqual(list(result.valid), [1, 0, 0, 1, 0])
+                self.assertTrue(result[0])
+                self.assertFalse(result[1])
+                self.assertFalse(result.all_valid)
+                self.assertEqual(result.valid_count, 2)
+                self.assertEqual(list(result.invalid_indices()), [1, 2, 4])
+                self.assertEqual(sorted(result.errors), [1, 2, 4])
+                self.assertEqual(
+                    result.errors[2], ["The 'n' property is required but was missing"]
+                )
+
+    def test_same_errors_as_validate(self):
+        validator = Validator(self.schema, lazy_error_reporting=True)
+        result = validator.validate_many(self.documents)
+        for index, document in enumerate(self.documents):
+            self.assertEqual(bool(result.valid[index]), validator.validate(document))
+            self.assertEqual(result.errors.get(index, []), validator.get_errors())
+
+    def test_errors_formatted_when_read(self):
+        validator = Validator(self.schema, lazy_error_reporting=True).compile()
+        result = validator.validate_many(self.documents)
+        records = result.errors.records(1)
+        self.assertEqual([record.keyword for record in records], ["maximum"])
+        self.assertIsNone(records[0]._message)
+        self.assertEqual(
+            result.errors[1], ["The value 11 is greater than the maximum 10"]
+        )
+        self.assertEqual(result.errors.records(0), [])
+
+    def test_consumes_lazily(self):
+        seen = []
+
+        def documents():
+            for n in range(1000):
+                seen.append(n)
+                yield {"n": n % 20}
+
+        result = Validator(self.schema).compile().validate_many(documents())
+        self.assertEqual(len(seen), 1000)
+        self.assertEqual(result.valid_count, 550)
+
+    def test_empty(self):
+        result = Validator(self.schema).validate_many([])
+        self.assertEqual(len(result), 0)
+        self.assertTrue(result.all_valid)
+
+    def test_annotations_do_not_leak_between_documents(self):
+        schema = {
+            "anyOf": [{"properties": {"a": True}}, {"properties": {"b": True}}],
+            "unevaluatedProperties": False,
+        }
+        validator = Draft201909Validator(schema, lazy_error_reporting=True)
+        result = validator.validate_many([{"a": 1}, {"b": 1}, {"c": 1}])
+        self.assertEqual(list(result.valid), [1, 1, 0])
@@ -0,0 +1,166 @@
+import unittest
+import pytest
+
+
+from jacobsjsonschema.draft4 import Validator, JsonSchemaValidationError
+from jacobsjsonschema.draft7 import Validator as Draft7Validator
+from jacobsjsonschema.draft2019_09 import Validator as Draft201909Validator
+from jacobsjsonschema.compiler import SchemaNode
+
+
+class TestCompiledNodes(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = {
+            "type": "object",
+            "properties": {
+                "foo": {"type": "string", "maxLength": 3},
+                "bar": {"type": "integer", "minimum": 1},
+            },
+            "required": ["foo"],
+        }
+
+    def test_compile_returns_validator(self):
+        validator = Validator(self.schema)
+        self.assertIs(validator.compile(), validator)
+
+    def test_nodes_only_hold_present_keywords(self):
+        validator = Validator(self.schema).compile()
+        node = validator._compiled_node(self.schema)
+        self.assertIsInstance(node, SchemaNode)
+        self.assertEqual(len(node.generic), 1)
+        self.assertEqual(len(node.object_steps), 2)
+        self.assertEqual(node.array_steps, [])
+        self.assertEqual(node.value_steps, [])
+        foo_node = validator._compiled_node(self.schema["properties"]["foo"])
+        self.assertEqual(len(foo_node.value_steps), 1)
+
+    def test_subschemas_compiled_up_front(self):
+        validator = Validator(self.schema).compile()
+        self.assertEqual(len(validator._compiled_nodes), 3)
+
+    def test_same_errors_as_interpreted(self):
+        data = {"foo": "toolong", "bar": 0}
+        interpreted = Validator(self.schema, lazy_error_reporting=True)
+        compiled = Validator(self.schema, lazy_error_reporting=True).compile()
+        self.assertFalse(interpreted.validate(data))
+        self.assertFalse(compiled.validate(data))
+        self.assertEqual(interpreted.get_errors(), compiled.get_errors())
+
+    def test_raises(self):
+        validator = Validator(self.schema).compile()
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate({"bar": 2})
+
+
+class TestCompiledConditional(unittest.TestCase):
+
+    def test_if_then_else(self):
+        schema = {
+            "if": {"type": "integer"},
+            "then": {"minimum": 10},
+            "else": {"type": "string"},
+        }
+        validator = Draft7Validator(schema).compile()
+        self.assertTrue(validator.validate(12))
+        self.assertTrue(validator.validate("five"))
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate(5)
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate(None)
+
+
+class TestCompiledReferences(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = {
+            "definitions": {
+                "name": {"type": "string", "maxLength": 3},
+                "tree": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"$ref": "#/definitions/name"},
+                        "children": {"items": {"$ref": "#/definitions/tree"}},
+                    },
+                },
+                "self": {"$ref": "#/definitions/self"},
+            },
+            "$ref": "#/definitions/tree",
+        }
+
+    def test_small_targets_are_inlined(self):
+        validator = Validator(self.schema).compile()
+        definitions = self.schema["definitions"]
+        name = definitions["tree"]["properties"]["name"]
+        node = validator._compiled_node(name)
+        self.assertIsNone(node.reference)
+        self.assertEqual(
+            node.value_steps, validator._compiled_node(definitions["name"]).value_steps
+        )
+        self.assertIsNone(validator._compiled_node(self.schema).reference)
+
+    def test_recursive_targets_are_linked(self):
+        validator = Validator(self.schema).compile()
+        node = validator._compiled_node(self.schema["definitions"]["self"])
+        func, _ = node.reference
+        self.assertIs(func.keywords["target"], self.schema["definitions"]["self"])
+
+    def test_targets_reading_annotations_are_linked(self):
+        closed = {"properties": {"a": True}, "unevaluatedProperties": False}
+        schema = {"$defs": {"closed": closed}, "items": {"$ref": "#/$defs/closed"}}
+        validator = Draft201909Validator(schema).compile()
+        self.assertIsNotNone(validator._compiled_node(schema["items"]).reference)
+        self.assertTrue(validator.validate([{"a": 1}]))
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate([{"a": 1, "b": 2}])
+
+    def test_same_errors_as_interpreted(self):
+        tree = {"name": "toolong", "children": [{"name": 1}, {"children": [{}]}]}
+        for backend in ("closures", "codegen"):
+            interpreted = Validator(self.schema, lazy_error_reporting=True)
+            compiled = Validator(self.schema, lazy_error_reporting=True).compile(
+                backend
+            )
+            self.assertFalse(interpreted.validate(tree))
+            self.assertFalse(compiled.validate(tree))
+            self.assertEqual(interpreted.get_errors(), compiled.get_errors())
+
+
+class TestCodegenBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "minLength": 2, "pattern": "^[a-z]+$"},
+                "age": {"type": "integer", "minimum": 0, "maximum": 150},
+                "tags": {"type": "array", "maxItems": 2},
+            },
+            "required": ["name", "age"],
+        }
+
+    def test_checks_are_inlined(self):
+        validator = Validator(self.schema).compile(backend="codegen")
+        node = validator._compiled_node(self.schema["properties"]["name"])
+        self.assertIn("len(data) < 2", node.source)
+        self.assertIn("isinstance(data, str)", node.source)
+
+    def test_same_errors_as_interpreted(self):
+        data = {"name": "X1", "age": 200, "tags": [1, 2, 3]}
+        interpreted = Validator(self.schema, lazy_error_reporting=True)
+        generated = Validator(self.schema, lazy_error_reporting=True).compile(
+            backend="codegen"
+        )
+        self.assertFalse(interpreted.validate(data))
+        self.assertFalse(generated.validate(data))
+        self.assertEqual(interpreted.get_errors(), generated.get_errors())
+
+    def test_raises(self):
+        validator = Validator(self.schema).compile(backend="codegen")
+        self.assertTrue(validator.validate({"name": "bob", "age": 30}))
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate({"name": "bob"})
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            Validator(self.schema).compile(backend="jit")
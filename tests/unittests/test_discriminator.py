@@ -0,0 +1,100 @@
+import unittest
+import pytest
+
+
+from jacobsjsonschema.draft4 import Validator, JsonSchemaValidationError
+from jacobsjsonschema.draft7 import Validator as Draft7Validator
+from jacobsjsonschema.draft2020_12 import Validator as Draft202012Validator
+
+
+def tagged_union(keyword, count):
+    return {
+        keyword: [
+            {
+                "type": "object",
+                "properties": {
+                    "kind": {"const": "event{}".format(idx)},
+                    "value": {"type": "integer" if idx % 2 else "string"},
+                },
+                "required": ["kind"],
+            }
+            for idx in range(count)
+        ]
+    }
+
+
+class CountingValidator(Draft7Validator):
+
+    def __init__(self, schema, lazy_error_reporting=False):
+        super().__init__(schema, lazy_error_reporting)
+        self.probes = 0
+
+    def _probe(self, data, schema, check=None):
+        self.probes += 1
+        return super()._probe(data, schema, check)
+
+
+class TestDiscriminator(unittest.TestCase):
+
+    def test_index_built_at_compile_time(self):
+        schema = tagged_union("oneOf", 4)
+        validator = Draft7Validator(schema).compile()
+        ((func, _),) = validator._compiled_node(schema).generic
+        discriminator = func.keywords["discriminator"]
+        self.assertEqual(discriminator.property, "kind")
+        self.assertEqual(len(discriminator.branches), 4)
+
+    def test_only_matching_branch_evaluated(self):
+        for keyword in ("oneOf", "anyOf"):
+            schema = tagged_union(keyword, 40)
+            validator = CountingValidator(schema).compile()
+            self.assertTrue(validator.validate({"kind": "event39", "value": 3}))
+            self.assertEqual(validator.probes, 1)
+            with pytest.raises(JsonSchemaValidationError):
+                validator.validate({"kind": "event39", "value": "three"})
+            with pytest.raises(JsonSchemaValidationError):
+                validator.validate({"kind": "unknown"})
+
+    def test_untagged_data_tries_every_branch(self):
+        schema = tagged_union("oneOf", 3)
+        validator = CountingValidator(schema).compile()
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate({"value": 3})
+        self.assertEqual(validator.probes, 3)
+
+    def test_single_value_enum(self):
+        schema = {
+            "oneOf": [
+                {"properties": {"kind": {"enum": ["a"]}, "x": {"type": "string"}}},
+                {"properties": {"kind": {"enum": ["b"]}, "x": {"type": "integer"}}},
+            ]
+        }
+        for backend in ("closures", "codegen"):
+            validator = Validator(schema).compile(backend)
+            self.assertTrue(validator.validate({"kind": "b", "x": 1}))
+            with pytest.raises(JsonSchemaValidationError):
+                validator.validate({"kind": "a", "x": 1})
+
+    def test_not_every_branch_tagged(self):
+        schema = {
+            "oneOf": [
+                {"properties": {"kind": {"const": "a"}}},
+                {"properties": {"kind": {"type": "string"}}},
+            ]
+        }
+        validator = Draft7Validator(schema).compile()
+        ((func, _),) = validator._compiled_node(schema).generic
+        self.assertEqual(func, validator._validate_oneof)
+
+    def test_annotations_from_matching_branch(self):
+        schema = {
+            "oneOf": [
+                {"properties": {"kind": {"const": "a"}, "a": True}},
+                {"properties": {"kind": {"const": "b"}, "b": True}},
+            ],
+            "unevaluatedProperties": False,
+        }
+        validator = Draft202012Validator(schema).compile()
+        self.assertTrue(validator.validate({"kind": "b", "b": 1}))
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate({"kind": "b", "a": 1})
@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+
+import pytest
+
+
+from jacobsjsonschema import draft4
+from jacobsjsonschema.bool_compare_util import canonical_json
+from jacobsjsonschema.draft4 import Validator, InvalidSchemaError
+from jacobsjsonschema.draft6 import Validator as Draft6Validator
+
+
+class TestCanonicalJson(unittest.TestCase):
+
+    def test_bools_are_not_numbers(self):
+        self.assertNotEqual(canonical_json(True), canonical_json(1))
+        self.assertNotEqual(canonical_json(False), canonical_json(0))
+        self.assertNotEqual(canonical_json([True]), canonical_json([1]))
+
+    def test_integers_equal_floats(self):
+        self.assertEqual(canonical_json(1), canonical_json(1.0))
+        self.assertEqual(hash(canonical_json([1])), hash(canonical_json([1.0])))
+
+    def test_objects_ignore_key_order(self):
+        self.assertEqual(
+            canonical_json({"a": [1, {"b": None}], "c": True}),
+            canonical_json({"c": True, "a": [1.0, {"b": None}]}),
+        )
+
+    def test_arrays_are_not_objects(self):
+        self.assertNotEqual(canonical_json([]), canonical_json({}))
+
+
+class TestEnum(unittest.TestCase):
+
+    def test_hash_lookup(self):
+        codes = ["SKU{}".format(i) for i in range(5000)]
+        validator = Validator({"enum": codes}, lazy_error_reporting=True)
+        self.assertTrue(validator.validate("SKU4999"))
+        # The allowed values are only made canonical once.
+        with mock.patch.object(
+            draft4, "canonical_json", wraps=canonical_json
+        ) as counted:
+            self.assertFalse(validator.validate("SKU5000"))
+            self.assertTrue(validator.validate("SKU0"))
+        self.assertEqual(counted.call_count, 2)
+
+    def test_json_semantics(self):
+        validator = Validator(
+            {"enum": [1, False, {"a": [True]}]}, lazy_error_reporting=True
+        )
+        self.assertTrue(validator.validate(1.0))
+        self.assertTrue(validator.validate({"a": [True]}))
+        self.assertFalse(validator.validate(True))
+        self.assertFalse(validator.validate(0))
+        self.assertFalse(validator.validate({"a": [1]}))
+
+    def test_invalid_enum_still_raises(self):
+        with pytest.raises(InvalidSchemaError):
+            Validator({"enum": "abc"}).compile(backend="codegen").validate("a")
+
+
+class TestConst(unittest.TestCase):
+
+    def test_nested_object(self):
+        validator = Draft6Validator(
+            {"const": {"a": 1, "b": [False]}}, lazy_error_reporting=True
+        )
+        self.assertTrue(validator.validate({"b": [False], "a": 1.0}))
+        self.assertFalse(validator.validate({"a": 1, "b": [0]}))
+        self.assertFalse(validator.validate({"a": 1, "b": [False], "c": 2}))
+        self.assertFalse(validator.validate({"a": 1, "b": 3}))
+
+
+class TestEnumAndConst(unittest.TestCase):
+
+    def test_shared_value(self):
+        # One list object used as an enum and as a const.
+        shared = [1, 2]
+        schema = {
+            "properties": {"a": {"enum": shared}, "b": {"const": shared}},
+        }
+        for backend in (None, "closures", "codegen"):
+            validator = Draft6Validator(schema, lazy_error_reporting=True)
+            if backend is not None:
+                validator.compile(backend)
+            self.assertTrue(validator.validate({"a": 2, "b": [1, 2]}), backend)
+            self.assertTrue(validator.validate({"b": [1, 2], "a": 1}), backend)
+            self.assertFalse(validator.validate({"a": [1, 2]}), backend)
+            self.assertFalse(validator.validate({"b": 1}), backend)
@@ -0,0 +1,120 @@
+import json
+import pathlib
+import pickle
+import unittest
+
+import pytest
+
+from jacobsjsonschema.draft4 import JsonSchemaValidationError, Validator
+from jacobsjsonschema.draft6 import Validator as Draft6Validator
+from jacobsjsonschema.draft7 import Validator as Draft7Validator
+from jacobsjsonschema.draft2019_09 import Validator as Draft201909Validator
+from jacobsjsonschema.draft2020_12 import Validator as Draft202012Validator
+from jacobsjsonschema.formats import FORMAT_CHECKERS
+
+testsuite_dir = pathlib.Path(__file__).parent.parent / "JSON-Schema-Test-Suite"
+
+DIALECTS = [
+    ("draft4", Validator),
+    ("draft6", Draft6Validator),
+    ("draft7", Draft7Validator),
+    ("draft2019-09", Draft201909Validator),
+    ("draft2020-12", Draft202012Validator),
+]
+
+
+def _format_tests():
+    for directory, cls in DIALECTS:
+        format_dir = testsuite_dir / "tests" / directory / "optional" / "format"
+        for name in sorted(FORMAT_CHECKERS):
+            testfile = format_dir / (name + ".json")
+            if not testfile.exists():
+                continue
+            with testfile.open() as test_file:
+                for test_case in json.load(test_file):
+                    for test in test_case["tests"]:
+                        yield pytest.param(
+                            cls,
+                            test_case["schema"],
+                            test["data"],
+                            test["valid"],
+                            id="{} -> {} -> {}".format(
+                                directory, name, test["description"]
+                            ),
+                        )
+
+
+@pytest.mark.parametrize("cls, schema, data, valid", list(_format_tests()))
+def test_format_suite(cls, schema, data, valid):
+    validator = cls(schema, lazy_error_reporting=True).use_builtin_formats()
+    if cls in (Draft201909Validator, Draft202012Validator):
+        # Formats are annotations: failures are warnings.
+        assert validator.validate(data)
+        assert bool(validator.get_warnings()) != valid
+    else:
+        assert validator.validate(data) == valid
+
+
+class TestBuiltinFormats(unittest.TestCase):
+
+    def test_opt_in(self):
+        validator = Validator({"format": "ipv4"}, lazy_error_reporting=True)
+        self.assertTrue(validator.validate("999.0.0.1"))
+        validator.use_builtin_formats()
+        self.assertFalse(validator.validate("999.0.0.1"))
+
+    def test_failure_raised(self):
+        validator = Draft7Validator({"format": "ipv4"}).use_builtin_formats()
+        self.assertTrue(validator.validate("192.168.0.1"))
+        with pytest.raises(JsonSchemaValidationError) as raised:
+            validator.validate("999.0.0.1")
+        self.assertEqual(str(raised.value), "'999.0.0.1' is not a valid ipv4")
+        self.assertEqual(raised.value.error.keyword, "format")
+
+    def test_failure_reported(self):
+        schema = {"properties": {"host": {"format": "hostname"}}}
+        for backend in (None, "closures", "codegen"):
+            validator = Validator(schema, lazy_error_reporting=True)
+            validator.use_builtin_formats()
+            if backend:
+                validator.compile(backend)
+            self.assertFalse(validator.validate({"host": "-bad-"}))
+            self.assertEqual(
+                validator.get_errors(), ["'-bad-' is not a valid hostname"]
+            )
+            (error,) = validator.get_error_records()
+            self.assertEqual(error.keyword, "format")
+            self.assertEqual(error.instance_path, "/host")
+            self.assertEqual(error.schema_path, "/properties/host/format")
+
+    def test_str_subclasses_checked(self):
+        class Text(str):
+            pass
+
+        for name, check in FORMAT_CHECKERS.items():
+            self.assertFalse(check(Text("not a valid [ value")), name)
+        self.assertTrue(FORMAT_CHECKERS["ipv4"](Text("192.168.0.1")))
+
+    def test_formats_of_the_dialect(self):
+        for cls in (Validator, Draft201909Validator):
+            validator = cls({"format": "uuid"}, lazy_error_reporting=True)
+            validator.use_builtin_formats().compile()
+            self.assertTrue(validator.validate("not a uuid"))
+        warnings = validator.get_warnings()
+        self.assertEqual(
+            warnings, ["String 'not a uuid' didn't conform to format uuid"]
+        )
+
+    def test_custom_formats_kept(self):
+        validator = Draft7Validator({"format": "email"}, lazy_error_reporting=True)
+        validator.add_format("email", lambda value: value.endswith("@example.com"))
+        validator.use_builtin_formats()
+        self.assertTrue(validator.validate("joe@example.com"))
+        self.assertFalse(validator.validate("joe@example.org"))
+
+    def test_pickled(self):
+        validator = Draft7Validator({"format": "date"}, lazy_error_reporting=True)
+        validator.use_builtin_formats()
+        copy = pickle.loads(pickle.dumps(validator))
+        self.assertTrue(copy.validate("2020-02-29"))
+        self.assertFalse(copy.validate("2021-02-29"))
@@ -0,0 +1,58 @@
+import unittest
+
+
+from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.key_classifier import KeyClassifier
+
+
+class TestKeyClassifier(unittest.TestCase):
+
+    def test_matching_patterns_in_schema_order(self):
+        classifier = KeyClassifier(["^a", "b$", "x"])
+        self.assertEqual(classifier.matching("ab"), (0, 1))
+        self.assertEqual(classifier.matching("xb"), (1, 2))
+        self.assertEqual(classifier.matching("zzz"), ())
+
+    def test_patterns_with_their_own_groups(self):
+        classifier = KeyClassifier(["^(foo|bar)_", "(ab)+$"])
+        self.assertIsNotNone(classifier._combined)
+        self.assertEqual(classifier.matching("bar_abab"), (0, 1))
+        self.assertEqual(classifier.matching("baz_ab"), (1,))
+
+    def test_backreferences_are_searched_individually(self):
+        classifier = KeyClassifier(["^(a)\\1$", "^b"])
+        self.assertIsNone(classifier._combined)
+        self.assertEqual(classifier.matching("aa"), (0,))
+        self.assertEqual(classifier.matching("ab"), ())
+
+    def test_regex_only_patterns(self):
+        classifier = KeyClassifier(["^\\p{Letter}+$", "^[0-9]+$"])
+        self.assertEqual(classifier.matching("héllo"), (0,))
+        self.assertEqual(classifier.matching("42"), (1,))
+
+    def test_is_additional(self):
+        classifier = KeyClassifier(["^x_"])
+        self.assertFalse(classifier.is_additional("name", {"name"}))
+        self.assertFalse(classifier.is_additional("x_1", {"name"}))
+        self.assertTrue(classifier.is_additional("other", {"name"}))
+
+    def test_memo_is_bounded(self):
+        classifier = KeyClassifier(["a"], memo_size=2)
+        for key in ("a", "b", "c", "d"):
+            classifier.matching(key)
+        self.assertEqual(len(classifier._memo), 2)
+
+
+class TestSharedClassification(unittest.TestCase):
+
+    def test_pattern_and_additional_properties_share_classifier(self):
+        schema = {
+            "properties": {"id": {}},
+            "patternProperties": {"^n_": {"type": "integer"}},
+            "additionalProperties": False,
+        }
+        validator = Validator(schema, lazy_error_reporting=True)
+        self.assertTrue(validator.validate({"id": 1, "n_a": 2}))
+        self.assertFalse(validator.validate({"id": 1, "n_a": "2", "other": 3}))
+        self.assertEqual(len(validator._key_classifiers), 1)
+        self.assertEqual(len(validator.get_errors()), 2)
@@ -1,7 +1,11 @@
+import io
+import json
+import pickle
 import unittest
 
 
-from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.draft4 import Validator, JsonSchemaValidationError
+from jacobsjsonschema.stream import StreamingValidator
 
 
 class LazyMixin:
@@ -10,6 +14,12 @@ class LazyMixin:
         validator = Validator(self.schema, lazy_error_reporting=True)
         self.assertFalse(validator.validate(self.data))
 
+    def test_does_not_validate_aggregated(self):
+        validator = Validator(self.schema, lazy_error_reporting=True)
+        validator.set_error_aggregation()
+        self.assertFalse(validator.validate(self.data))
+        self.assertTrue(validator.get_errors())
+
 
 class TestLazyReporting(unittest.TestCase, LazyMixin):
 
@@ -45,3 +55,243 @@ class TestLazyReportingOfAllOf(unittest.TestCase, LazyMixin):
     def setUp(self):
         self.schema = {"allOf": [{"maximum": 30}, {"minimum": 20}]}
         self.data = 35
+
+
+class Formatted(str):
+    """A string value that counts how often it's formatted."""
+
+    count = 0
+
+    def __str__(self):
+        Formatted.count += 1
+        return str.__str__(self)
+
+
+class TestErrorRecords(unittest.TestCase):
+
+    def test_messages_formatted_when_read(self):
+        schema = {"anyOf": [{"enum": ["a"]}, {"enum": ["b"]}], "enum": ["c"]}
+        validator = Validator(schema, lazy_error_reporting=True)
+        Formatted.count = 0
+        self.assertFalse(validator.validate(Formatted("x")))
+        self.assertEqual(Formatted.count, 0)
+        [_, record] = validator.get_error_records()
+        self.assertEqual(
+            record.template,
+            "The value '{}' was not in the enumerated list of allowed values",
+        )
+        self.assertEqual(record.args, (record.data,))
+        self.assertIs(record.schema, schema["enum"])
+        self.assertEqual(
+            validator.get_errors(),
+            [
+                "The JSON data did not match any of the provided anyOf schemas",
+                "The value 'x' was not in the enumerated list of allowed values",
+            ],
+        )
+        self.assertEqual(Formatted.count, 1)
+
+    def test_large_values_truncated(self):
+        validator = Validator({"enum": [1]}, lazy_error_reporting=True)
+        self.assertFalse(validator.validate(list(range(1000))))
+        [message] = validator.get_errors()
+        self.assertLess(len(message), 300)
+        self.assertIn("[0, 1, 2, 3", message)
+        self.assertIn("...'", message)
+
+    def test_large_values_formatted_in_part(self):
+        class Item(object):
+            shown = 0
+
+            def __repr__(self):
+                Item.shown += 1
+                return "<item>"
+
+        validator = Validator({"enum": [1]}, lazy_error_reporting=True)
+        data = {"a": "x" * 100000, "b": [Item()] * 100000}
+        self.assertFalse(validator.validate(data))
+        [record] = validator.get_error_records()
+        expected = str({"a": "x" * 300})[:200] + "..."
+        self.assertIn(expected, str(record))
+        self.assertEqual(Item.shown, 0)
+        validator.validate({"b": [Item()] * 100000})
+        validator.get_errors()
+        self.assertLess(Item.shown, 100)
+
+    def test_values_released_once_formatted(self):
+        validator = Validator({"enum": [1]}, lazy_error_reporting=True)
+        self.assertFalse(validator.validate([2]))
+        [record] = validator.get_error_records()
+        self.assertEqual(record.data, [2])
+        message = str(record)
+        self.assertIsNone(record.data)
+        self.assertEqual(record.args, ())
+        self.assertEqual(str(record), message)
+
+
+class TestErrorLocations(unittest.TestCase):
+
+    schema = {
+        "definitions": {"count": {"type": "integer", "minimum": 0}},
+        "properties": {
+            "a/b": {"items": {"$ref": "#/definitions/count"}},
+            "c": {"allOf": [{"type": "string"}, {"maxLength": 2}]},
+        },
+        "additionalProperties": {"type": "null"},
+    }
+
+    def test_paths(self):
+        data = {"a/b": [1, -1, 2], "c": "abc", "z": 1}
+        for backend in (None, "closures", "codegen"):
+            validator = Validator(self.schema, lazy_error_reporting=True)
+            if backend:
+                validator.compile(backend)
+            self.assertFalse(validator.validate(data))
+            self.assertEqual(
+                [
+                    (error.keyword, error.instance_path, error.schema_path)
+                    for error in validator.get_error_records()
+                ],
+                [
+                    ("minimum", "/a~1b/1", "/properties/a~1b/items/minimum"),
+                    ("maxLength", "/c", "/properties/c/allOf/1/maxLength"),
+                    ("type", "/z", "/additionalProperties/type"),
+                    ("additionalProperties", "", "/additionalProperties"),
+                ],
+            )
+
+    def test_path_of_raised_error(self):
+        validator = Validator(self.schema)
+        with self.assertRaises(JsonSchemaValidationError) as raised:
+            validator.validate({"a/b": [1, 2, -3]})
+        error = raised.exception.error
+        self.assertEqual(error.instance_path, "/a~1b/2")
+        self.assertEqual(error.schema_path, "/properties/a~1b/items/minimum")
+
+    def test_errors_of_matching_schemas_dropped(self):
+        class EveryBranch(Validator):
+            # An anyOf that evaluates every branch, failing ones included.
+            def _validate_anyof(self, data, schemas, discriminator=None):
+                matched = False
+                for schema in schemas:
+                    matched = self.validate(data, schema) or matched
+                return matched
+
+        schema = {
+            "properties": {
+                "a": {"anyOf": [{"type": "string"}, {"type": "integer"}]},
+                "b": {"items": {"type": "string"}},
+            }
+        }
+        for cls in (Validator, EveryBranch):
+            for backend in (None, "closures", "codegen"):
+                validator = cls(schema, lazy_error_reporting=True)
+                if backend:
+                    validator.compile(backend)
+                self.assertFalse(validator.validate({"a": 1, "b": ["x", 2]}))
+                self.assertEqual(
+                    [
+                        (error.keyword, error.instance_path, error.schema_path)
+                        for error in validator.get_error_records()
+                    ],
+                    [("type", "/b/1", "/properties/b/items/type")],
+                )
+
+    def test_streamed(self):
+        validator = Validator(self.schema, lazy_error_reporting=True)
+        streaming = StreamingValidator(validator)
+        self.assertFalse(streaming.validate(io.StringIO('{"a/b": [[], 5, -5]}')))
+        self.assertEqual(
+            [error.instance_path for error in validator.get_error_records()],
+            ["/a~1b/0", "/a~1b/2"],
+        )
+
+
+class TestErrorLimits(unittest.TestCase):
+
+    schema = {
+        "properties": {"a": {"items": {"type": "integer"}}, "b": {"type": "string"}}
+    }
+    data = {"a": ["x"] * 1000, "b": 1}
+
+    def test_max_errors(self):
+        for backend in (None, "closures", "codegen"):
+            validator = Validator(self.schema, lazy_error_reporting=True)
+            if backend:
+                validator.compile(backend)
+            validator.set_error_limits(max_errors=5)
+            self.assertFalse(validator.validate(self.data))
+            self.assertEqual(
+                [error.instance_path for error in validator.get_error_records()],
+                ["/a/0", "/a/1", "/a/2", "/a/3", "/a/4"],
+            )
+
+    def test_max_errors_per_location(self):
+        validator = Validator(self.schema, lazy_error_reporting=True)
+        validator.set_error_limits(max_errors_per_location=2)
+        self.assertFalse(validator.validate(self.data))
+        self.assertEqual(
+            [error.instance_path for error in validator.get_error_records()],
+            ["/a/0", "/a/1", "/b"],
+        )
+        streaming = StreamingValidator(validator)
+        self.assertFalse(streaming.validate(io.StringIO(json.dumps(self.data))))
+        self.assertEqual(len(validator.get_errors()), 3)
+
+    def test_limits_apply_per_document(self):
+        validator = Validator(self.schema, lazy_error_reporting=True)
+        validator.set_error_limits(max_errors=1)
+        result = validator.validate_many([self.data, {"a": [1]}, {"b": 2}])
+        self.assertEqual(list(result.valid), [0, 1, 0])
+        self.assertEqual(len(result.errors[0]), 1)
+        self.assertEqual(len(result.errors[2]), 1)
+        copy = pickle.loads(pickle.dumps(validator))
+        self.assertFalse(copy.validate(self.data))
+        self.assertEqual(len(copy.get_errors()), 1)
+
+    def test_invalid_limit(self):
+        validator = Validator(self.schema)
+        with self.assertRaises(ValueError):
+            validator.set_error_limits(max_errors=0)
+
+
+class TestErrorAggregation(unittest.TestCase):
+
+    schema = {
+        "properties": {
+            "a": {"items": {"minimum": 0}},
+            "o": {"additionalProperties": False},
+        }
+    }
+    data = {"a": [1] + [-1] * 999, "o": {"p": 1, "q": 2}}
+
+    def test_failures_counted_once(self):
+        for backend in (None, "closures", "codegen"):
+            validator = Validator(self.schema, lazy_error_reporting=True)
+            if backend:
+                validator.compile(backend)
+            validator.set_error_aggregation(locations=2)
+            self.assertFalse(validator.validate(self.data))
+            [items, p, q] = validator.get_error_records()
+            self.assertEqual(items.count, 999)
+            self.assertEqual(items.instance_paths, ["/a/1", "/a/2"])
+            self.assertEqual(items.schema_path, "/properties/a/items/minimum")
+            self.assertEqual(items.data, -1)
+            self.assertEqual(
+                str(items),
+                "The value -1 is less than the minimum 0 "
+                "(999 times, at /a/1, /a/2, ...)",
+            )
+            # Errors about the object itself aren't members failing.
+            self.assertEqual((p.count, q.count), (1, 1))
+            self.assertEqual(len(validator.get_errors()), 3)
+
+    def test_per_document(self):
+        validator = Validator(self.schema, lazy_error_reporting=True)
+        validator.set_error_aggregation()
+        result = validator.validate_many([self.data, {"a": [-2]}])
+        self.assertEqual(result.errors[1], ["The value -2 is less than the minimum 0"])
+        validator.validate(self.data)
+        records = pickle.loads(pickle.dumps(validator.get_error_records()))
+        self.assertEqual([str(error) for error in records], result.errors[0])
+        self.assertEqual(records[0].count, 999)
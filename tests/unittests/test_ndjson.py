@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import unittest
+
+
+from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.ndjson import (
+    iter_lines,
+    line_offsets,
+    read_line,
+    split_ranges,
+    validate_file,
+    validate_range,
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"n": {"type": "integer", "maximum": 10}},
+    "required": ["n"],
+}
+
+
+def build_validator():
+    return Validator(SCHEMA, lazy_error_reporting=True)
+
+
+class TestLines(unittest.TestCase):
+
+    def test_iter_lines(self):
+        buffer = b'1\n\n{"a": 2}\r\n  \n3'
+        self.assertEqual(
+            [buffer[a:b] for a, b in iter_lines(buffer)],
+            [b"1", b'{"a": 2}', b"  ", b"3"],
+        )
+        self.assertEqual(list(line_offsets(buffer)), [0, 3, 13, 16])
+
+    def test_split_ranges(self):
+        buffer = b"".join(b"%d\n" % n for n in range(1000))
+        for parts in (1, 2, 7, 5000):
+            ranges = split_ranges(buffer, parts)
+            self.assertLessEqual(len(ranges), parts)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], len(buffer))
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, start)
+                self.assertEqual(buffer[start - 1 : start], b"\n")
+
+
+class TestValidateFile(unittest.TestCase):
+
+    def setUp(self):
+        lines = [json.dumps({"n": n % 13}) for n in range(500)]
+        lines[7] = '{"n": '
+        lines[100] = ""
+        self.content = ("\n".join(lines) + "\n").encode()
+        f = tempfile.NamedTemporaryFile(suffix=".ndjson", delete=False)
+        f.write(self.content)
+        f.close()
+        self.path = f.name
+        self.addCleanup(os.unlink, self.path)
+
+    def check(self, result):
+        self.assertEqual(result.count, 499)
+        offsets = list(result.invalid_offsets)
+        self.assertEqual(offsets, sorted(offsets))
+        self.assertEqual(result.valid_count + len(offsets), 499)
+        self.assertEqual(sorted(result.errors), offsets)
+        for offset in offsets:
+            line = read_line(self.path, offset)
+            if line == b'{"n": ':
+                self.assertIn("not valid JSON", result.errors[offset][0])
+            else:
+                self.assertGreater(json.loads(line)["n"], 10)
+
+    def test_in_process(self):
+        result = validate_file(build_validator(), self.path, chunk_size=64)
+        self.check(result)
+        self.assertEqual(
+            result.invalid_offsets,
+            validate_range(build_validator(), self.content).invalid_offsets,
+        )
+
+    def test_workers(self):
+        self.check(validate_file(build_validator(), self.path, workers=2))
+        self.check(validate_file(build_validator, self.path, workers=2))
+
+    def test_empty_file(self):
+        with open(self.path, "wb"):
+            pass
+        result = validate_file(build_validator(), self.path)
+        self.assertEqual(result.count, 0)
+        self.assertTrue(result.all_valid)
+
+    def test_read_line_strips_one_line_ending(self):
+        content = b'1\n"a"\r\r\n"b"\n\n3'
+        with open(self.path, "wb") as f:
+            f.write(content)
+        for start, end in iter_lines(content):
+            self.assertEqual(read_line(self.path, start), content[start:end])
+        self.assertEqual(read_line(self.path, 2), b'"a"\r')
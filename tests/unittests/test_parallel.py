@@ -0,0 +1,86 @@
+import json
+import pickle
+import unittest
+
+
+from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.draft6 import Validator as Draft6Validator
+from jacobsjsonschema.draft7 import Validator as Draft7Validator
+from jacobsjsonschema.draft2019_09 import Validator as Draft201909Validator
+from jacobsjsonschema.draft2020_12 import Validator as Draft202012Validator
+from jacobsjsonschema.parallel import ParallelValidator
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"n": {"type": "integer", "maximum": 10}},
+    "required": ["n"],
+}
+
+
+def is_even(value):
+    return value % 2 == 0
+
+
+def build_validator():
+    return Validator(SCHEMA, lazy_error_reporting=True).compile()
+
+
+class TestPickle(unittest.TestCase):
+
+    def test_round_trip(self):
+        schema = {"$ref": "#/definitions/n", "definitions": {"n": SCHEMA}}
+        for cls in (
+            Validator,
+            Draft6Validator,
+            Draft7Validator,
+            Draft201909Validator,
+            Draft202012Validator,
+        ):
+            for backend in (None, "closures", "codegen"):
+                validator = cls(schema, lazy_error_reporting=True)
+                if backend:
+                    validator.compile(backend)
+                copy = pickle.loads(pickle.dumps(validator))
+                self.assertIsInstance(copy, cls)
+                self.assertEqual(copy._compile_backend, backend)
+                self.assertTrue(copy.validate({"n": 1}))
+                self.assertFalse(copy.validate({"n": 11}))
+                self.assertEqual(len(copy.get_errors()), 1)
+
+    def test_custom_format_kept(self):
+        validator = Draft7Validator({"format": "even"}, lazy_error_reporting=True)
+        validator.add_format("even", is_even)
+        copy = pickle.loads(pickle.dumps(validator))
+        self.assertTrue(copy.validate(2))
+        self.assertFalse(copy.validate(3))
+
+
+class TestParallelValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.documents = [{"n": n % 15} for n in range(200)] + [{}]
+        self.expected = build_validator().validate_many(self.documents)
+
+    def test_same_result_as_validate_many(self):
+        for validator in (build_validator(), build_validator):
+            with ParallelValidator(validator, workers=2, chunk_size=7) as pool:
+                result = pool.validate_many(iter(self.documents))
+            self.assertEqual(result.valid, self.expected.valid)
+            self.assertEqual(result.errors, self.expected.errors)
+
+    def test_encoded(self):
+        encoded = [json.dumps(document).encode() for document in self.documents]
+        encoded[3] = b'{"n": '
+        with ParallelValidator(build_validator(), workers=2, chunk_size=16) as pool:
+            result = pool.validate_many(encoded, encoded=True)
+        self.assertEqual(len(result), len(self.documents))
+        self.assertFalse(result[3])
+        self.assertTrue(result.errors[3][0].startswith("Document is not valid JSON"))
+        del result.errors[3]
+        result.valid[3] = self.expected.valid[3]
+        self.assertEqual(result.valid, self.expected.valid)
+        self.assertEqual(result.errors, self.expected.errors)
+
+    def test_empty(self):
+        with ParallelValidator(build_validator(), workers=1) as pool:
+            self.assertEqual(len(pool.validate_many([])), 0)
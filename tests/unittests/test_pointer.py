@@ -0,0 +1,94 @@
+import unittest
+
+import pytest
+
+from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.draft7 import Validator as Draft7Validator
+from jacobsjsonschema.draft2020_12 import Validator as Draft202012Validator
+from jacobsjsonschema.pointer import parse_pointer, resolve_pointer
+
+
+class TestPointer(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertEqual(parse_pointer(""), [])
+        self.assertEqual(parse_pointer("/"), [""])
+        self.assertEqual(parse_pointer("/a~1b/c~0d/~01"), ["a/b", "c~d", "~1"])
+        self.assertEqual(parse_pointer("/percent%25field/%22"), ["percent%field", '"'])
+        with pytest.raises(ValueError):
+            parse_pointer("a/b")
+
+    def test_resolve(self):
+        document = {"a": [{"b": 1}, {"c/d": 2}], "": 3}
+        self.assertIs(resolve_pointer(document, ""), document)
+        self.assertEqual(resolve_pointer(document, "/a/0/b"), 1)
+        self.assertEqual(resolve_pointer(document, "/a/1/c~1d"), 2)
+        self.assertEqual(resolve_pointer(document, "/"), 3)
+        for pointer in ("/a/2", "/a/01", "/a/-", "/a/x", "/missing"):
+            with pytest.raises(LookupError):
+                resolve_pointer(document, pointer)
+
+
+class TestLocalReferences(unittest.TestCase):
+
+    def test_escaped_and_array_pointers(self):
+        schema = {
+            "definitions": {"slash/field": {"type": "integer"}, "tilde~field": {}},
+            "items": [{"type": "string"}, {"$ref": "#/items/0"}],
+            "properties": {
+                "a": {"$ref": "#/definitions/slash~1field"},
+                "b": {"$ref": "#/definitions/tilde~0field"},
+                "c": {"$ref": "#/definitions/slash~1fi%65ld"},
+            },
+        }
+        for backend in (None, "closures", "codegen"):
+            validator = Draft7Validator(schema)
+            if backend:
+                validator.compile(backend)
+            self.assertTrue(validator.validate({"a": 1, "b": None, "c": 2}))
+            self.assertFalse(validator._probe({"a": "x"}, schema))
+            self.assertTrue(validator.validate(["x", "y"]))
+            self.assertFalse(validator._probe(["x", 1], schema))
+
+    def test_anchors(self):
+        for cls, subschema in (
+            (Validator, {"id": "#int", "type": "integer"}),
+            (Draft7Validator, {"$id": "#int", "type": "integer"}),
+            (Draft202012Validator, {"$anchor": "int", "type": "integer"}),
+        ):
+            validator = cls(
+                {"items": {"$ref": "#int"}, "definitions": {"i": subschema}}
+            )
+            self.assertTrue(validator.validate([1]))
+            self.assertFalse(validator._probe(["a"], validator._root_schema))
+
+    def test_targets_are_resolved_once(self):
+        schema = {
+            "definitions": {
+                "node": {
+                    "type": "object",
+                    "properties": {
+                        "children": {
+                            "type": "array",
+                            "items": {"$ref": "#/definitions/node"},
+                        }
+                    },
+                }
+            },
+            "$ref": "#/definitions/node",
+        }
+        validator = Validator(schema).compile()
+        tree = {"children": [{"children": [{"children": []}]}]}
+        walks = []
+        walk = validator.walk_schema_from_root
+
+        def counting_walk(path):
+            walks.append(path)
+            return walk(path)
+
+        validator.walk_schema_from_root = counting_walk
+        self.assertTrue(validator.validate(tree))
+        self.assertEqual(walks, [])
+        interpreted = Validator(schema)
+        self.assertTrue(interpreted.validate(tree))
+        self.assertEqual(list(interpreted._pointer_targets), ["/definitions/node"])
@@ -0,0 +1,72 @@
+import unittest
+import pytest
+
+
+from jacobsjsonschema.draft4 import Validator, JsonSchemaValidationError
+from jacobsjsonschema.draft7 import Validator as Draft7Validator
+from jacobsjsonschema.draft2019_09 import Validator as Draft201909Validator
+
+
+class TestProbe(unittest.TestCase):
+
+    def test_probe_does_not_raise(self):
+        validator = Validator({"type": "string"})
+        self.assertFalse(validator._probe(5, {"type": "string"}))
+        self.assertTrue(validator._probe("five", {"type": "string"}))
+
+    def test_probe_does_not_record_errors(self):
+        validator = Validator({}, lazy_error_reporting=True)
+        self.assertFalse(validator._probe(5, {"type": "string", "minimum": 10}))
+        self.assertEqual(validator.get_errors(), [])
+
+    def test_nested_probe_keeps_outer_state(self):
+        validator = Validator({}, lazy_error_reporting=True)
+        schema = {"allOf": [{"not": {"type": "integer"}}, {"type": "string"}]}
+        self.assertFalse(validator._probe(5, schema))
+        self.assertFalse(validator._local.context.probing)
+        self.assertFalse(validator._local.context.probe_failed)
+
+
+class TestLazyApplicators(unittest.TestCase):
+
+    def test_anyof_reports_only_its_own_error(self):
+        schema = {"anyOf": [{"type": "string"}, {"minimum": 10}]}
+        validator = Validator(schema, lazy_error_reporting=True)
+        self.assertFalse(validator.validate(5))
+        self.assertEqual(
+            validator.get_errors(),
+            ["The JSON data did not match any of the provided anyOf schemas"],
+        )
+
+    def test_nested_anyof(self):
+        schema = {"anyOf": [{"anyOf": [{"type": "string"}]}, {"type": "boolean"}]}
+        validator = Validator(schema, lazy_error_reporting=True)
+        self.assertFalse(validator.validate(5))
+        self.assertEqual(len(validator.get_errors()), 1)
+
+    def test_type_list(self):
+        validator = Validator({"type": ["string", "null"]}, lazy_error_reporting=True)
+        self.assertFalse(validator.validate(5))
+        self.assertEqual(validator.get_errors(), ["Data was not a string or null"])
+
+    def test_if_then_else(self):
+        schema = {
+            "if": {"type": "integer"},
+            "then": {"minimum": 10},
+            "else": {"type": "string"},
+        }
+        for cls in (Draft7Validator, Draft201909Validator):
+            for validator in (
+                cls(schema, lazy_error_reporting=True),
+                cls(schema, lazy_error_reporting=True).compile(),
+            ):
+                self.assertTrue(validator.validate(12))
+                self.assertTrue(validator.validate("five"))
+                self.assertFalse(validator.validate(None))
+                self.assertEqual(validator.get_errors(), ["Data was not a string"])
+
+    def test_oneof_raises_once(self):
+        validator = Validator({"oneOf": [{"type": "integer"}, {"minimum": 2}]})
+        self.assertTrue(validator.validate(1))
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate(3)
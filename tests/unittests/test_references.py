@@ -1,7 +1,10 @@
 import unittest
 
+import pytest
 
-from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.draft4 import Validator, JsonSchemaValidationError
+from jacobsjsonschema.draft7 import Validator as Draft7Validator
+from jacobsjsonschema.registry import ReferenceRegistry
 
 
 class TestReferences(unittest.TestCase):
@@ -14,3 +17,122 @@ class TestReferences(unittest.TestCase):
         }
         validator = Validator(schema, lazy_error_reporting=False)
         self.assertTrue(validator.validate_from_reference(12, "#/definitions/myint"))
+
+
+class TestRemoteReferences(unittest.TestCase):
+
+    def setUp(self):
+        self.loads = []
+        self.documents = {
+            "item.json": {"definitions": {"id": {"type": "integer", "minimum": 0}}},
+            "name.json": {"type": "string", "maxLength": 3},
+            "ids.json": {"items": {"type": "integer"}},
+        }
+
+    def load(self, uri):
+        self.loads.append(uri)
+        return self.documents[uri]
+
+    def test_document_loaded_once(self):
+        schema = {"items": {"$ref": "item.json#/definitions/id"}}
+        for cls in (Validator, Draft7Validator):
+            for backend in (None, "closures", "codegen"):
+                del self.loads[:]
+                validator = cls(schema)
+                validator.set_file_loader(self.load)
+                if backend:
+                    validator.compile(backend)
+                self.assertTrue(validator.validate([1, 2, 3]))
+                self.assertTrue(validator.validate([4, 5]))
+                self.assertEqual(self.loads, ["item.json"])
+                info = validator._registry.cache_info()
+                self.assertEqual((info.hits, info.misses, info.currsize), (4, 1, 1))
+                (document,) = validator._registry._documents.values()
+                remote = document.validator
+                self.assertIs(remote.__class__, cls)
+                with pytest.raises(JsonSchemaValidationError):
+                    validator.validate([1, -1])
+
+    def test_lazy_errors_are_reported(self):
+        validator = Validator(
+            {"items": {"$ref": "item.json#/definitions/id"}}, lazy_error_reporting=True
+        )
+        validator.set_file_loader(self.load)
+        self.assertFalse(validator.validate([1, -1, "x"]))
+        self.assertEqual(len(validator.get_errors()), 2)
+        self.assertTrue(validator.validate([1]))
+        self.assertEqual(validator.get_errors(), [])
+
+    def test_error_limits_apply_to_remote_documents(self):
+        data = {"ids": ["x"] * 1000}
+        for backend in (None, "closures", "codegen"):
+            validator = Validator(
+                {"properties": {"ids": {"$ref": "ids.json#"}}},
+                lazy_error_reporting=True,
+            )
+            validator.set_file_loader(self.load)
+            if backend:
+                validator.compile(backend)
+            validator.set_error_limits(max_errors=5)
+            self.assertFalse(validator.validate(data))
+            self.assertEqual(len(validator.get_errors()), 5)
+            (document,) = validator._registry._documents.values()
+            remote = document.validator
+            self.assertEqual(len(remote.get_error_records()), 5)
+
+            validator.set_error_limits(max_errors_per_location=2)
+            self.assertFalse(validator.validate(data))
+            self.assertEqual(
+                [error.instance_path for error in validator.get_error_records()],
+                ["/ids/0", "/ids/1"],
+            )
+
+            validator.set_error_limits()
+            validator.set_error_aggregation()
+            self.assertFalse(validator.validate(data))
+            records = validator.get_error_records()
+            self.assertEqual(len(records), 1)
+            self.assertEqual(records[0].count, 1000)
+            self.assertEqual(records[0].instance_path, "/ids/0")
+
+    def test_reference_without_fragment(self):
+        validator = Draft7Validator({"$ref": "name.json"})
+        validator.set_file_loader(self.load)
+        self.assertTrue(validator.validate("abc"))
+        self.assertFalse(validator._probe("abcd", validator._root_schema))
+
+    def test_shared_registry_with_eviction(self):
+        registry = ReferenceRegistry(maxsize=1)
+        first = Validator({"$ref": "item.json#/definitions/id"})
+        second = Validator({"$ref": "name.json#"})
+        for validator in (first, second):
+            validator.set_file_loader(self.load)
+            validator.set_reference_registry(registry)
+        first.validate(1)
+        first.validate(2)
+        second.validate("a")
+        first.validate(3)
+        self.assertEqual(self.loads, ["item.json", "name.json", "item.json"])
+        self.assertEqual(registry.cache_info(), (1, 3, 2, 1, 1))
+        registry.clear()
+        self.assertEqual(registry.cache_info(), (0, 0, 0, 1, 0))
+
+    def test_shared_registry_between_configurations(self):
+        registry = ReferenceRegistry()
+        other_documents = {"name.json": {"type": "string", "format": "even"}}
+        plain = Draft7Validator({"$ref": "name.json#"}, lazy_error_reporting=True)
+        plain.set_file_loader(self.load)
+        strict = Draft7Validator({"$ref": "name.json#"}, lazy_error_reporting=True)
+        strict.set_file_loader(other_documents.__getitem__)
+        strict.add_format("even", lambda value: len(value) % 2 == 0)
+        for validator in (plain, strict):
+            validator.set_reference_registry(registry)
+        self.assertTrue(plain.validate("abc"))
+        self.assertFalse(plain.validate("abcd"))
+        self.assertFalse(strict.validate("abc"))
+        self.assertTrue(strict.validate("abcd"))
+        self.assertEqual(registry.cache_info().misses, 2)
+        strict.add_format("even", lambda value: True)
+        self.assertTrue(strict.validate("abc"))
+        self.assertEqual(registry.cache_info().misses, 3)
+        self.assertEqual(self.loads, ["name.json"])
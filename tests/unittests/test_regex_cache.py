@@ -0,0 +1,53 @@
+import re
+import unittest
+
+
+from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.regex_cache import PatternCache, pattern_cache
+
+
+class TestPatternCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = PatternCache()
+        self.assertTrue(cache.search("^a+$", "aaa"))
+        self.assertFalse(cache.search("^a+$", "aab"))
+        info = cache.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.currsize, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = PatternCache(maxsize=2)
+        cache.compile("a")
+        cache.compile("b")
+        cache.compile("a")
+        cache.compile("c")
+        self.assertEqual(cache.cache_info().evictions, 1)
+        cache.compile("a")
+        self.assertEqual(cache.cache_info().misses, 3)
+        cache.compile("b")
+        self.assertEqual(cache.cache_info().misses, 4)
+
+    def test_remembers_engine(self):
+        cache = PatternCache()
+        self.assertEqual(cache.engine("^[a-z]+$"), "re")
+        self.assertEqual(cache.engine("^\\p{Letter}+$"), "regex")
+        self.assertTrue(cache.search("^\\p{Letter}+$", "héllo"))
+        self.assertEqual(cache.cache_info().misses, 2)
+
+    def test_invalid_pattern_raises_and_is_not_cached(self):
+        cache = PatternCache()
+        with self.assertRaises(Exception):
+            cache.compile("(")
+        self.assertEqual(cache.cache_info().currsize, 0)
+
+    def test_validators_share_the_cache(self):
+        pattern_cache.clear()
+        schema = {"pattern": "^x[0-9]+$"}
+        for _ in range(3):
+            Validator(schema).validate("x12")
+        info = pattern_cache.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 2)
+        self.assertIsInstance(pattern_cache.compile("^x[0-9]+$"), re.Pattern)
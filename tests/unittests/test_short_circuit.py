@@ -0,0 +1,144 @@
+import unittest
+import pytest
+
+
+from jacobsjsonschema.draft4 import Validator, JsonSchemaValidationError
+from jacobsjsonschema.draft2019_09 import Validator as Draft201909Validator
+from jacobsjsonschema.compiler import find_observed_schemas
+
+
+class CountingValidator(Draft201909Validator):
+    """Counts the subschemas evaluated by anyOf/oneOf probes."""
+
+    def __init__(self, schema, lazy_error_reporting=False):
+        super().__init__(schema, lazy_error_reporting)
+        self.probes = 0
+
+    def _probe(self, data, schema, check=None):
+        self.probes += 1
+        return super()._probe(data, schema, check)
+
+
+class TestOneOfEarlyTermination(unittest.TestCase):
+
+    def test_stops_at_second_match(self):
+        schema = {"oneOf": [{"type": "integer"}] * 10}
+        validator = CountingValidator(schema, lazy_error_reporting=True)
+        self.assertFalse(validator.validate(1))
+        self.assertEqual(validator.probes, 2)
+        self.assertEqual(
+            validator.get_errors(),
+            ["The data matched against 2 schemas but was required to match exactly 1"],
+        )
+
+    def test_draft4(self):
+        validator = Validator({"oneOf": [{}, {}, {}]})
+        with pytest.raises(JsonSchemaValidationError) as raised:
+            validator.validate(1)
+        self.assertEqual(
+            str(raised.value),
+            "The data matched against 2 schemas but was required to match exactly 1",
+        )
+
+
+class TestAnyOfShortCircuit(unittest.TestCase):
+
+    def test_stops_at_first_match_when_unobserved(self):
+        schema = {"anyOf": [{"type": "integer"}] * 5}
+        validator = CountingValidator(schema)
+        self.assertTrue(validator.validate(1))
+        self.assertEqual(validator.probes, 1)
+
+    def test_evaluates_every_branch_when_observed(self):
+        schema = {
+            "anyOf": [
+                {"properties": {"a": True}},
+                {"properties": {"b": True}},
+            ],
+            "unevaluatedProperties": False,
+        }
+        validator = CountingValidator(schema)
+        self.assertTrue(validator.validate({"a": 1, "b": 2}))
+        self.assertEqual(validator.probes, 2)
+
+    def test_observed_through_reference(self):
+        schema = {
+            "$defs": {
+                "ab": {
+                    "anyOf": [
+                        {"properties": {"a": True}},
+                        {"properties": {"b": True}},
+                    ]
+                }
+            },
+            "properties": {
+                "inner": {"$ref": "#/$defs/ab", "unevaluatedProperties": False}
+            },
+        }
+        validator = Draft201909Validator(schema)
+        self.assertEqual(validator._anyof_short_circuits(), {})
+        self.assertTrue(validator.validate({"inner": {"a": 1, "b": 2}}))
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate({"inner": {"a": 1, "c": 2}})
+
+    def test_dynamic_reference_disables_analysis(self):
+        schema = {"anyOf": [{}, {}], "$recursiveRef": "#"}
+        validator = Draft201909Validator(schema)
+        self.assertEqual(validator._anyof_short_circuits(), {})
+
+
+class TestFindObservedSchemas(unittest.TestCase):
+
+    def test_observed_only_in_place(self):
+        in_place = {"type": "object"}
+        nested = {"anyOf": [{}]}
+        schema = {
+            "allOf": [in_place],
+            "properties": {"x": nested},
+            "unevaluatedProperties": False,
+        }
+        reachable, observed = find_observed_schemas(schema, lambda s: None)
+        self.assertIn(id(nested), reachable)
+        self.assertIn(id(in_place), observed)
+        self.assertNotIn(id(nested), observed)
+
+    def test_gives_up_on_unresolvable_reference(self):
+        def resolve(schema):
+            raise LookupError()
+
+        self.assertIsNone(find_observed_schemas({}, resolve))
+
+
+class TestAnnotationTracking(unittest.TestCase):
+
+    def test_only_observed_schemas_are_tracked(self):
+        inner = {"properties": {"b": True}}
+        schema = {
+            "properties": {"a": inner},
+            "allOf": [{"properties": {"c": True}}],
+            "unevaluatedProperties": False,
+        }
+        for backend in (None, "closures", "codegen"):
+            validator = Draft201909Validator(schema)
+            if backend:
+                validator.compile(backend)
+            untracked = validator._untracked_schemas()
+            self.assertIn(id(inner), untracked)
+            self.assertNotIn(id(schema), untracked)
+            self.assertNotIn(id(schema["allOf"][0]), untracked)
+            self.assertTrue(validator.validate({"a": {"b": 1}, "c": 2}))
+            with pytest.raises(JsonSchemaValidationError):
+                validator.validate({"a": {}, "b": 1})
+
+    def test_nothing_tracked_before_2019(self):
+        schema = {"items": {"properties": {"a": {"type": "integer"}}}}
+        validator = Validator(schema)
+        self.assertEqual(len(validator._untracked_schemas()), 3)
+        self.assertTrue(validator.validate([{"a": 1}] * 10))
+
+    def test_other_schemas_are_tracked(self):
+        validator = Draft201909Validator({})
+        closed = {"properties": {"a": True}, "unevaluatedProperties": False}
+        self.assertTrue(validator.validate({"a": 1}, closed))
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate({"b": 1}, closed)
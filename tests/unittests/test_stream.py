@@ -0,0 +1,240 @@
+import io
+import json
+import unittest
+
+import pytest
+
+from jacobsjsonschema.draft4 import Validator, JsonSchemaValidationError
+from jacobsjsonschema.draft7 import Validator as Draft7Validator
+from jacobsjsonschema.draft2019_09 import Validator as Draft201909Validator
+from jacobsjsonschema.draft2020_12 import Validator as Draft202012Validator
+from jacobsjsonschema.stream import StreamingValidator, build_value, iter_events
+
+DOCUMENT = {
+    "name": 'café "quoted" \\ 😀',
+    "values": [0, -1, 2.5, -3e2, 1.25e-3, 12345678901234567890],
+    "flags": [True, False, None],
+    "nested": {"empty": {}, "list": [[], [{}]]},
+}
+
+
+class TestIterEvents(unittest.TestCase):
+
+    def events(self, text, chunk_size=65536):
+        return list(iter_events(io.BytesIO(text.encode()), chunk_size))
+
+    def test_events(self):
+        self.assertEqual(
+            self.events('{"a": [1, "x"], "b": {}}'),
+            [
+                ("start_object", None),
+                ("key", "a"),
+                ("start_array", None),
+                ("scalar", 1),
+                ("scalar", "x"),
+                ("end_array", None),
+                ("key", "b"),
+                ("start_object", None),
+                ("end_object", None),
+                ("end_object", None),
+            ],
+        )
+
+    def test_round_trip_at_every_chunk_size(self):
+        text = json.dumps(DOCUMENT, indent=1)
+        for chunk_size in (1, 2, 3, 7, 64, 65536):
+            events = iter(self.events(text, chunk_size))
+            event, value = next(events)
+            self.assertEqual(build_value(event, value, events), DOCUMENT)
+            events = iter_events(io.StringIO(text), chunk_size)
+            event, value = next(events)
+            self.assertEqual(build_value(event, value, events), DOCUMENT)
+
+    def test_scalar_documents(self):
+        self.assertEqual(self.events(" 12 "), [("scalar", 12)])
+        self.assertEqual(self.events("null"), [("scalar", None)])
+        self.assertEqual(self.events('"a"', 1), [("scalar", "a")])
+
+    def test_invalid(self):
+        for text in (
+            "",
+            "[1, 2",
+            "[1 2]",
+            "[1,]",
+            '{"a" 1}',
+            '{"a": 1,}',
+            "{1: 2}",
+            "[1]]",
+            "1 2",
+            "tru",
+            "[01]",
+            '"unterminated',
+            '"bad \\x escape"',
+            "[" + "nonsense" * 10 + "]",
+        ):
+            with pytest.raises(ValueError):
+                self.events(text, 4)
+
+
+class TestStreamingValidator(unittest.TestCase):
+
+    def check_agrees(self, cls, schema, documents):
+        for document in documents:
+            text = json.dumps(document)
+            for lazy in (False, True):
+                validator = cls(schema, lazy_error_reporting=lazy)
+                streaming = StreamingValidator(validator)
+                try:
+                    expected = validator.validate(document)
+                except JsonSchemaValidationError:
+                    expected = False
+                try:
+                    actual = streaming.validate(io.BytesIO(text.encode()), chunk_size=5)
+                except JsonSchemaValidationError:
+                    actual = False
+                self.assertEqual(actual, expected, (cls, schema, document))
+                if lazy and not expected:
+                    self.assertTrue(validator.get_errors())
+
+    def test_agrees_with_validate(self):
+        schema = {
+            "type": "array",
+            "minItems": 2,
+            "maxItems": 4,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer", "minimum": 0},
+                    "tags": {"type": "array", "uniqueItems": True},
+                    "extra": {"enum": [{"a": 1}, [1]]},
+                },
+                "patternProperties": {
+                    "^x-": {"type": "string"},
+                    "^x-n": {"maxLength": 2},
+                },
+                "additionalProperties": False,
+                "required": ["id"],
+                "maxProperties": 3,
+            },
+        }
+        documents = [
+            [{"id": 1}, {"id": 2, "tags": ["a", "b"]}],
+            [{"id": 1}],
+            [{"id": 1}] * 5,
+            [{"id": -1}, {"id": 2}],
+            [{"id": 1}, {}],
+            [{"id": 1}, {"id": 2, "tags": ["a", "a"]}],
+            [{"id": 1}, {"id": 2, "extra": {"a": 1}}],
+            [{"id": 1}, {"id": 2, "extra": {"a": 2}}],
+            [{"id": 1}, {"id": 2, "x-a": "s", "x-n": "s"}],
+            [{"id": 1}, {"id": 2, "x-nn": "long"}],
+            [{"id": 1}, {"id": 2, "x-a": 1}],
+            [{"id": 1}, {"id": 2, "other": 1}],
+            [{"id": 1}, {"id": 2, "x-a": "", "x-b": "", "x-c": ""}],
+            {"id": 1},
+            "string",
+        ]
+        for cls in (
+            Validator,
+            Draft7Validator,
+            Draft201909Validator,
+            Draft202012Validator,
+        ):
+            self.check_agrees(cls, schema, documents)
+
+    def test_contains(self):
+        schema = {"contains": {"type": "string"}, "minContains": 2, "maxContains": 3}
+        documents = [[1, "a"], ["a", "b"], ["a", "b", "c", "d"], [], [[1], {"a": 1}]]
+        for cls in (Validator, Draft7Validator, Draft201909Validator):
+            self.check_agrees(cls, schema, documents)
+
+    def test_falls_back_for_other_keywords(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "a": {"anyOf": [{"type": "array"}, {"type": "null"}]},
+                "b": {"$ref": "#/definitions/b"},
+                "c": False,
+            },
+            "definitions": {"b": {"type": "array", "items": {"type": "integer"}}},
+            "dependencies": {"a": ["b"]},
+        }
+        documents = [
+            {"a": [1], "b": [1]},
+            {"a": None},
+            {"a": 1, "b": [1]},
+            {"b": ["x"]},
+            {"c": 1},
+        ]
+        for cls in (Draft7Validator, Draft202012Validator):
+            self.check_agrees(cls, schema, documents)
+
+    def test_streamed_values_are_not_built(self):
+        seen = []
+
+        class Recording(Draft7Validator):
+            def validate(self, data, schema=None):
+                seen.append(data)
+                return super().validate(data, schema)
+
+        schema = {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"n": {"type": "integer"}, "v": {"items": True}},
+                "required": ["n"],
+            },
+        }
+        text = json.dumps([{"n": n, "v": [n, [n]]} for n in range(100)])
+        self.assertTrue(
+            StreamingValidator(Recording(schema)).validate(io.StringIO(text))
+        )
+        # Only scalars reach validate(): n, and the first item of each v.
+        self.assertEqual(seen, [n for n in range(100) for _ in (0, 1)])
+
+    def test_lazy_errors(self):
+        validator = Validator(
+            {"items": {"type": "integer", "maximum": 10}, "maxItems": 2},
+            lazy_error_reporting=True,
+        )
+        streaming = StreamingValidator(validator)
+        self.assertFalse(streaming.validate(io.StringIO("[1, 20, 30]")))
+        self.assertEqual(len(validator.get_errors()), 3)
+        self.assertTrue(streaming.validate(io.StringIO("[1, 2]")))
+        self.assertEqual(validator.get_errors(), [])
+
+    def test_trailing_data(self):
+        for schema in ({}, {"items": {"type": "integer"}}, True):
+            streaming = StreamingValidator(Validator(schema))
+            for text in ('{"a":1} garbage', "{} {}", "{}]", "[1,2] trailing"):
+                with pytest.raises(ValueError):
+                    streaming.validate(io.StringIO(text))
+            self.assertTrue(streaming.validate(io.StringIO(" [1, 2] \n")))
+
+    def test_only_required_keys_kept(self):
+        seen = []
+
+        class Recording(Validator):
+            def _validate_required(self, data, schema):
+                seen.append(dict(data))
+                return super()._validate_required(data, schema)
+
+        schema = {"required": ["n", "z"], "minProperties": 2, "maxProperties": 3}
+        validator = Recording(schema, lazy_error_reporting=True)
+        streaming = StreamingValidator(validator)
+        self.assertTrue(streaming.validate(io.StringIO('{"a": 1, "n": 2, "z": 3}')))
+        self.assertEqual(seen, [{"n": None, "z": None}])
+        self.assertFalse(streaming.validate(io.StringIO('{"n": 1}')))
+        self.assertEqual(
+            validator.get_errors(),
+            [
+                "The 'z' property is required but was missing",
+                "There are too few properties 1 on the object",
+            ],
+        )
+        self.assertFalse(
+            streaming.validate(io.StringIO('{"a": 1, "b": 2, "n": 3, "z": 4}'))
+        )
+        self.assertEqual(
+            validator.get_errors(), ["There are too many properties 4 on the object"]
+        )
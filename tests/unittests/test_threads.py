@@ -0,0 +1,61 @@
+import threading
+import unittest
+
+
+from jacobsjsonschema.draft4 import Validator
+from jacobsjsonschema.draft2019_09 import Validator as Draft201909Validator
+
+
+class TestPerCallState(unittest.TestCase):
+
+    def test_errors_reset_for_each_call(self):
+        validator = Validator({"type": "string"}, lazy_error_reporting=True)
+        self.assertFalse(validator.validate(1))
+        first = validator.get_errors()
+        self.assertFalse(validator.validate(2))
+        self.assertEqual(len(validator.get_errors()), 1)
+        self.assertTrue(validator.validate("three"))
+        self.assertEqual(validator.get_errors(), [])
+        # Earlier results are left as they were.
+        self.assertEqual(len(first), 1)
+
+    def test_warnings_reset_for_each_call(self):
+        validator = Draft201909Validator({"format": "lowercase"})
+        validator.add_format("lowercase", lambda value: value == value.lower())
+        validator.validate("Shouting")
+        self.assertEqual(len(validator.get_warnings()), 1)
+        validator.validate("quiet")
+        self.assertEqual(validator.get_warnings(), [])
+
+
+class TestSharedValidator(unittest.TestCase):
+
+    def test_threads_see_their_own_errors(self):
+        schema = {
+            "type": "object",
+            "properties": {"n": {"type": "integer", "maximum": 100}},
+            "anyOf": [{"required": ["n"]}, {"required": ["m"]}],
+        }
+        for validator in (
+            Validator(schema, lazy_error_reporting=True),
+            Validator(schema, lazy_error_reporting=True).compile(),
+        ):
+            failures = []
+            barrier = threading.Barrier(8)
+
+            def work(offset):
+                barrier.wait()
+                for idx in range(300):
+                    value = offset * 1000 + idx
+                    ok = validator.validate({"n": value})
+                    errors = validator.get_errors()
+                    expected = value <= 100
+                    if ok != expected or len(errors) != (0 if expected else 1):
+                        failures.append((value, ok, errors))
+
+            threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(failures, [])
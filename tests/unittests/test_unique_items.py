@@ -0,0 +1,31 @@
+import unittest
+import pytest
+
+
+from jacobsjsonschema.draft4 import Validator, JsonSchemaValidationError
+
+
+class TestUniqueItems(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = {"uniqueItems": True}
+
+    def test_unique_objects(self):
+        data = [{"id": i, "tags": [i, True]} for i in range(1000)]
+        self.assertTrue(Validator(self.schema).validate(data))
+
+    def test_duplicate_indices_reported(self):
+        data = [{"a": 1}, [1, 2], {"a": 2}, [1.0, 2], {"a": 3}]
+        validator = Validator(self.schema, lazy_error_reporting=True)
+        self.assertFalse(validator.validate(data))
+        self.assertIn("items 1 and 3", validator.get_errors()[0])
+
+    def test_bools_are_not_numbers(self):
+        validator = Validator(self.schema)
+        self.assertTrue(validator.validate([1, True, 0, False]))
+        self.assertTrue(validator.validate([[1], [True]]))
+        with pytest.raises(JsonSchemaValidationError):
+            validator.validate([{"a": False}, {"a": False}])
+
+    def test_unique_items_false(self):
+        self.assertTrue(Validator({"uniqueItems": False}).validate([1, 1]))